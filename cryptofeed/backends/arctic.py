@@ -7,14 +7,11 @@ associated with this software.
 Book backends are intentionally left out here - Arctic cannot handle high throughput
 data like book data. Arctic is best used for writing large datasets in batches.
 '''
-import arctic
-import pandas as pd
-
-from cryptofeed.backends.backend import BackendCallback
+from cryptofeed.backends.backend import BackendCallback, BackendQueue
 from cryptofeed.defines import BALANCES, CANDLES, FILLS, FUNDING, OPEN_INTEREST, ORDER_INFO, TICKER, TRADES, LIQUIDATIONS, TRANSACTIONS
 
 
-class ArcticCallback:
+class ArcticCallback(BackendQueue):
     def __init__(self, library, host='127.0.0.1', key=None, none_to=None, numeric_type=float, quota=0, ssl=False, **kwargs):
         """
         library: str
@@ -31,6 +28,8 @@ class ArcticCallback:
             lib_type in the kwargs. Default is VersionStore, but you can
             set to chunkstore with lib_type=arctic.CHUNK_STORE
         """
+        import arctic
+
         con = arctic.Arctic(host, ssl=ssl)
         if library not in con.list_libraries():
             lib_type = kwargs.get('lib_type', arctic.VERSION_STORE)
@@ -40,9 +39,19 @@ class ArcticCallback:
         self.key = key if key else self.default_key
         self.numeric_type = numeric_type
         self.none_to = none_to
+        self.running = True
+
+    async def writer(self):
+        while self.running:
+            async with self.read_queue() as updates:
+                if updates:
+                    self._append(updates)
+
+    def _append(self, updates: list):
+        import pandas as pd
 
-    async def write(self, data):
-        df = pd.DataFrame({key: [value] for key, value in data.items()})
+        # one DataFrame (and one append) per batch of queued updates
+        df = pd.DataFrame.from_records(updates)
         df['date'] = pd.to_datetime(df.timestamp, unit='s')
         df['receipt_timestamp'] = pd.to_datetime(df.receipt_timestamp, unit='s')
         df.set_index(['date'], inplace=True)
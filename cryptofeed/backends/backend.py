@@ -9,18 +9,29 @@ from asyncio.queues import Queue
 from multiprocessing import Pipe, Process
 from contextlib import asynccontextmanager
 
+from cryptofeed.backends.ring_buffer import RingBuffer
+
 
 SHUTDOWN_SENTINEL = 'STOP'
+# queued by a batching writer's flush timer to wake it when no updates are arriving
+FLUSH = 'FLUSH'
+# backend_multiprocessing option selecting the shared memory transport
+RING_BUFFER = 'ring_buffer'
 
 
 class BackendQueue:
+    # size in bytes of the shared memory ring buffer used when multiprocess is RING_BUFFER
+    ring_buffer_size = 2 ** 24
+    # if True, stop() waits for the writer to write everything queued before it (batching writers)
+    drain_on_stop = False
+
     def start(self, loop: asyncio.AbstractEventLoop, multiprocess=False):
         if hasattr(self, 'started') and self.started:
             # prevent a backend callback from starting more than 1 writer and creating more than 1 queue
             return
         self.multiprocess = multiprocess
         if self.multiprocess:
-            self.queue = Pipe(duplex=False)
+            self.queue = RingBuffer(self.ring_buffer_size) if self.multiprocess == RING_BUFFER else Pipe(duplex=False)
             self.worker = Process(target=BackendQueue.worker, args=(self.writer,), daemon=True)
             self.worker.start()
         else:
@@ -29,11 +40,17 @@ class BackendQueue:
         self.started = True
 
     async def stop(self):
-        if self.multiprocess:
+        if self.multiprocess == RING_BUFFER:
+            await self.queue.put(SHUTDOWN_SENTINEL)
+            self.worker.join()
+            self.queue.close()
+        elif self.multiprocess:
             self.queue[1].send(SHUTDOWN_SENTINEL)
             self.worker.join()
         else:
             await self.queue.put(SHUTDOWN_SENTINEL)
+            if self.drain_on_stop:
+                await self.worker
         self.running = False
 
     @staticmethod
@@ -47,8 +64,16 @@ class BackendQueue:
     async def writer(self):
         raise NotImplementedError
 
+    def _flush_later(self):
+        # wake a batching writer after flush_interval seconds, so a partial batch is written when updates stop arriving
+        if not self.multiprocess:
+            # the multiprocess pipe blocks the writer's loop, so the time threshold is only checked as updates arrive
+            asyncio.get_running_loop().call_later(self.flush_interval, self.queue.put_nowait, FLUSH)
+
     async def write(self, data):
-        if self.multiprocess:
+        if self.multiprocess == RING_BUFFER:
+            await self.queue.put(data)
+        elif self.multiprocess:
             self.queue[1].send(data)
         else:
             await self.queue.put(data)
@@ -56,17 +81,22 @@ class BackendQueue:
     @asynccontextmanager
     async def read_queue(self) -> list:
         if self.multiprocess:
-            msg = self.queue[0].recv()
-            if msg == SHUTDOWN_SENTINEL:
-                self.running = False
-                yield []
+            if self.multiprocess == RING_BUFFER:
+                ret = await self.queue.get()
             else:
-                yield [msg]
+                ret = [self.queue[0].recv()]
+                while self.queue[0].poll():
+                    ret.append(self.queue[0].recv())
+            if SHUTDOWN_SENTINEL in ret:
+                self.running = False
+                ret = ret[:ret.index(SHUTDOWN_SENTINEL)]
+            yield ret
         else:
             current_depth = self.queue.qsize()
             if current_depth == 0:
                 update = await self.queue.get()
                 if update == SHUTDOWN_SENTINEL:
+                    self.running = False
                     yield []
                 else:
                     yield [update]
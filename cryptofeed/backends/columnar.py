@@ -0,0 +1,144 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+from decimal import Decimal
+import time
+
+import pyarrow as pa
+from yapic import json
+
+from cryptofeed.backends.backend import FLUSH, BackendQueue
+
+NUMERIC_FIELDS = {'amount', 'price', 'bid', 'ask', 'bid_size', 'ask_size', 'quantity', 'mark_price', 'rate', 'predicted_rate',
+                  'open_interest', 'open', 'close', 'high', 'low', 'volume', 'balance', 'reserved', 'position', 'entry_price',
+                  'unrealised_pnl', 'fee', 'remaining'}
+TIMESTAMP_FIELDS = {'timestamp', 'receipt_timestamp', 'next_funding_time', 'start', 'stop'}
+INTEGER_FIELDS = {'trades', 'sequence_number'}
+
+
+class ColumnBuffer:
+    """
+    Collects update dicts (the output of to_dict()) as typed columns and converts
+    them to an Arrow record batch.
+
+    A column's type is fixed the first time it is flushed: timestamps are float64,
+    numeric fields float64 (or string if numeric_type is not float), booleans and
+    floats keep their type, and everything else (ids, nested books and deltas as JSON)
+    is stored as a string. Columns seen in earlier batches are kept, so the schema
+    only changes when a new field appears.
+    """
+    def __init__(self, numeric_type=float):
+        self.numeric = pa.float64() if numeric_type is float else pa.string()
+        self.columns = {}
+        self.types = {}
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, data: dict):
+        columns = self.columns
+        for name, value in data.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = [None] * self.rows
+            column.append(value)
+        self.rows += 1
+
+        if len(data) != len(columns):
+            for column in columns.values():
+                if len(column) < self.rows:
+                    column.append(None)
+
+    def _type(self, name: str, values: list) -> pa.DataType:
+        if name in self.types:
+            return self.types[name]
+
+        if name in TIMESTAMP_FIELDS:
+            dtype = pa.float64()
+        elif name in NUMERIC_FIELDS:
+            dtype = self.numeric
+        elif name in INTEGER_FIELDS:
+            dtype = pa.int64()
+        else:
+            value = next((v for v in values if v is not None), None)
+            if isinstance(value, bool):
+                dtype = pa.bool_()
+            elif isinstance(value, float):
+                dtype = pa.float64()
+            else:
+                dtype = pa.string()
+        self.types[name] = dtype
+        return dtype
+
+    @staticmethod
+    def _to_str(value):
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+
+    def flush(self) -> pa.RecordBatch:
+        arrays = []
+        fields = []
+        # keep the column order of earlier batches so the schema stays the same
+        names = list(self.types) + [name for name in self.columns if name not in self.types]
+        for name in names:
+            values = self.columns.get(name) or [None] * self.rows
+            dtype = self._type(name, values)
+            if dtype == pa.string():
+                values = [self._to_str(v) for v in values]
+            elif dtype == pa.float64():
+                values = [float(v) if isinstance(v, (Decimal, str)) else v for v in values]
+            arrays.append(pa.array(values, type=dtype))
+            fields.append(pa.field(name, dtype))
+
+        self.columns = {}
+        self.rows = 0
+        return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields))
+
+
+class ColumnarBackendQueue(BackendQueue):
+    """
+    Reads updates from the backend queue into a ColumnBuffer and passes them to
+    write_batch as Arrow record batches, once batch_size rows are buffered or
+    flush_interval seconds have passed since the last write. Buffered rows are
+    written when the backend is stopped.
+
+    Subclasses set batch_size, flush_interval, numeric_type and implement write_batch
+    (and optionally close).
+    """
+    drain_on_stop = True
+
+    async def write_batch(self, batch: pa.RecordBatch):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    async def writer(self):
+        buffer = ColumnBuffer(self.numeric_type)
+        last_flush = time.time()
+
+        while self.running:
+            async with self.read_queue() as updates:
+                empty = len(buffer) == 0
+                for update in updates:
+                    if update != FLUSH:
+                        buffer.append(update)
+
+            if len(buffer) == 0:
+                continue
+            if len(buffer) >= self.batch_size or time.time() - last_flush >= self.flush_interval:
+                await self.write_batch(buffer.flush())
+                last_flush = time.time()
+            elif empty:
+                self._flush_later()
+
+        if len(buffer):
+            await self.write_batch(buffer.flush())
+        await self.close()
@@ -4,6 +4,7 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+import asyncio
 import logging
 
 import aiohttp
@@ -15,17 +16,38 @@ LOG = logging.getLogger('feedhandler')
 
 
 class HTTPCallback(BackendQueue):
-    def __init__(self, addr: str, **kwargs):
+    def __init__(self, addr: str, retries=0, retry_delay=1.0, connections=100, **kwargs):
+        """
+        addr: str
+            URL to POST to
+        retries: int
+            number of times a POST that fails with a 429 or 5xx status is retried. The delay
+            doubles on each retry, starting at retry_delay seconds, unless the response has
+            a Retry-After header
+        connections: int
+            maximum number of open (keep-alive) connections in the session's pool
+        """
         self.addr = addr
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.connections = connections
         self.session = None
         self.running = True
 
     async def http_write(self, data, headers=None):
         if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.connections))
 
-        async with self.session.post(self.addr, data=data, headers=headers) as resp:
-            if resp.status >= 400:
+        for attempt in range(self.retries + 1):
+            async with self.session.post(self.addr, data=data, headers=headers) as resp:
+                if resp.status < 400:
+                    return
                 error = await resp.text()
-                LOG.error("POST to %s failed: %d - %s", self.addr, resp.status, error)
-            resp.raise_for_status()
+                if attempt < self.retries and (resp.status == 429 or resp.status >= 500):
+                    delay = resp.headers.get('Retry-After')
+                    delay = float(delay) if delay and delay.isdigit() else self.retry_delay * 2 ** attempt
+                    LOG.warning("POST to %s failed: %d - %s, retrying in %.1f seconds", self.addr, resp.status, error, delay)
+                else:
+                    LOG.error("POST to %s failed: %d - %s", self.addr, resp.status, error)
+                    resp.raise_for_status()
+            await asyncio.sleep(delay)
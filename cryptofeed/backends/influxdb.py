@@ -4,12 +4,15 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+import asyncio
 from collections import defaultdict
+import gzip
 import logging
+import time
 
 from yapic import json
 
-from cryptofeed.backends.backend import BackendBookCallback, BackendCallback
+from cryptofeed.backends.backend import FLUSH, BackendBookCallback, BackendCallback
 from cryptofeed.backends.http import HTTPCallback
 from cryptofeed.defines import BID, ASK
 
@@ -17,7 +20,9 @@ LOG = logging.getLogger('feedhandler')
 
 
 class InfluxCallback(HTTPCallback):
-    def __init__(self, addr: str, org: str, bucket: str, token: str, key=None, **kwargs):
+    drain_on_stop = True
+
+    def __init__(self, addr: str, org: str, bucket: str, token: str, key=None, batch_size=5000, batch_bytes=2 ** 20, flush_interval=1.0, max_in_flight=4, compress=True, retries=3, **kwargs):
         """
         Parent class for InfluxDB callbacks
 
@@ -52,10 +57,32 @@ class InfluxCallback(HTTPCallback):
           Token string for authentication
         key:
           key to use when writing data, will be a combination of key-datatype
+        batch_size: int
+          Updates are written as one line protocol request per batch. A batch is written
+          once it has batch_size lines or roughly batch_bytes bytes, or flush_interval
+          seconds after the last write
+        batch_bytes: int
+          see batch_size
+        flush_interval: float
+          see batch_size
+        max_in_flight: int
+          maximum number of write requests in progress at once. With more than 1,
+          batches may be committed out of order
+        compress: bool
+          gzip request bodies
+        retries: int
+          number of times a write that fails with a 429 or 5xx status is retried
         """
-        super().__init__(addr, **kwargs)
+        super().__init__(addr, retries=retries, connections=max_in_flight, **kwargs)
         self.addr = f"{addr}/api/v2/write?org={org}&bucket={bucket}&precision=us"
-        self.headers = {"Authorization": f"Token {token}"}
+        self.headers = {"Authorization": f"Token {token}", "Content-Type": "text/plain; charset=utf-8"}
+        if compress:
+            self.headers["Content-Encoding"] = "gzip"
+        self.compress = compress
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.max_in_flight = max_in_flight
 
         self.session = None
         self.key = key if key else self.default_key
@@ -74,22 +101,66 @@ class InfluxCallback(HTTPCallback):
                 ret.append(f'{key}={value}')
         return ','.join(ret)
 
+    def line(self, update: dict) -> str:
+        timestamp = update["timestamp"]
+        timestamp_str = f',timestamp={timestamp}' if timestamp is not None else ''
+
+        if 'interval' in update:
+            trades = f',trades={update["trades"]},' if update['trades'] else ','
+            return f'{self.key}-{update["exchange"]},symbol={update["symbol"]},interval={update["interval"]} start={update["start"]},stop={update["stop"]}{trades}open={update["open"]},close={update["close"]},high={update["high"]},low={update["low"]},volume={update["volume"]}{timestamp_str},receipt_timestamp={update["receipt_timestamp"]} {int(update["receipt_timestamp"] * 1000000)}'
+        return f'{self.key}-{update["exchange"]},symbol={update["symbol"]} {self.format(update)}{timestamp_str},receipt_timestamp={update["receipt_timestamp"]} {int(update["receipt_timestamp"] * 1000000)}'
+
+    async def write_lines(self, lines: list):
+        body = '\n'.join(lines).encode()
+        if self.compress:
+            # level 1: line protocol compresses well even at the fastest level, and this runs on the writer's loop
+            body = gzip.compress(body, compresslevel=1)
+        await self.http_write(body, headers=self.headers)
+
+    async def _write_task(self, lines: list, limit: asyncio.Semaphore):
+        try:
+            await self.write_lines(lines)
+        except Exception:
+            LOG.exception("%s: dropped a batch of %d lines", self.__class__.__name__, len(lines))
+        finally:
+            limit.release()
+
     async def writer(self):
+        tasks = set()
+        limit = asyncio.Semaphore(self.max_in_flight)
+        lines = []
+        size = 0
+        last_flush = time.time()
+
         while self.running:
             async with self.read_queue() as updates:
+                empty = len(lines) == 0
                 for update in updates:
-                    d = self.format(update)
-                    timestamp = update["timestamp"]
-                    timestamp_str = f',timestamp={timestamp}' if timestamp is not None else ''
-
-                    if 'interval' in update:
-                        trades = f',trades={update["trades"]},' if update['trades'] else ','
-                        update = f'{self.key}-{update["exchange"]},symbol={update["symbol"]},interval={update["interval"]} start={update["start"]},stop={update["stop"]}{trades}open={update["open"]},close={update["close"]},high={update["high"]},low={update["low"]},volume={update["volume"]}{timestamp_str},receipt_timestamp={update["receipt_timestamp"]} {int(update["receipt_timestamp"] * 1000000)}'
-                    else:
-                        update = f'{self.key}-{update["exchange"]},symbol={update["symbol"]} {d}{timestamp_str},receipt_timestamp={update["receipt_timestamp"]} {int(update["receipt_timestamp"] * 1000000)}'
-
-                    await self.http_write(update, headers=self.headers)
-        await self.session.close()
+                    if update != FLUSH:
+                        line = self.line(update)
+                        lines.append(line)
+                        size += len(line) + 1
+
+            if len(lines) == 0:
+                continue
+            if len(lines) >= self.batch_size or size >= self.batch_bytes or time.time() - last_flush >= self.flush_interval:
+                await limit.acquire()
+                task = asyncio.create_task(self._write_task(lines, limit))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                lines = []
+                size = 0
+                last_flush = time.time()
+            elif empty:
+                self._flush_later()
+
+        if lines:
+            await limit.acquire()
+            await self._write_task(lines, limit)
+        if tasks:
+            await asyncio.gather(*tasks)
+        if self.session:
+            await self.session.close()
 
 
 class TradeInflux(InfluxCallback, BackendCallback):
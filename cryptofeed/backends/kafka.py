@@ -4,18 +4,30 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-from collections import defaultdict
+from collections import defaultdict, deque
 import asyncio
+import logging
 from typing import Optional
 
-from aiokafka import AIOKafkaProducer
 from yapic import json
 
-from cryptofeed.backends.backend import BackendBookCallback, BackendCallback
+from cryptofeed.backends.backend import BackendBookCallback, BackendCallback, BackendQueue
 
 
-class KafkaCallback:
-    def __init__(self, bootstrap='127.0.0.1', port=9092, key=None, numeric_type=float, none_to=None, acks=0, client_id='cryptofeed', **kwargs):
+LOG = logging.getLogger('feedhandler')
+
+
+class KafkaCallback(BackendQueue):
+    drain_on_stop = True
+    # seconds between connection attempts, doubled after each failure up to max_reconnect_delay
+    reconnect_delay = 1.0
+    max_reconnect_delay = 30.0
+    # failed connection attempts retried before the writer gives up, -1 for no limit. A writer
+    # process (backend_multiprocessing) cannot see stop() while it is connecting, so the limit
+    # is what ends it if the brokers cannot be reached
+    reconnect_retries = 10
+
+    def __init__(self, bootstrap='127.0.0.1', port=9092, key=None, numeric_type=float, none_to=None, acks=0, client_id='cryptofeed', linger_ms=5, max_batch_size=65536, max_in_flight=8, compression_type=None, **kwargs):
         """
         bootstrap: str, list
             if a list, should be a list of strings in the format: ip/host:port, i.e.
@@ -23,6 +35,18 @@ class KafkaCallback:
                 192.1.1.2:9092
                 etc
             if a string, should be ip/port only
+        linger_ms: int
+            time the producer waits for more messages before sending a partition's batch
+        max_batch_size: int
+            maximum size in bytes of a partition's batch
+        max_in_flight: int
+            number of batches of updates read from the queue that may be waiting for
+            delivery. Once exceeded, the writer waits for the oldest batch before sending
+            more. Send and delivery errors are logged and the batch is dropped. If the
+            brokers cannot be reached the writer retries (up to reconnect_retries times), and
+            updates stay queued
+        compression_type: str
+            None, 'gzip', 'snappy', 'lz4' or 'zstd' (the last three need their python packages)
         """
         self.bootstrap = bootstrap
         self.port = port
@@ -32,18 +56,50 @@ class KafkaCallback:
         self.none_to = none_to
         self.acks = acks
         self.client_id = client_id
-
-    async def __connect(self):
-        if not self.producer:
-            loop = asyncio.get_event_loop()
-            self.producer = AIOKafkaProducer(acks=self.acks,
-                                             loop=loop,
-                                             bootstrap_servers=f'{self.bootstrap}:{self.port}' if isinstance(self.bootstrap, str) else self.bootstrap,
-                                             client_id=self.client_id)
-            await self.producer.start()
+        self.linger_ms = linger_ms
+        self.max_batch_size = max_batch_size
+        self.max_in_flight = max_in_flight
+        self.compression_type = compression_type
+        self.topics = {}
+        self.running = True
+        self.stopping = False
+
+    async def _connect(self):
+        delay = self.reconnect_delay
+        retries = 0
+        while not self.producer:
+            from aiokafka import AIOKafkaProducer
+
+            producer = AIOKafkaProducer(acks=self.acks,
+                                        bootstrap_servers=f'{self.bootstrap}:{self.port}' if isinstance(self.bootstrap, str) else self.bootstrap,
+                                        client_id=self.client_id,
+                                        linger_ms=self.linger_ms,
+                                        max_batch_size=self.max_batch_size,
+                                        compression_type=self.compression_type)
+            try:
+                await producer.start()
+            except Exception:
+                await producer.stop()
+                if self.stopping or retries == self.reconnect_retries:
+                    raise
+                retries += 1
+                LOG.error("%s: unable to connect to %s, retrying in %.1f seconds", self.__class__.__name__, self.bootstrap, delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            else:
+                self.producer = producer
+
+    async def stop(self):
+        # a writer that is still trying to connect gives up
+        self.stopping = True
+        await super().stop()
 
     def topic(self, data: dict) -> str:
-        return f"{self.key}-{data['exchange']}-{data['symbol']}"
+        key = (data['exchange'], data['symbol'])
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.topics[key] = f"{self.key}-{data['exchange']}-{data['symbol']}"
+        return topic
 
     def partition_key(self, data: dict) -> Optional[bytes]:
         return None
@@ -51,9 +107,49 @@ class KafkaCallback:
     def partition(self, data: dict) -> Optional[int]:
         return None
 
-    async def write(self, data: dict):
-        await self.__connect()
-        await self.producer.send_and_wait(self.topic(data), json.dumps(data).encode('utf-8'), self.partition_key(data), self.partition(data))
+    def serialize(self, data: dict) -> bytes:
+        return json.dumpb(data)
+
+    async def _delivered(self, batch: asyncio.Future):
+        errors = [r for r in await batch if isinstance(r, Exception)]
+        if errors:
+            LOG.error("%s: delivery of %d messages failed: %s", self.__class__.__name__, len(errors), errors[0])
+
+    async def _send(self, updates: list) -> Optional[asyncio.Future]:
+        try:
+            # send() only appends to the producer's partition batches (and waits if they are full), delivery is awaited by the writer
+            futures = [await self.producer.send(self.topic(update), self.serialize(update), key=self.partition_key(update), partition=self.partition(update)) for update in updates]
+        except Exception:
+            LOG.error("%s: failed to send a batch of %d updates", self.__class__.__name__, len(updates), exc_info=True)
+            return None
+        return asyncio.gather(*futures, return_exceptions=True)
+
+    async def writer(self):
+        try:
+            await self._connect()
+        except Exception:
+            LOG.error("%s: unable to connect to %s, giving up and dropping queued updates", self.__class__.__name__, self.bootstrap, exc_info=True)
+            return
+        # delivery futures of the batches sent to the producer, oldest first
+        pending = deque()
+
+        while self.running:
+            async with self.read_queue() as updates:
+                if len(updates) == 0:
+                    continue
+                batch = await self._send(updates)
+                if batch is not None:
+                    pending.append(batch)
+            while len(pending) > self.max_in_flight:
+                await self._delivered(pending.popleft())
+
+        try:
+            await self.producer.flush()
+        except Exception:
+            LOG.error("%s: flush failed", self.__class__.__name__, exc_info=True)
+        while pending:
+            await self._delivered(pending.popleft())
+        await self.producer.stop()
 
 
 class TradeKafka(KafkaCallback, BackendCallback):
@@ -7,9 +7,6 @@ associated with this software.
 from collections import defaultdict
 from datetime import timezone, datetime as dt
 
-import bson
-import motor.motor_asyncio
-
 from cryptofeed.backends.backend import BackendBookCallback, BackendCallback, BackendQueue
 
 
@@ -24,6 +21,9 @@ class MongoCallback(BackendQueue):
         self.running = True
 
     async def writer(self):
+        import bson
+        import motor.motor_asyncio
+
         conn = motor.motor_asyncio.AsyncIOMotorClient(self.host, self.port)
         db = conn[self.db]
         while self.running:
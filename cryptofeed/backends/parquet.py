@@ -0,0 +1,174 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from collections import defaultdict
+from datetime import datetime as dt, timezone
+import logging
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cryptofeed.backends.backend import BackendBookCallback, BackendCallback
+from cryptofeed.backends.columnar import ColumnarBackendQueue
+from cryptofeed.defines import BALANCES, CANDLES, FILLS, FUNDING, INDEX, L2_BOOK, LIQUIDATIONS, OPEN_INTEREST, ORDER_INFO, TICKER, TRADES, TRANSACTIONS
+
+
+LOG = logging.getLogger('feedhandler')
+
+
+class ParquetCallback(ColumnarBackendQueue):
+    def __init__(self, path, key=None, file_format='parquet', compression='snappy', batch_size=10000, flush_interval=10, rotate_interval=3600, max_file_rows=None, none_to=None, numeric_type=float, **kwargs):
+        """
+        path: str
+            directory the files are written to. Files are named {key}-{UTC start time}.parquet
+            (or .arrow)
+        key: str
+            setting key lets you override the file prefix. The defaults are related
+            to the data being stored, i.e. trade, funding, etc
+        file_format: str
+            'parquet' or 'arrow' (Arrow IPC file format)
+        batch_size: int
+            number of updates buffered before a record batch is written
+        flush_interval: float
+            maximum number of seconds updates are buffered before being written
+        rotate_interval: float
+            number of seconds after which a new file is started. None to disable
+        max_file_rows: int
+            number of rows after which a new file is started. None to disable
+        """
+        if file_format not in ('parquet', 'arrow'):
+            raise ValueError("file_format must be 'parquet' or 'arrow'")
+        self.path = path
+        self.key = key if key else self.default_key
+        self.file_format = file_format
+        self.compression = compression
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_interval = rotate_interval
+        self.max_file_rows = max_file_rows
+        self.numeric_type = numeric_type
+        self.none_to = none_to
+        self.running = True
+
+        self.file_writer = None
+        self.file_name = None
+        self.file_schema = None
+        self.file_rows = 0
+        self.file_opened = 0
+
+    def _open(self, schema: pa.Schema):
+        os.makedirs(self.path, exist_ok=True)
+        now = time.time()
+        stamp = dt.fromtimestamp(now, tz=timezone.utc).strftime('%Y%m%dT%H%M%S.%f')
+        self.file_name = os.path.join(self.path, f"{self.key}-{stamp}.{self.file_format}")
+        if self.file_format == 'parquet':
+            self.file_writer = pq.ParquetWriter(self.file_name, schema, compression=self.compression)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression if self.compression in ('lz4', 'zstd') else None)
+            self.file_writer = pa.ipc.new_file(self.file_name, schema, options=options)
+        self.file_schema = schema
+        self.file_opened = now
+        self.file_rows = 0
+        LOG.info("%s: writing %s to %s", self.__class__.__name__, self.key, self.file_name)
+
+    def _close(self):
+        if self.file_writer is not None:
+            self.file_writer.close()
+            self.file_writer = None
+
+    def _rotate(self, batch: pa.RecordBatch) -> bool:
+        if self.file_writer is None:
+            return True
+        if not batch.schema.equals(self.file_schema):
+            # a new column (e.g. an optional field appearing) cannot be appended to the open file
+            return True
+        if self.rotate_interval and time.time() - self.file_opened >= self.rotate_interval:
+            return True
+        if self.max_file_rows and self.file_rows >= self.max_file_rows:
+            return True
+        return False
+
+    def _write(self, batch: pa.RecordBatch):
+        while batch.num_rows:
+            if self._rotate(batch):
+                self._close()
+                self._open(batch.schema)
+            rows = batch.num_rows
+            if self.max_file_rows:
+                rows = min(rows, self.max_file_rows - self.file_rows)
+            if self.file_format == 'parquet':
+                self.file_writer.write_batch(batch.slice(0, rows))
+            else:
+                self.file_writer.write(batch.slice(0, rows))
+            self.file_rows += rows
+            batch = batch.slice(rows)
+
+    async def write_batch(self, batch: pa.RecordBatch):
+        # compression and file I/O release the GIL, keep them off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self._close)
+
+
+class TradeParquet(ParquetCallback, BackendCallback):
+    default_key = TRADES
+
+
+class FundingParquet(ParquetCallback, BackendCallback):
+    default_key = FUNDING
+
+
+class TickerParquet(ParquetCallback, BackendCallback):
+    default_key = TICKER
+
+
+class OpenInterestParquet(ParquetCallback, BackendCallback):
+    default_key = OPEN_INTEREST
+
+
+class LiquidationsParquet(ParquetCallback, BackendCallback):
+    default_key = LIQUIDATIONS
+
+
+class CandlesParquet(ParquetCallback, BackendCallback):
+    default_key = CANDLES
+
+
+class IndexParquet(ParquetCallback, BackendCallback):
+    default_key = INDEX
+
+
+class BookParquet(ParquetCallback, BackendBookCallback):
+    default_key = L2_BOOK
+
+    def __init__(self, *args, snapshots_only=False, snapshot_interval=1000, **kwargs):
+        """
+        books and deltas are stored as JSON strings in the book / delta columns
+        """
+        self.snapshots_only = snapshots_only
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_count = defaultdict(int)
+        super().__init__(*args, **kwargs)
+
+
+class OrderInfoParquet(ParquetCallback, BackendCallback):
+    default_key = ORDER_INFO
+
+
+class TransactionsParquet(ParquetCallback, BackendCallback):
+    default_key = TRANSACTIONS
+
+
+class BalancesParquet(ParquetCallback, BackendCallback):
+    default_key = BALANCES
+
+
+class FillsParquet(ParquetCallback, BackendCallback):
+    default_key = FILLS
@@ -4,19 +4,26 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+import asyncio
 from collections import defaultdict
 from datetime import datetime as dt
+import logging
 from typing import Tuple
 
-import asyncpg
 from yapic import json
 
 from cryptofeed.backends.backend import BackendBookCallback, BackendCallback, BackendQueue
 from cryptofeed.defines import CANDLES, FUNDING, OPEN_INTEREST, TICKER, TRADES, LIQUIDATIONS, INDEX
 
 
+LOG = logging.getLogger('feedhandler')
+
+
 class PostgresCallback(BackendQueue):
-    def __init__(self, host='127.0.0.1', user=None, pw=None, db=None, port=None, table=None, custom_columns: dict = None, none_to=None, numeric_type=float, **kwargs):
+    # table columns (after timestamp, receipt_timestamp, exchange, symbol) used by record(), see examples/postgres_tables.sql
+    default_columns = ()
+
+    def __init__(self, host='127.0.0.1', user=None, pw=None, db=None, port=None, table=None, custom_columns: dict = None, none_to=None, numeric_type=float, copy=False, on_conflict=None, pool_size=1, **kwargs):
         """
         host: str
             Database host address
@@ -32,8 +39,19 @@ class PostgresCallback(BackendQueue):
             A dictionary which maps Cryptofeed's data type fields to Postgres's table column names, e.g. {'symbol': 'instrument', 'price': 'price', 'amount': 'size'}
             Can be a subset of Cryptofeed's available fields (see the cdefs listed under each data type in types.pyx). Can be listed any order.
             Note: to store BOOK data in a JSONB column, include a 'data' field, e.g. {'symbol': 'symbol', 'data': 'json_data'}
+        copy: bool
+            Write batches with the binary COPY protocol instead of INSERT statements. Values are sent as typed
+            Python objects, so the column types must match them (TIMESTAMP for timestamps, NUMERIC or DOUBLE PRECISION
+            for numeric fields; use numeric_type=Decimal to store exact values in NUMERIC columns).
+        on_conflict: str
+            Only used with copy=True. Batches are copied into a temporary staging table and inserted with
+            INSERT ... ON CONFLICT {on_conflict}, e.g. 'DO NOTHING' or '(exchange, symbol, trade_id) DO NOTHING',
+            so duplicates (eg. messages re-published after a reconnect) do not cost the rest of the batch.
+        pool_size: int
+            Number of database connections. With copy=True up to pool_size batches are written concurrently,
+            so rows from different batches may be committed out of order.
         """
-        self.conn = None
+        self.pool = None
         self.table = table if table else self.default_table
         self.custom_columns = custom_columns
         self.numeric_type = numeric_type
@@ -46,11 +64,26 @@ class PostgresCallback(BackendQueue):
         # Parse INSERT statement with user-specified column names
         # Performed at init to avoid repeated list joins
         self.insert_statement = f"INSERT INTO {self.table} ({','.join([v for v in self.custom_columns.values()])}) VALUES " if custom_columns else None
+        self.copy = copy
+        self.on_conflict = on_conflict
+        self.pool_size = pool_size
+        self.columns = list(custom_columns.values()) if custom_columns else ['timestamp', 'receipt_timestamp', 'exchange', 'symbol', *self.default_columns]
+        self.schema, _, self.table_name = self.table.rpartition('.')
+        self.staging_table = f"cryptofeed_staging_{self.table_name}"
         self.running = True
 
+    @property
+    def conn(self):
+        """
+        the asyncpg connection pool (None until the writer connects), which replaced the single connection
+        """
+        return self.pool
+
     async def _connect(self):
-        if self.conn is None:
-            self.conn = await asyncpg.connect(user=self.user, password=self.pw, database=self.db, host=self.host, port=self.port)
+        if self.pool is None:
+            import asyncpg
+
+            self.pool = await asyncpg.create_pool(user=self.user, password=self.pw, database=self.db, host=self.host, port=self.port, min_size=1, max_size=self.pool_size)
 
     def format(self, data: Tuple):
         feed = data[0]
@@ -79,7 +112,31 @@ class PostgresCallback(BackendQueue):
         sql_string = ','.join(str(s) if isinstance(s, float) or s == 'NULL' else "'" + str(s) + "'" for s in sequence_gen)
         return f"({sql_string})"
 
+    def record(self, data: Tuple) -> tuple:
+        """
+        row for COPY, in the order of self.columns
+        """
+        if self.custom_columns:
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, json.dumps(data))
+
+    def _custom_record(self, data: Tuple) -> tuple:
+        d = {
+            **data[4],
+            **{
+                'exchange': data[0],
+                'symbol': data[1],
+                'timestamp': data[2],
+                'receipt': data[3],
+            }
+        }
+        return tuple(d[field] for field in self.custom_columns.keys())
+
     async def writer(self):
+        tasks = set()
+        limit = asyncio.Semaphore(self.pool_size)
+
         while self.running:
             async with self.read_queue() as updates:
                 if len(updates) > 0:
@@ -88,26 +145,72 @@ class PostgresCallback(BackendQueue):
                         ts = dt.utcfromtimestamp(data['timestamp']) if data['timestamp'] else None
                         rts = dt.utcfromtimestamp(data['receipt_timestamp'])
                         batch.append((data['exchange'], data['symbol'], ts, rts, data))
-                    await self.write_batch(batch)
+                    if self.copy and self.pool_size > 1:
+                        await self._connect()
+                        await limit.acquire()
+                        task = asyncio.create_task(self._write_task(batch, limit))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    else:
+                        await self.write_batch(batch)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def _write_task(self, batch: list, limit: asyncio.Semaphore):
+        try:
+            await self.write_batch(batch)
+        finally:
+            limit.release()
 
     async def write_batch(self, updates: list):
+        from asyncpg import UniqueViolationError
+
         await self._connect()
+        if self.copy:
+            await self._copy_batch(updates)
+            return
+
         args_str = ','.join([self.format(u) for u in updates])
 
-        async with self.conn.transaction():
-            try:
-                if self.custom_columns:
-                    await self.conn.execute(self.insert_statement + args_str)
-                else:
-                    await self.conn.execute(f"INSERT INTO {self.table} VALUES {args_str}")
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                try:
+                    if self.custom_columns:
+                        await conn.execute(self.insert_statement + args_str)
+                    else:
+                        await conn.execute(f"INSERT INTO {self.table} VALUES {args_str}")
+
+                except UniqueViolationError:
+                    # when restarting a subscription, some exchanges will re-publish a few messages
+                    pass
+
+    async def _copy_batch(self, updates: list):
+        from asyncpg import UniqueViolationError
+
+        records = [self.record(u) for u in updates]
+
+        async with self.pool.acquire() as conn:
+            if self.on_conflict is None:
+                try:
+                    await conn.copy_records_to_table(self.table_name, records=records, columns=self.columns, schema_name=self.schema or None)
+                except UniqueViolationError:
+                    LOG.warning("%s: dropped a batch of %d rows containing a duplicate, set on_conflict to insert the rest", self.table, len(records))
+                return
 
-            except asyncpg.UniqueViolationError:
-                # when restarting a subscription, some exchanges will re-publish a few messages
-                pass
+            columns = ','.join(self.columns)
+            async with conn.transaction():
+                # temporary tables are per connection, rows are removed when the transaction commits
+                await conn.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging_table} (LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+                await conn.copy_records_to_table(self.staging_table, records=records, columns=self.columns)
+                await conn.execute(f"INSERT INTO {self.table} ({columns}) SELECT {columns} FROM {self.staging_table} ON CONFLICT {self.on_conflict}")
 
 
 class TradePostgres(PostgresCallback, BackendCallback):
     default_table = TRADES
+    default_columns = ('side', 'amount', 'price', 'trade_id', 'order_type')
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -118,9 +221,16 @@ class TradePostgres(PostgresCallback, BackendCallback):
             otype = f"'{data['type']}'" if data['type'] else 'NULL'
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}','{data['side']}',{data['amount']},{data['price']},{id},{otype})"
 
+    def record(self, data: Tuple) -> tuple:
+        if self.custom_columns:
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, data['side'], data['amount'], data['price'], data['id'], data['type'])
+
 
 class FundingPostgres(PostgresCallback, BackendCallback):
     default_table = FUNDING
+    default_columns = ('mark_price', 'rate', 'next_funding_time', 'predicted_rate')
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -132,9 +242,18 @@ class FundingPostgres(PostgresCallback, BackendCallback):
             ts = dt.utcfromtimestamp(data['next_funding_time']) if data['next_funding_time'] else 'NULL'
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}',{data['mark_price'] if data['mark_price'] else 'NULL'},{data['rate']},'{ts}',{data['predicted_rate']})"
 
+    def record(self, data: Tuple) -> tuple:
+        next_funding_time = dt.utcfromtimestamp(data[4]['next_funding_time']) if data[4]['next_funding_time'] else None
+        if self.custom_columns:
+            data[4]['next_funding_time'] = next_funding_time
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, data['mark_price'], data['rate'], next_funding_time, data['predicted_rate'])
+
 
 class TickerPostgres(PostgresCallback, BackendCallback):
     default_table = TICKER
+    default_columns = ('bid', 'ask')
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -143,9 +262,16 @@ class TickerPostgres(PostgresCallback, BackendCallback):
             exchange, symbol, timestamp, receipt, data = data
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}',{data['bid']},{data['ask']})"
 
+    def record(self, data: Tuple) -> tuple:
+        if self.custom_columns:
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, data['bid'], data['ask'])
+
 
 class OpenInterestPostgres(PostgresCallback, BackendCallback):
     default_table = OPEN_INTEREST
+    default_columns = ('open_interest',)
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -154,9 +280,16 @@ class OpenInterestPostgres(PostgresCallback, BackendCallback):
             exchange, symbol, timestamp, receipt, data = data
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}',{data['open_interest']})"
 
+    def record(self, data: Tuple) -> tuple:
+        if self.custom_columns:
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, data['open_interest'])
+
 
 class IndexPostgres(PostgresCallback, BackendCallback):
     default_table = INDEX
+    default_columns = ('price',)
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -165,9 +298,16 @@ class IndexPostgres(PostgresCallback, BackendCallback):
             exchange, symbol, timestamp, receipt, data = data
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}',{data['price']})"
 
+    def record(self, data: Tuple) -> tuple:
+        if self.custom_columns:
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, data['price'])
+
 
 class LiquidationsPostgres(PostgresCallback, BackendCallback):
     default_table = LIQUIDATIONS
+    default_columns = ('side', 'quantity', 'price', 'trade_id', 'status')
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -176,9 +316,16 @@ class LiquidationsPostgres(PostgresCallback, BackendCallback):
             exchange, symbol, timestamp, receipt, data = data
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}','{data['side']}',{data['quantity']},{data['price']},'{data['id']}','{data['status']}')"
 
+    def record(self, data: Tuple) -> tuple:
+        if self.custom_columns:
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, data['side'], data['quantity'], data['price'], data['id'], data['status'])
+
 
 class BookPostgres(PostgresCallback, BackendBookCallback):
     default_table = 'book'
+    default_columns = ('data',)
 
     def __init__(self, *args, snapshots_only=False, snapshot_interval=1000, **kwargs):
         self.snapshots_only = snapshots_only
@@ -206,9 +353,18 @@ class BookPostgres(PostgresCallback, BackendBookCallback):
 
             return f"(DEFAULT,'{timestamp}','{receipt_timestamp}','{feed}','{symbol}','{json.dumps(data)}')"
 
+    def record(self, data: Tuple) -> tuple:
+        book = json.dumps({'snapshot': data[4]['book']} if 'book' in data[4] else {'delta': data[4]['delta']})
+        if self.custom_columns:
+            data[4]['data'] = book
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, _ = data
+        return (timestamp, receipt, exchange, symbol, book)
+
 
 class CandlesPostgres(PostgresCallback, BackendCallback):
     default_table = CANDLES
+    default_columns = ('candle_start', 'candle_stop', 'interval', 'trades', 'open', 'close', 'high', 'low', 'volume', 'closed')
 
     def format(self, data: Tuple):
         if self.custom_columns:
@@ -221,3 +377,13 @@ class CandlesPostgres(PostgresCallback, BackendCallback):
             open_ts = dt.utcfromtimestamp(data['start'])
             close_ts = dt.utcfromtimestamp(data['stop'])
             return f"(DEFAULT,'{timestamp}','{receipt}','{exchange}','{symbol}','{open_ts}','{close_ts}','{data['interval']}',{data['trades'] if data['trades'] is not None else 'NULL'},{data['open']},{data['close']},{data['high']},{data['low']},{data['volume']},{data['closed'] if data['closed'] else 'NULL'})"
+
+    def record(self, data: Tuple) -> tuple:
+        start = dt.utcfromtimestamp(data[4]['start'])
+        stop = dt.utcfromtimestamp(data[4]['stop'])
+        if self.custom_columns:
+            data[4]['start'] = start
+            data[4]['stop'] = stop
+            return self._custom_record(data)
+        exchange, symbol, timestamp, receipt, data = data
+        return (timestamp, receipt, exchange, symbol, start, stop, data['interval'], data['trades'], data['open'], data['close'], data['high'], data['low'], data['volume'], data['closed'])
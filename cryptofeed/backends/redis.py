@@ -6,7 +6,6 @@ associated with this software.
 '''
 from collections import defaultdict
 
-import aioredis
 from yapic import json
 
 from cryptofeed.backends.backend import BackendBookCallback, BackendCallback, BackendQueue
@@ -42,6 +41,8 @@ class RedisZSetCallback(RedisCallback):
         super().__init__(host=host, port=port, socket=socket, key=key, numeric_type=numeric_type, **kwargs)
 
     async def writer(self):
+        import aioredis
+
         conn = aioredis.from_url(self.redis)
 
         while self.running:
@@ -57,6 +58,8 @@ class RedisZSetCallback(RedisCallback):
 
 class RedisStreamCallback(RedisCallback):
     async def writer(self):
+        import aioredis
+
         conn = aioredis.from_url(self.redis)
 
         while self.running:
@@ -0,0 +1,171 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+import marshal
+from multiprocessing.shared_memory import SharedMemory
+import pickle
+import struct
+
+
+# head (owned by the reader) and tail (owned by the writer) are monotonically
+# increasing byte counts, kept on separate cache lines
+HEAD = struct.Struct('Q')
+TAIL = struct.Struct('Q')
+TAIL_OFFSET = 64
+DATA_OFFSET = 128
+LENGTH = struct.Struct('I')
+
+MARSHAL = 0
+PICKLE = 1
+
+
+def encode(data) -> bytes:
+    """
+    The dicts produced by to_dict() contain only str, float, int, bool, None and
+    nested dicts/lists unless a Decimal numeric_type is used, so marshal handles
+    nearly all of them. Anything else falls back to pickle.
+    """
+    try:
+        return bytes((MARSHAL,)) + marshal.dumps(data)
+    except ValueError:
+        return bytes((PICKLE,)) + pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(payload):
+    if payload[0] == MARSHAL:
+        return marshal.loads(payload[1:])
+    return pickle.loads(payload[1:])
+
+
+class RingBuffer:
+    """
+    Single producer, single consumer queue in shared memory.
+
+    Messages are length prefixed and written contiguously (wrapping around the
+    end of the buffer). The writer only advances the tail after the message has
+    been copied, and the reader only advances the head after it has decoded
+    everything between head and tail, so no locks are needed. A full buffer makes
+    the writer wait, an empty buffer makes the reader poll with backoff.
+    """
+    def __init__(self, size=2 ** 24, poll_interval=0.0001, max_poll_interval=0.005):
+        self.size = size
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.full_waits = 0
+        self.shm = SharedMemory(create=True, size=DATA_OFFSET + size)
+        self.owner = True
+        HEAD.pack_into(self.shm.buf, 0, 0)
+        TAIL.pack_into(self.shm.buf, TAIL_OFFSET, 0)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['shm'] = self.shm.name
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # child processes share the creator's resource tracker, which keeps a single
+        # registration per segment, the creating process unlinks it
+        self.shm = SharedMemory(name=state['shm'])
+        self.owner = False
+
+    @property
+    def head(self) -> int:
+        return HEAD.unpack_from(self.shm.buf, 0)[0]
+
+    @property
+    def tail(self) -> int:
+        return TAIL.unpack_from(self.shm.buf, TAIL_OFFSET)[0]
+
+    @property
+    def used(self) -> int:
+        return self.tail - self.head
+
+    @property
+    def fill_level(self) -> float:
+        """
+        fraction of the buffer holding unread messages
+        """
+        return self.used / self.size
+
+    def _copy_in(self, position: int, data):
+        start = position % self.size
+        end = start + len(data)
+        buf = self.shm.buf
+        if end <= self.size:
+            buf[DATA_OFFSET + start:DATA_OFFSET + end] = data
+        else:
+            split = self.size - start
+            buf[DATA_OFFSET + start:DATA_OFFSET + self.size] = data[:split]
+            buf[DATA_OFFSET:DATA_OFFSET + end - self.size] = data[split:]
+
+    def _copy_out(self, position: int, length: int):
+        start = position % self.size
+        end = start + length
+        buf = self.shm.buf
+        if end <= self.size:
+            return buf[DATA_OFFSET + start:DATA_OFFSET + end]
+        return bytes(buf[DATA_OFFSET + start:DATA_OFFSET + self.size]) + bytes(buf[DATA_OFFSET:DATA_OFFSET + end - self.size])
+
+    def _message(self, data) -> bytes:
+        payload = encode(data)
+        message = LENGTH.pack(len(payload)) + payload
+        if len(message) > self.size:
+            raise ValueError(f"message of {len(message)} bytes does not fit in a ring buffer of {self.size} bytes")
+        return message
+
+    def _write(self, message: bytes) -> bool:
+        tail = self.tail
+        if self.size - (tail - self.head) < len(message):
+            return False
+        self._copy_in(tail, message)
+        TAIL.pack_into(self.shm.buf, TAIL_OFFSET, tail + len(message))
+        return True
+
+    def put_nowait(self, data) -> bool:
+        """
+        Returns False (without writing) if the buffer does not have room for the message
+        """
+        return self._write(self._message(data))
+
+    async def put(self, data):
+        message = self._message(data)
+        if self._write(message):
+            return
+        self.full_waits += 1
+        delay = self.poll_interval
+        while not self._write(message):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def get_nowait(self) -> list:
+        """
+        Returns every message currently in the buffer
+        """
+        head = self.head
+        tail = self.tail
+        ret = []
+        while head < tail:
+            length = LENGTH.unpack(self._copy_out(head, LENGTH.size))[0]
+            ret.append(decode(self._copy_out(head + LENGTH.size, length)))
+            head += LENGTH.size + length
+        HEAD.pack_into(self.shm.buf, 0, head)
+        return ret
+
+    async def get(self) -> list:
+        delay = self.poll_interval
+        while True:
+            ret = self.get_nowait()
+            if ret:
+                return ret
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
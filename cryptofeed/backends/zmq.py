@@ -6,8 +6,6 @@ associated with this software.
 '''
 from collections import defaultdict
 
-import zmq
-import zmq.asyncio
 from yapic import json
 
 from cryptofeed.backends.backend import BackendQueue, BackendBookCallback, BackendCallback
@@ -23,6 +21,9 @@ class ZMQCallback(BackendQueue):
         self.running = True
 
     async def writer(self):
+        import zmq
+        import zmq.asyncio
+
         ctx = zmq.asyncio.Context.instance()
         con = ctx.socket(zmq.PUB)
         con.connect(self.url)
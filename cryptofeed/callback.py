@@ -5,19 +5,132 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 import inspect
+import logging
+import time
+
+from cryptofeed.defines import ASK, BID, BLOCK, COALESCE, DROP_OLDEST
+from cryptofeed.types import L3Book, OrderBook
+
+
+LOG = logging.getLogger('feedhandler')
+
+
+class SyncBatcher:
+    """
+    Runs a synchronous function on dedicated threads, in batches. Calls are collected
+    for up to `window` seconds (or `max_batch` calls) and handed to a thread in one go.
+    Calls with the same key (symbol) always go to the same thread, so they run in order.
+
+    depth: calls queued or waiting on a thread
+    lag: seconds between the first call of the most recent batch being queued and the batch starting
+    """
+    def __init__(self, func, max_batch=100, window=0.01, workers=1, max_pending=8):
+        self.func = func
+        self.max_batch = max_batch
+        self.window = window
+        self.workers = workers
+        # batches waiting on a thread before submit() applies back pressure
+        self.max_pending = max_pending
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._executors = None
+        self._pending = [[] for _ in range(workers)]
+        self._timers = [None] * workers
+        self._futures = [deque() for _ in range(workers)]
+        self._submitted = 0
+        self._completed = [0] * workers
+
+    @property
+    def depth(self) -> int:
+        return self._submitted - sum(self._completed)
+
+    async def submit(self, key, *args):
+        if self._executors is None:
+            # created on first use so the batcher can be pickled to a FeedHandler shard
+            self._executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix='cryptofeed-callback') for _ in range(self.workers)]
+
+        index = hash(key) % self.workers if self.workers > 1 else 0
+        pending = self._pending[index]
+        pending.append((time.time(), args))
+        self._submitted += 1
+
+        if len(pending) >= self.max_batch:
+            self._dispatch(index)
+            futures = self._futures[index]
+            while len(futures) > self.max_pending:
+                await futures.popleft()
+        elif self._timers[index] is None:
+            self._timers[index] = asyncio.get_running_loop().call_later(self.window, self._dispatch, index)
+
+    def _dispatch(self, index: int):
+        if self._timers[index] is not None:
+            self._timers[index].cancel()
+            self._timers[index] = None
+
+        futures = self._futures[index]
+        while futures and futures[0].done():
+            futures.popleft()
+
+        batch = self._pending[index]
+        if batch:
+            self._pending[index] = []
+            futures.append(asyncio.get_running_loop().run_in_executor(self._executors[index], self._run, index, batch))
+
+    def _run(self, index: int, batch: list):
+        self.lag = time.time() - batch[0][0]
+        if self.lag > self.max_lag:
+            self.max_lag = self.lag
+
+        for _, args in batch:
+            try:
+                self.func(*args)
+            except Exception:
+                LOG.error("callback %s raised an exception", self.func, exc_info=True)
+        self._completed[index] += len(batch)
+
+    async def stop(self):
+        if self._executors is None:
+            return
+        for index in range(self.workers):
+            self._dispatch(index)
+            while self._futures[index]:
+                await self._futures[index].popleft()
+        for executor in self._executors:
+            executor.shutdown()
+        self._executors = None
 
 
 class Callback:
-    def __init__(self, callback):
+    def __init__(self, callback, batch_size=0, batch_window=0.01, batch_workers=1):
+        """
+        batch_size: int
+            if the callback is synchronous and batch_size is set, calls are batched
+            (see SyncBatcher) rather than each being run in the default executor.
+            Calls for a symbol are run in order.
+        batch_window: float
+            maximum time, in seconds, a call waits for its batch to fill
+        batch_workers: int
+            number of threads the batches are spread across (by symbol)
+        """
         self.callback = callback
         self.is_async = inspect.iscoroutinefunction(callback)
+        self.batcher = None
+        if batch_size and callback is not None and not self.is_async:
+            self.batcher = SyncBatcher(callback, max_batch=batch_size, window=batch_window, workers=batch_workers)
+            # flush outstanding batches when the feed shuts down
+            self.stop = self.batcher.stop
 
     async def __call__(self, obj, receipt_timestamp):
         if self.callback is None:
             return
         elif self.is_async:
             await self.callback(obj, receipt_timestamp)
+        elif self.batcher:
+            await self.batcher.submit(getattr(obj, 'symbol', None), (obj, receipt_timestamp))
         else:
             loop = asyncio.get_event_loop()
             await loop.run_in_executor(None, self.callback, (obj, receipt_timestamp))
@@ -73,3 +186,180 @@ class UserFillsCallback(Callback):
 
 class L1BookCallback(Callback):
     pass
+
+
+def _merge_delta(side: dict, delta: list):
+    # L2 levels are (price, size) and L3 orders (order id, price, size), either way the
+    # first field identifies the level or order and a later update replaces it
+    for update in delta:
+        side[update[0]] = update
+
+
+def _pending_entry(data, receipt_timestamp) -> list:
+    """
+    [update, receipt_timestamp, bid delta, ask delta] for a queued update. The feed keeps
+    updating its book (and the update fields) while the update is queued, so books are
+    copied, and their delta is kept as maps of price (or order id) to update so later deltas
+    can be merged in.
+    """
+    if not isinstance(data, OrderBook):
+        return [data, receipt_timestamp, None, None]
+    data = copy(data)
+    if data.delta is None:
+        return [data, receipt_timestamp, None, None]
+    entry = [data, receipt_timestamp, {}, {}]
+    _merge_delta(entry[2], data.delta[BID])
+    _merge_delta(entry[3], data.delta[ASK])
+    return entry
+
+
+def _merge_entry(entry: list, data, receipt_timestamp):
+    if isinstance(data, OrderBook):
+        data = copy(data)
+        if data.delta is None:
+            # a snapshot replaces the pending deltas
+            entry[2] = entry[3] = None
+        elif entry[2] is not None:
+            _merge_delta(entry[2], data.delta[BID])
+            _merge_delta(entry[3], data.delta[ASK])
+    entry[0] = data
+    entry[1] = receipt_timestamp
+
+
+def _pending_update(entry: list):
+    data = entry[0]
+    if isinstance(data, OrderBook):
+        if entry[2] is None:
+            # deltas queued after a snapshot are delivered as part of the snapshot
+            data.delta = None
+        elif isinstance(data.book, L3Book):
+            # orders keep the order they were first updated in
+            data.delta = {BID: list(entry[2].values()), ASK: list(entry[3].values())}
+        else:
+            data.delta = {BID: sorted(entry[2].values(), reverse=True), ASK: sorted(entry[3].values())}
+    return data
+
+
+class QueuedCallback:
+    """
+    Runs a slow callback in its own task, behind a bounded queue, so it does not add
+    latency to the feed or to the other callbacks registered for the channel.
+
+    max_size: int
+        maximum number of queued updates
+    overflow: str
+        what to do when the queue is full.
+        BLOCK: wait for the callback to catch up (back pressure on the feed)
+        DROP_OLDEST: discard the oldest queued update
+        COALESCE: keep only the latest update per exchange/symbol (for books and tickers).
+            The deltas of coalesced book updates are merged into one delta, by price for L2
+            books and by order id for L3 books (a pending snapshot stays a snapshot).
+
+    Books are queued as a copy sharing the feed's live book, with the update fields (delta,
+    sequence number, timestamp) of the update that was queued.
+    """
+    def __init__(self, callback, max_size=10000, overflow=BLOCK):
+        if overflow not in (BLOCK, DROP_OLDEST, COALESCE):
+            raise ValueError(f"overflow must be one of {(BLOCK, DROP_OLDEST, COALESCE)}")
+        self.callback = callback
+        self.max_size = max_size
+        self.overflow = overflow
+        self.queue = OrderedDict() if overflow == COALESCE else deque()
+        self.dropped = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.worker = None
+        self._not_empty = None
+        self._not_full = None
+        self._stop = object()
+
+    @property
+    def qsize(self) -> int:
+        return len(self.queue)
+
+    def start(self, loop: asyncio.AbstractEventLoop, multiprocess=False):
+        if self.worker is not None:
+            return
+        if hasattr(self.callback, 'start'):
+            self.callback.start(loop, multiprocess=multiprocess)
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.worker = loop.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            # the stop marker is queued after any pending updates, and ignores max_size
+            self._put(self._stop, None)
+            await self.worker
+            self.worker = None
+        if hasattr(self.callback, 'stop'):
+            await self.callback.stop()
+
+    def _put(self, obj, receipt_timestamp):
+        if self.overflow == COALESCE:
+            key = self._stop if obj is self._stop else (obj.exchange, obj.symbol)
+            self.queue[key] = _pending_entry(obj, receipt_timestamp)
+        else:
+            if isinstance(obj, OrderBook):
+                obj = copy(obj)
+            self.queue.append((obj, receipt_timestamp))
+        self._not_empty.set()
+
+    async def __call__(self, obj, receipt_timestamp):
+        if self.worker is None:
+            self.start(asyncio.get_running_loop())
+
+        if self.overflow == COALESCE:
+            entry = self.queue.get((obj.exchange, obj.symbol))
+            if entry is not None:
+                _merge_entry(entry, obj, receipt_timestamp)
+                self.coalesced += 1
+                return
+
+        while len(self.queue) >= self.max_size:
+            if self.overflow == DROP_OLDEST:
+                self.queue.popleft()
+                self.dropped += 1
+            else:
+                self._not_full.clear()
+                await self._not_full.wait()
+        self._put(obj, receipt_timestamp)
+
+    async def _run(self):
+        while True:
+            while not self.queue:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+
+            if self.overflow == COALESCE:
+                _, entry = self.queue.popitem(last=False)
+                obj, receipt_timestamp = _pending_update(entry), entry[1]
+            else:
+                obj, receipt_timestamp = self.queue.popleft()
+            self._not_full.set()
+
+            if obj is self._stop:
+                return
+            self.delivered += 1
+            try:
+                await self.callback(obj, receipt_timestamp)
+            except Exception:
+                LOG.error("%s: callback %s raised an exception", getattr(obj, 'exchange', None), self.callback, exc_info=True)
+
+
+class ConflatedCallback(QueuedCallback):
+    """
+    QueuedCallback with the COALESCE policy and no size limit: updates are delivered at
+    the callback's own pace, and while the callback is busy only the latest update per
+    exchange and symbol is kept, with the deltas of pending book updates merged, so
+    memory is bounded by the number of symbols no matter how far behind the callback is.
+
+    `conflated` counts the updates merged into another one.
+    """
+    def __init__(self, callback):
+        super().__init__(callback, max_size=float('inf'), overflow=COALESCE)
+
+    @property
+    def conflated(self) -> int:
+        return self.coalesced
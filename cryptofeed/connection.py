@@ -17,12 +17,16 @@ from dataclasses import dataclass
 from aiohttp.client_reqrep import ClientResponse
 import requests
 import websockets
+from websockets.exceptions import ProtocolError
+from websockets.frames import OP_BINARY, OP_CONT, OP_TEXT
+from websockets.legacy.client import WebSocketClientProtocol
 import aiohttp
 from aiohttp.typedefs import StrOrURL
 from yapic import json as json_parser
 
 from cryptofeed.exceptions import ConnectionClosed
 from cryptofeed.symbols import str_to_symbol
+from cryptofeed.util.rate_limit import DEFAULT_PRIORITY, RateLimiter
 
 
 LOG = logging.getLogger('feedhandler')
@@ -122,15 +126,27 @@ class AsyncConnection(Connection):
 
 
 class HTTPAsyncConn(AsyncConnection):
-    def __init__(self, conn_id: str, proxy: StrOrURL = None):
+    def __init__(self, conn_id: str, proxy: StrOrURL = None, rate_limiter: RateLimiter = None):
         """
         conn_id: str
             id associated with the connection
         proxy: str, URL
             proxy url (GET only)
+        rate_limiter: RateLimiter
+            if set, every request (and retry) first acquires its weight from the limiter,
+            and a 429 response pauses the limiter for the retry delay
         """
         super().__init__(f'{conn_id}.http.{self.conn_count}')
         self.proxy = proxy
+        self.rate_limiter = rate_limiter
+
+    async def _acquire(self, weight: float, priority: int):
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(weight, priority)
+
+    def _rate_limited(self, retry_delay: float):
+        if self.rate_limiter:
+            self.rate_limiter.backoff(retry_delay)
 
     @property
     def is_open(self) -> bool:
@@ -152,12 +168,13 @@ class HTTPAsyncConn(AsyncConnection):
             self.sent = 0
             self.received = 0
 
-    async def read(self, address: str, header=None, params=None, return_headers=False, retry_count=0, retry_delay=60) -> str:
+    async def read(self, address: str, header=None, params=None, return_headers=False, retry_count=0, retry_delay=60, weight=1, priority=DEFAULT_PRIORITY) -> str:
         if not self.is_open:
             await self._open()
 
         LOG.debug("%s: requesting data from %s", self.id, address)
         while True:
+            await self._acquire(weight, priority)
             async with self.conn.get(address, headers=header, params=params, proxy=self.proxy) as response:
                 data = await response.text()
                 self.last_message = time.time()
@@ -167,6 +184,7 @@ class HTTPAsyncConn(AsyncConnection):
                 if response.status == 429 and retry_count:
                     LOG.warning("%s: encountered a rate limit for address %s, retrying in 60 seconds", self.id, address)
                     retry_count -= 1
+                    self._rate_limited(retry_delay)
                     if retry_count < 0:
                         self._handle_error(response, data)
                     await asyncio.sleep(retry_delay)
@@ -176,11 +194,12 @@ class HTTPAsyncConn(AsyncConnection):
                     return data, response.headers
                 return data
 
-    async def write(self, address: str, msg: str, header=None, retry_count=0, retry_delay=60) -> str:
+    async def write(self, address: str, msg: str, header=None, retry_count=0, retry_delay=60, weight=1, priority=DEFAULT_PRIORITY) -> str:
         if not self.is_open:
             await self._open()
 
         while True:
+            await self._acquire(weight, priority)
             async with self.conn.post(address, data=msg, headers=header) as response:
                 self.sent += 1
                 data = await response.read()
@@ -189,6 +208,7 @@ class HTTPAsyncConn(AsyncConnection):
                 if response.status == 429 and retry_count:
                     LOG.warning("%s: encountered a rate limit for address %s, retrying in 60 seconds", self.id, address)
                     retry_count -= 1
+                    self._rate_limited(retry_delay)
                     if retry_count < 0:
                         self._handle_error(response, data)
                     await asyncio.sleep(retry_delay)
@@ -196,11 +216,12 @@ class HTTPAsyncConn(AsyncConnection):
                 self._handle_error(response, data)
                 return data
 
-    async def delete(self, address: str, header=None, retry_count=0, retry_delay=60) -> str:
+    async def delete(self, address: str, header=None, retry_count=0, retry_delay=60, weight=1, priority=DEFAULT_PRIORITY) -> str:
         if not self.is_open:
             await self._open()
 
         while True:
+            await self._acquire(weight, priority)
             async with self.conn.delete(address, headers=header) as response:
                 self.sent += 1
                 data = await response.read()
@@ -209,6 +230,7 @@ class HTTPAsyncConn(AsyncConnection):
                 if response.status == 429 and retry_count:
                     LOG.warning("%s: encountered a rate limit for address %s, retrying in 60 seconds", self.id, address)
                     retry_count -= 1
+                    self._rate_limited(retry_delay)
                     if retry_count < 0:
                         response.raise_for_status()
                     await asyncio.sleep(retry_delay)
@@ -282,14 +304,46 @@ class HTTPConcurrentPoll(HTTPPoll):
                 raise tasks.exception()
 
 
+class BytesClientProtocol(WebSocketClientProtocol):
+    """
+    Websocket client protocol that returns text messages as their UTF-8 bytes instead of
+    decoding them to str. The JSON parser accepts bytes (and validates the encoding), so
+    the decode, and the str copy of every message, is skipped.
+    """
+    async def read_message(self):
+        frame = await self.read_data_frame(max_size=self.max_size)
+        if frame is None:
+            return None
+        if frame.opcode != OP_TEXT and frame.opcode != OP_BINARY:
+            raise ProtocolError("unexpected opcode")
+        if frame.fin:
+            return frame.data
+
+        # fragmented message
+        fragments = [frame.data]
+        size = len(frame.data)
+        while not frame.fin:
+            frame = await self.read_data_frame(max_size=None if self.max_size is None else self.max_size - size)
+            if frame is None:
+                raise ProtocolError("incomplete fragmented message")
+            if frame.opcode != OP_CONT:
+                raise ProtocolError("unexpected opcode")
+            fragments.append(frame.data)
+            size += len(frame.data)
+        return b''.join(fragments)
+
+
 class WSAsyncConn(AsyncConnection):
 
-    def __init__(self, address: str, conn_id: str, authentication=None, subscription=None, **kwargs):
+    def __init__(self, address: str, conn_id: str, authentication=None, subscription=None, decode=True, **kwargs):
         """
         address: str
             the websocket address to connect to
         conn_id: str
             the identifier of this connection
+        decode: bool
+            if False, text messages are read as bytes (see BytesClientProtocol). Only for
+            feeds whose message handler accepts bytes.
         kwargs:
             passed into the websocket connection.
         """
@@ -297,6 +351,8 @@ class WSAsyncConn(AsyncConnection):
             raise ValueError(f'Invalid address, must be a wss address. Provided address is: {address!r}')
         self.address = address
         super().__init__(f'{conn_id}.ws.{self.conn_count}', authentication=authentication, subscription=subscription)
+        if not decode:
+            kwargs.setdefault('create_protocol', BytesClientProtocol)
         self.ws_kwargs = kwargs
 
     @property
@@ -134,6 +134,16 @@ GET = 'GET'
 DELETE = 'DELETE'
 POST = 'POST'
 
+# Numeric modes
+DECIMAL = 'decimal'
+FLOAT = 'float'
+SCALED_INT = 'scaled_int'
+
+# Callback queue overflow policies
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+COALESCE = 'coalesce'
+
 
 """
 L2 Orderbook Layout
@@ -45,6 +45,8 @@ class Exchange:
 
         self.ignore_invalid_instruments = self.config.ignore_invalid_instruments
 
+        if self.config.symbol_cache and Symbols.cache is None:
+            Symbols.enable_cache(**(self.config.symbol_cache if isinstance(self.config.symbol_cache, dict) else {}))
         if not Symbols.populated(self.id):
             self.symbol_mapping()
         self.normalized_symbol_mapping, _ = Symbols.get(self.id)
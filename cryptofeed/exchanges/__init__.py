@@ -4,95 +4,113 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+from collections.abc import MutableMapping
+from importlib import import_module
+
 from cryptofeed.defines import *
 from cryptofeed.defines import FTX as FTX_str, EXX as EXX_str, FMFW as FMFW_str, OKX as OKX_str
-from .bitdotcom import BitDotCom
-from .phemex import Phemex
-from .ascendex import AscendEX
-from .ascendex_futures import AscendEXFutures
-from .bequant import Bequant
-from .binance import Binance
-from .binance_delivery import BinanceDelivery
-from .binance_futures import BinanceFutures
-from .binance_us import BinanceUS
-from .fmfw import FMFW
-from .bitfinex import Bitfinex
-from .bitflyer import Bitflyer
-from .bitget import Bitget
-from .bithumb import Bithumb
-from .bitmex import Bitmex
-from .bitstamp import Bitstamp
-from .bittrex import Bittrex
-from .blockchain import Blockchain
-from .bybit import Bybit
-from .coinbase import Coinbase
-from .cryptodotcom import CryptoDotCom
-from .delta import Delta
-from .deribit import Deribit
-from .dydx import dYdX
-from .exx import EXX
-from .ftx import FTX
-from .ftx_us import FTXUS
-from .ftx_tr import FTXTR
-from .gateio import Gateio
-from .gemini import Gemini
-from .hitbtc import HitBTC
-from .huobi import Huobi
-from .huobi_dm import HuobiDM
-from .huobi_swap import HuobiSwap
-from .independent_reserve import IndependentReserve
-from .kraken import Kraken
-from .kraken_futures import KrakenFutures
-from .kucoin import KuCoin
-from .okcoin import OKCoin
-from .okx import OKX
-from .poloniex import Poloniex
-from .probit import Probit
-from .upbit import Upbit
 
-# Maps string name to class name for use with config
-EXCHANGE_MAP = {
-    ASCENDEX: AscendEX,
-    ASCENDEX_FUTURES: AscendEXFutures,
-    BEQUANT: Bequant,
-    BINANCE_DELIVERY: BinanceDelivery,
-    BINANCE_FUTURES: BinanceFutures,
-    BINANCE_US: BinanceUS,
-    BINANCE: Binance,
-    FMFW_str: FMFW,
-    BITDOTCOM: BitDotCom,
-    BITFINEX: Bitfinex,
-    BITFLYER: Bitflyer,
-    BITGET: Bitget,
-    BITHUMB: Bithumb,
-    BITMEX: Bitmex,
-    BITSTAMP: Bitstamp,
-    BITTREX: Bittrex,
-    BLOCKCHAIN: Blockchain,
-    BYBIT: Bybit,
-    COINBASE: Coinbase,
-    CRYPTODOTCOM: CryptoDotCom,
-    DERIBIT: Deribit,
-    DELTA: Delta,
-    DYDX: dYdX,
-    EXX_str: EXX,
-    FTX_str: FTX,
-    FTX_US: FTXUS,
-    FTX_TR: FTXTR,
-    GATEIO: Gateio,
-    GEMINI: Gemini,
-    HITBTC: HitBTC,
-    HUOBI_DM: HuobiDM,
-    HUOBI_SWAP: HuobiSwap,
-    HUOBI: Huobi,
-    INDEPENDENT_RESERVE: IndependentReserve,
-    KRAKEN_FUTURES: KrakenFutures,
-    KRAKEN: Kraken,
-    KUCOIN: KuCoin,
-    OKCOIN: OKCoin,
-    OKX_str: OKX,
-    PHEMEX: Phemex,
-    POLONIEX: Poloniex,
-    PROBIT: Probit,
-    UPBIT: Upbit,
+
+# these names are exchange classes in this package, not the exchange id strings from defines
+del FTX, EXX, FMFW, OKX
+
+# exchange id -> (module, class name). Exchange modules are only imported when they are used
+_EXCHANGES = {
+    ASCENDEX: ('.ascendex', 'AscendEX'),
+    ASCENDEX_FUTURES: ('.ascendex_futures', 'AscendEXFutures'),
+    BEQUANT: ('.bequant', 'Bequant'),
+    BINANCE_DELIVERY: ('.binance_delivery', 'BinanceDelivery'),
+    BINANCE_FUTURES: ('.binance_futures', 'BinanceFutures'),
+    BINANCE_US: ('.binance_us', 'BinanceUS'),
+    BINANCE: ('.binance', 'Binance'),
+    FMFW_str: ('.fmfw', 'FMFW'),
+    BITDOTCOM: ('.bitdotcom', 'BitDotCom'),
+    BITFINEX: ('.bitfinex', 'Bitfinex'),
+    BITFLYER: ('.bitflyer', 'Bitflyer'),
+    BITGET: ('.bitget', 'Bitget'),
+    BITHUMB: ('.bithumb', 'Bithumb'),
+    BITMEX: ('.bitmex', 'Bitmex'),
+    BITSTAMP: ('.bitstamp', 'Bitstamp'),
+    BITTREX: ('.bittrex', 'Bittrex'),
+    BLOCKCHAIN: ('.blockchain', 'Blockchain'),
+    BYBIT: ('.bybit', 'Bybit'),
+    COINBASE: ('.coinbase', 'Coinbase'),
+    CRYPTODOTCOM: ('.cryptodotcom', 'CryptoDotCom'),
+    DERIBIT: ('.deribit', 'Deribit'),
+    DELTA: ('.delta', 'Delta'),
+    DYDX: ('.dydx', 'dYdX'),
+    EXX_str: ('.exx', 'EXX'),
+    FTX_str: ('.ftx', 'FTX'),
+    FTX_US: ('.ftx_us', 'FTXUS'),
+    FTX_TR: ('.ftx_tr', 'FTXTR'),
+    GATEIO: ('.gateio', 'Gateio'),
+    GEMINI: ('.gemini', 'Gemini'),
+    HITBTC: ('.hitbtc', 'HitBTC'),
+    HUOBI_DM: ('.huobi_dm', 'HuobiDM'),
+    HUOBI_SWAP: ('.huobi_swap', 'HuobiSwap'),
+    HUOBI: ('.huobi', 'Huobi'),
+    INDEPENDENT_RESERVE: ('.independent_reserve', 'IndependentReserve'),
+    KRAKEN_FUTURES: ('.kraken_futures', 'KrakenFutures'),
+    KRAKEN: ('.kraken', 'Kraken'),
+    KUCOIN: ('.kucoin', 'KuCoin'),
+    OKCOIN: ('.okcoin', 'OKCoin'),
+    OKX_str: ('.okx', 'OKX'),
+    PHEMEX: ('.phemex', 'Phemex'),
+    POLONIEX: ('.poloniex', 'Poloniex'),
+    PROBIT: ('.probit', 'Probit'),
+    UPBIT: ('.upbit', 'Upbit'),
 }
+_CLASSES = {cls: module for module, cls in _EXCHANGES.values()}
+
+
+class ExchangeMap(MutableMapping):
+    """
+    Maps exchange id to exchange class, importing an exchange's module the first time its
+    class is looked up. Membership tests, len() and keys() do not import anything
+    """
+    def __init__(self, exchanges: dict):
+        self._exchanges = dict(exchanges)
+        self._classes = {}
+
+    def __getitem__(self, exchange: str):
+        cls = self._classes.get(exchange)
+        if cls is None:
+            module, name = self._exchanges[exchange]
+            cls = self._classes[exchange] = getattr(import_module(module, __name__), name)
+        return cls
+
+    def __setitem__(self, exchange: str, cls):
+        self._exchanges[exchange] = (cls.__module__, cls.__name__)
+        self._classes[exchange] = cls
+
+    def __delitem__(self, exchange: str):
+        del self._exchanges[exchange]
+        self._classes.pop(exchange, None)
+
+    def __contains__(self, exchange) -> bool:
+        return exchange in self._exchanges
+
+    def __iter__(self):
+        return iter(self._exchanges)
+
+    def __len__(self) -> int:
+        return len(self._exchanges)
+
+    def __repr__(self) -> str:
+        return f'ExchangeMap({list(self._exchanges)})'
+
+
+# Maps string name to class name for use with config
+EXCHANGE_MAP = ExchangeMap(_EXCHANGES)
+
+
+def __getattr__(name: str):
+    if name in _CLASSES:
+        cls = getattr(import_module(_CLASSES[name], __name__), name)
+        globals()[name] = cls
+        return cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_CLASSES))
@@ -5,9 +5,10 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import logging
-from asyncio import create_task, sleep
+from asyncio import Semaphore, create_task, sleep
 from collections import defaultdict
 from decimal import Decimal
+from functools import partial
 import requests
 import time
 from typing import Dict, Union, Tuple
@@ -16,11 +17,12 @@ from urllib.parse import urlencode
 from yapic import json
 
 from cryptofeed.connection import AsyncConnection, HTTPPoll, HTTPConcurrentPoll, RestEndpoint, Routes, WebsocketEndpoint
-from cryptofeed.defines import ASK, BALANCES, BID, BINANCE, BUY, CANDLES, FUNDING, FUTURES, L2_BOOK, LIMIT, LIQUIDATIONS, MARKET, OPEN_INTEREST, ORDER_INFO, PERPETUAL, SELL, SPOT, TICKER, TRADES, FILLED, UNFILLED
+from cryptofeed.defines import ASK, BALANCES, BID, BINANCE, BUY, CANDLES, DECIMAL, FLOAT, FUNDING, FUTURES, L2_BOOK, LIMIT, LIQUIDATIONS, MARKET, OPEN_INTEREST, ORDER_INFO, PERPETUAL, SCALED_INT, SELL, SPOT, TICKER, TRADES, FILLED, UNFILLED
 from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exchanges.mixins.binance_rest import BinanceRestMixin
 from cryptofeed.types import Trade, Ticker, Candle, Liquidation, Funding, OrderBook, OrderInfo, Balance
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 REFRESH_SNAPSHOT_MIN_INTERVAL_SECONDS = 60
 
@@ -29,7 +31,7 @@ LOG = logging.getLogger('feedhandler')
 
 class Binance(Feed, BinanceRestMixin):
     id = BINANCE
-    websocket_endpoints = [WebsocketEndpoint('wss://stream.binance.com:9443', sandbox='wss://testnet.binance.vision')]
+    websocket_endpoints = [WebsocketEndpoint('wss://stream.binance.com:9443', sandbox='wss://testnet.binance.vision', options={'decode': False})]
     rest_endpoints = [RestEndpoint('https://api.binance.com', routes=Routes('/api/v3/exchangeInfo', l2book='/api/v3/depth?symbol={}&limit={}', authentication='/api/v3/userDataStream'), sandbox='https://testnet.binance.vision')]
 
     valid_depths = [5, 10, 20, 50, 100, 500, 1000, 5000]
@@ -45,6 +47,12 @@ class Binance(Feed, BinanceRestMixin):
         ORDER_INFO: ORDER_INFO
     }
     request_limit = 20
+    # book snapshots fetched at once (all pairs) while resyncing, and the number
+    # of book updates buffered per pair while its snapshot is in flight
+    snapshot_concurrency = 5
+    snapshot_buffer_size = 1000
+    numeric_modes = (DECIMAL, FLOAT, SCALED_INT)
+    native_book_support = True
 
     @classmethod
     def timestamp_normalize(cls, ts: float) -> float:
@@ -85,6 +93,7 @@ class Binance(Feed, BinanceRestMixin):
         super().__init__(**kwargs)
         self.depth_interval = depth_interval
         self._open_interest_cache = {}
+        self._snapshot_limit = Semaphore(self.snapshot_concurrency)
         self._reset()
 
     def _address(self) -> Union[str, Dict]:
@@ -145,9 +154,17 @@ class Binance(Feed, BinanceRestMixin):
             return [address + '/'.join(chunk) for chunk in split_list(subs, 200)]
 
     def _reset(self):
+        self.cancel_book_resyncs()
         self._l2_book = {}
         self.last_update_id = {}
 
+    def _reset_pair(self, std_pair: str):
+        """
+        Drop a single book, it is rebuilt from a new snapshot
+        """
+        self._l2_book.pop(std_pair, None)
+        self.last_update_id.pop(std_pair, None)
+
     async def _refresh_token(self):
         while True:
             await sleep(30 * 60)
@@ -184,11 +201,12 @@ class Binance(Feed, BinanceRestMixin):
             "M": true         // Ignore
         }
         """
+        pair = self.exchange_symbol_to_std_symbol(msg['s'])
         t = Trade(self.id,
-                  self.exchange_symbol_to_std_symbol(msg['s']),
+                  pair,
                   SELL if msg['m'] else BUY,
-                  Decimal(msg['q']),
-                  Decimal(msg['p']),
+                  self.numeric_type(msg['q']),
+                  self.price(pair, msg['p']),
                   self.timestamp_normalize(msg['T']),
                   id=str(msg['a']),
                   raw=msg)
@@ -206,8 +224,8 @@ class Binance(Feed, BinanceRestMixin):
         }
         """
         pair = self.exchange_symbol_to_std_symbol(msg['s'])
-        bid = Decimal(msg['b'])
-        ask = Decimal(msg['a'])
+        bid = self.price(pair, msg['b'])
+        ask = self.price(pair, msg['a'])
 
         # Binance does not have a timestamp in this update, but the two futures APIs do
         if 'E' in msg:
@@ -242,8 +260,8 @@ class Binance(Feed, BinanceRestMixin):
         liq = Liquidation(self.id,
                           pair,
                           SELL if msg['o']['S'] == 'SELL' else BUY,
-                          Decimal(msg['o']['q']),
-                          Decimal(msg['o']['p']),
+                          self.numeric_type(msg['o']['q']),
+                          self.price(pair, msg['o']['p']),
                           None,
                           FILLED if msg['o']['X'] == 'FILLED' else UNFILLED,
                           self.timestamp_normalize(msg['E']),
@@ -267,10 +285,26 @@ class Binance(Feed, BinanceRestMixin):
             self.last_update_id[std_pair] = msg['u']
             return False
         else:
-            self._reset()
-            LOG.warning("%s: Missing book update detected, resetting book", self.id)
+            self.book_gap(std_pair)
+            self._reset_pair(std_pair)
+            LOG.warning("%s: Missing book update detected for %s, resetting book", self.id, std_pair)
             return True
 
+    async def _book_snapshot(self, pair: str):
+        """
+        Snapshot hook for resync_book(). Snapshots for all pairs share a concurrency
+        limit and are spaced out by the exchange's request limit.
+        """
+        async with self._snapshot_limit:
+            await self._snapshot(pair)
+
+    def _resync_pair(self, pair: str, msg: dict, timestamp: float):
+        """
+        Fetch a new snapshot for pair in the background, updates are buffered (starting with msg)
+        and replayed once it arrives
+        """
+        self.resync_book(pair, partial(self._book_snapshot, self.std_symbol_to_exchange_symbol(pair)), partial(self._book_update, pair), msg, timestamp, buffer_size=self.snapshot_buffer_size)
+
     async def _snapshot(self, pair: str) -> None:
         max_depth = self.max_depth if self.max_depth else 1000
         if max_depth not in self.valid_depths:
@@ -279,13 +313,13 @@ class Binance(Feed, BinanceRestMixin):
                     max_depth = d
                     break
 
-        resp = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(pair, max_depth))
-        resp = json.loads(resp, parse_float=Decimal)
+        resp = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(pair, max_depth), priority=SNAPSHOT_PRIORITY)
+        resp = json.loads(resp, parse_float=self.numeric_type)
         timestamp = self.timestamp_normalize(resp['E']) if 'E' in resp else None
 
         std_pair = self.exchange_symbol_to_std_symbol(pair)
         self.last_update_id[std_pair] = resp['lastUpdateId']
-        self._l2_book[std_pair] = OrderBook(self.id, std_pair, max_depth=self.max_depth, bids={Decimal(u[0]): Decimal(u[1]) for u in resp['bids']}, asks={Decimal(u[0]): Decimal(u[1]) for u in resp['asks']})
+        self._l2_book[std_pair] = OrderBook.from_snapshot(self.id, std_pair, resp['bids'], resp['asks'], price=self.price_converter(std_pair), size=self.numeric_type, max_depth=self.max_depth, native=self.native_book)
         await self.book_callback(L2_BOOK, self._l2_book[std_pair], time.time(), timestamp=timestamp, raw=resp, sequence_number=self.last_update_id[std_pair])
 
     async def _book(self, msg: dict, pair: str, timestamp: float):
@@ -310,22 +344,30 @@ class Binance(Feed, BinanceRestMixin):
             ]
         }
         """
-        exchange_pair = pair
         pair = self.exchange_symbol_to_std_symbol(pair)
 
-        if pair not in self._l2_book:
-            await self._snapshot(exchange_pair)
+        if self.resync_pending(pair):
+            self.buffer_book_update(pair, msg, timestamp)
+        elif pair not in self._l2_book:
+            self._resync_pair(pair, msg, timestamp)
+        else:
+            await self._book_update(pair, msg, timestamp)
 
+    async def _book_update(self, pair: str, msg: dict, timestamp: float):
         skip_update = self._check_update_id(pair, msg)
         if skip_update:
+            if pair not in self._l2_book:
+                # gap detected, the update is replayed after the new snapshot
+                self._resync_pair(pair, msg, timestamp)
             return
 
         delta = {BID: [], ASK: []}
+        size = self.numeric_type
 
         for s, side in (('b', BID), ('a', ASK)):
             for update in msg[s]:
-                price = Decimal(update[0])
-                amount = Decimal(update[1])
+                price = self.price(pair, update[0])
+                amount = size(update[1])
                 delta[side].append((price, amount))
 
                 if amount == 0:
@@ -360,17 +402,17 @@ class Binance(Feed, BinanceRestMixin):
         }
         """
         next_time = self.timestamp_normalize(msg['T']) if msg['T'] > 0 else None
-        rate = Decimal(msg['r']) if msg['r'] else None
+        rate = self.numeric_type(msg['r']) if msg['r'] else None
         if next_time is None:
             rate = None
 
         f = Funding(self.id,
                     self.exchange_symbol_to_std_symbol(msg['s']),
-                    Decimal(msg['p']),
+                    self.numeric_type(msg['p']),
                     rate,
                     next_time,
                     self.timestamp_normalize(msg['E']),
-                    predicted_rate=Decimal(msg['P']) if 'P' in msg and msg['P'] is not None else None,
+                    predicted_rate=self.numeric_type(msg['P']) if 'P' in msg and msg['P'] is not None else None,
                     raw=msg)
         await self.callback(FUNDING, f, timestamp)
 
@@ -403,17 +445,18 @@ class Binance(Feed, BinanceRestMixin):
         """
         if self.candle_closed_only and not msg['k']['x']:
             return
+        pair = self.exchange_symbol_to_std_symbol(msg['s'])
         c = Candle(self.id,
-                   self.exchange_symbol_to_std_symbol(msg['s']),
+                   pair,
                    msg['k']['t'] / 1000,
                    msg['k']['T'] / 1000,
                    msg['k']['i'],
                    msg['k']['n'],
-                   Decimal(msg['k']['o']),
-                   Decimal(msg['k']['c']),
-                   Decimal(msg['k']['h']),
-                   Decimal(msg['k']['l']),
-                   Decimal(msg['k']['v']),
+                   self.price(pair, msg['k']['o']),
+                   self.price(pair, msg['k']['c']),
+                   self.price(pair, msg['k']['h']),
+                   self.price(pair, msg['k']['l']),
+                   self.numeric_type(msg['k']['v']),
                    msg['k']['x'],
                    self.timestamp_normalize(msg['E']),
                    raw=msg)
@@ -496,7 +539,7 @@ class Binance(Feed, BinanceRestMixin):
         await self.callback(ORDER_INFO, oi, timestamp)
 
     async def message_handler(self, msg: str, conn, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = json.loads(msg, parse_float=self.numeric_type)
 
         # Handle account updates from User Data Stream
         if self.requires_authentication:
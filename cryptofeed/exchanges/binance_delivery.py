@@ -23,7 +23,7 @@ class BinanceDelivery(Binance, BinanceDeliveryRestMixin):
     id = BINANCE_DELIVERY
 
     # https://binance-docs.github.io/apidocs/delivery/en/#testnet
-    websocket_endpoints = [WebsocketEndpoint('wss://dstream.binance.com', options={'compression': None}, sandbox='wss://dstream.binancefuture.com')]
+    websocket_endpoints = [WebsocketEndpoint('wss://dstream.binance.com', options={'decode': False, 'compression': None}, sandbox='wss://dstream.binancefuture.com')]
     rest_endpoints = [RestEndpoint('https://dapi.binance.com', routes=Routes('/dapi/v1/exchangeInfo', l2book='/dapi/v1/depth?symbol={}&limit={}', authentication='/dapi/v1/listenKey'), sandbox='https://testnet.binancefuture.com')]
 
     valid_depths = [5, 10, 20, 50, 100, 500, 1000]
@@ -46,8 +46,9 @@ class BinanceDelivery(Binance, BinanceDeliveryRestMixin):
             self.last_update_id[pair] = msg['u']
             return False
         else:
-            self._reset()
-            LOG.warning("%s: Missing book update detected, resetting book", self.id)
+            self.book_gap(pair)
+            self._reset_pair(pair)
+            LOG.warning("%s: Missing book update detected for %s, resetting book", self.id, pair)
             return True
 
     async def _account_update(self, msg: dict, timestamp: float):
@@ -190,7 +191,7 @@ class BinanceDelivery(Binance, BinanceDeliveryRestMixin):
         await self.callback(ORDER_INFO, oi, timestamp)
 
     async def message_handler(self, msg: str, conn, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = json.loads(msg, parse_float=self.numeric_type)
 
         # Handle account updates from User Data Stream
         if self.requires_authentication:
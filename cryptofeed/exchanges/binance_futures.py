@@ -21,7 +21,7 @@ LOG = logging.getLogger('feedhandler')
 
 class BinanceFutures(Binance, BinanceFuturesRestMixin):
     id = BINANCE_FUTURES
-    websocket_endpoints = [WebsocketEndpoint('wss://fstream.binance.com', sandbox='wss://stream.binancefuture.com', options={'compression': None})]
+    websocket_endpoints = [WebsocketEndpoint('wss://fstream.binance.com', sandbox='wss://stream.binancefuture.com', options={'decode': False, 'compression': None})]
     rest_endpoints = [RestEndpoint('https://fapi.binance.com', sandbox='https://testnet.binancefuture.com', routes=Routes('/fapi/v1/exchangeInfo', l2book='/fapi/v1/depth?symbol={}&limit={}', authentication='/fapi/v1/listenKey', open_interest='/fapi/v1/openInterest?symbol={}'))]
 
     valid_depths = [5, 10, 20, 50, 100, 500, 1000]
@@ -71,8 +71,9 @@ class BinanceFutures(Binance, BinanceFuturesRestMixin):
             self.last_update_id[pair] = msg['u']
             return False
         else:
-            self._reset()
-            LOG.warning("%s: Missing book update detected, resetting book", self.id)
+            self.book_gap(pair)
+            self._reset_pair(pair)
+            LOG.warning("%s: Missing book update detected for %s, resetting book", self.id, pair)
             return True
 
     async def _open_interest(self, msg: dict, timestamp: float):
@@ -89,7 +90,7 @@ class BinanceFutures(Binance, BinanceFuturesRestMixin):
             o = OpenInterest(
                 self.id,
                 self.exchange_symbol_to_std_symbol(pair),
-                Decimal(oi),
+                self.numeric_type(oi),
                 self.timestamp_normalize(msg['time']),
                 raw=msg
             )
@@ -234,7 +235,7 @@ class BinanceFutures(Binance, BinanceFuturesRestMixin):
         await self.callback(ORDER_INFO, oi, timestamp)
 
     async def message_handler(self, msg: str, conn: AsyncConnection, timestamp: float):
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = json.loads(msg, parse_float=self.numeric_type)
 
         # Handle REST endpoint messages first
         if 'openInterest' in msg:
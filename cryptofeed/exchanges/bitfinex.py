@@ -14,7 +14,6 @@ from yapic import json
 
 from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, WebsocketEndpoint
 from cryptofeed.defines import BID, ASK, BITFINEX, BUY, CURRENCY, FUNDING, L2_BOOK, L3_BOOK, SELL, TICKER, TRADES, PERPETUAL
-from cryptofeed.exceptions import MissingSequenceNumber
 from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exchanges.mixins.bitfinex_rest import BitfinexRestMixin
@@ -43,7 +42,7 @@ CHECKSUM = 131072
 class Bitfinex(Feed, BitfinexRestMixin):
     id = BITFINEX
 
-    websocket_endpoints = [WebsocketEndpoint('wss://api.bitfinex.com/ws/2', limit=25)]
+    websocket_endpoints = [WebsocketEndpoint('wss://api.bitfinex.com/ws/2', limit=25, options={'decode': False})]
     rest_endpoints = [RestEndpoint('https://api-pub.bitfinex.com', routes=Routes(['/v2/conf/pub:list:pair:exchange', '/v2/conf/pub:list:currency', '/v2/conf/pub:list:pair:futures']))]
     websocket_channels = {
         L3_BOOK: 'book-R0-{}-{}',
@@ -115,7 +114,7 @@ class Bitfinex(Feed, BitfinexRestMixin):
                         LOG.warning('%s: No %s for symbol %s => Cryptofeed will subscribe to the wrong channel', self.id, chan, pair)
 
         self.handlers = {}  # maps a channel id (int) to a function
-        self.order_map = defaultdict(dict)
+        self.book_channels = defaultdict(dict)  # maps connection to channel id to the book subscription message
         self.seq_no = defaultdict(int)
 
     def __reset(self, conn: AsyncConnection):
@@ -129,6 +128,9 @@ class Bitfinex(Feed, BitfinexRestMixin):
         if conn.uuid in self.seq_no:
             del self.seq_no[conn.uuid]
 
+        if conn.uuid in self.book_channels:
+            del self.book_channels[conn.uuid]
+
         if self.std_channel_to_exchange(L3_BOOK) in conn.subscription:
             for pair in conn.subscription[self.std_channel_to_exchange(L3_BOOK)]:
                 std_pair = self.exchange_symbol_to_std_symbol(pair)
@@ -136,9 +138,6 @@ class Bitfinex(Feed, BitfinexRestMixin):
                 if std_pair in self._l3_book:
                     del self._l3_book[std_pair]
 
-                if std_pair in self.order_map:
-                    del self.order_map[std_pair]
-
     async def _ticker(self, pair: str, msg: list, timestamp: float):
         if msg[1] == 'hb':
             return  # ignore heartbeats
@@ -209,6 +208,7 @@ class Bitfinex(Feed, BitfinexRestMixin):
         delta = None
         if isinstance(msg[1][0], list):
             # snapshot so clear book
+            self.book_recovered(pair)
             self._l2_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth)
             for update in msg[1]:
                 price, _, amount = update
@@ -253,25 +253,13 @@ class Bitfinex(Feed, BitfinexRestMixin):
                 LOG.warning('%s: Unexpected book L3 msg %s', self.id, msg)
             return
 
-        def add_to_book(side, price, order_id, amount):
-            if price in self._l3_book[pair].book[side]:
-                self._l3_book[pair].book[side][price][order_id] = amount
-            else:
-                self._l3_book[pair].book[side][price] = {order_id: amount}
-
-        def remove_from_book(side, order_id):
-            price = self.order_map[pair][side][order_id]['price']
-            del self._l3_book[pair].book[side][price][order_id]
-            if len(self._l3_book[pair].book[side][price]) == 0:
-                del self._l3_book[pair].book[side][price]
-
         delta = {BID: [], ASK: []}
 
         if isinstance(msg[1][0], list):
             # snapshot so clear orders
-            self.order_map[pair][BID] = {}
-            self.order_map[pair][ASK] = {}
-            self._l3_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth)
+            self.book_recovered(pair)
+            self._l3_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth, l3=True)
+            book = self._l3_book[pair].book
 
             for update in msg[1]:
                 order_id, price, amount = update
@@ -284,8 +272,7 @@ class Bitfinex(Feed, BitfinexRestMixin):
                     side = ASK
                     amount = - amount
 
-                self.order_map[pair][side][order_id] = {'price': price, 'amount': amount}
-                add_to_book(side, price, order_id, amount)
+                book.add(order_id, side, price, amount)
         else:
             # book update
             order_id, price, amount = msg[1]
@@ -298,22 +285,17 @@ class Bitfinex(Feed, BitfinexRestMixin):
                 side = ASK
                 amount = abs(amount)
 
+            book = self._l3_book[pair].book
             if price == 0:
-                price = self.order_map[pair][side][order_id]['price']
-                remove_from_book(side, order_id)
-                del self.order_map[pair][side][order_id]
+                price = book.remove(order_id).price
                 delta[side].append((order_id, price, 0))
             else:
-                if order_id in self.order_map[pair][side]:
-                    del_price = self.order_map[pair][side][order_id]['price']
-                    delta[side].append((order_id, del_price, 0))
-                    # remove existing order before adding new one
-                    delta[side].append((order_id, price, amount))
-                    remove_from_book(side, order_id)
-                else:
-                    delta[side].append((order_id, price, amount))
-                add_to_book(side, price, order_id, amount)
-                self.order_map[pair][side][order_id] = {'price': price, 'amount': amount}
+                existing = book.order(order_id)
+                if existing is not None:
+                    delta[side].append((order_id, existing[1], 0))
+                # an existing order is removed before the new one is added
+                delta[side].append((order_id, price, amount))
+                book.add(order_id, side, price, amount)
 
         await self.book_callback(L3_BOOK, self._l3_book[pair], timestamp, raw=msg, delta=delta, sequence_number=msg[-1])
 
@@ -336,8 +318,9 @@ class Bitfinex(Feed, BitfinexRestMixin):
             seq_no = msg[-1]
             expected = self.seq_no[conn.uuid] + 1
             if seq_no != expected:
-                LOG.warning('%s: missed message (sequence number) received %d, expected %d', conn.uuid, seq_no, expected)
-                raise MissingSequenceNumber
+                # sequence numbers are per connection, so the book the missed message belonged to is unknown
+                LOG.warning('%s: missed message (sequence number) received %d, expected %d, resubscribing to books', conn.uuid, seq_no, expected)
+                await self._resubscribe_books(conn)
             self.seq_no[conn.uuid] = seq_no
             if hb_skip:
                 return
@@ -347,13 +330,28 @@ class Bitfinex(Feed, BitfinexRestMixin):
             LOG.warning('%s: Unexpected msg (missing event) from exchange: %s', conn.uuid, msg)
         elif msg['event'] == 'error':
             LOG.error('%s: Error from exchange: %s', conn.uuid, msg)
-        elif msg['event'] in ('info', 'conf'):
+        elif msg['event'] in ('info', 'conf', 'unsubscribed'):
             LOG.debug('%s: %s from exchange: %s', conn.uuid, msg['event'], msg)
         elif 'chanId' in msg and 'symbol' in msg:
             self.register_channel_handler(msg, conn)
         else:
             LOG.warning('%s: Unexpected msg from exchange: %s', conn.uuid, msg)
 
+    async def _resubscribe_books(self, conn: AsyncConnection):
+        """
+        Unsubscribe and subscribe to the book channels on the connection, each new subscription
+        starts with a snapshot. Other channels on the connection are not affected.
+        """
+        channels = self.book_channels.pop(conn.uuid, {})
+        for chan_id, subscription in channels.items():
+            pair = self.exchange_symbol_to_std_symbol(subscription['symbol'])
+            self.book_gap(pair)
+            self.handlers[chan_id] = self._do_nothing
+            self._l2_book.pop(pair, None)
+            self._l3_book.pop(pair, None)
+            await conn.write(json.dumps({'event': 'unsubscribe', 'chanId': chan_id}))
+            await conn.write(json.dumps({'event': 'subscribe', **subscription}))
+
     def register_channel_handler(self, msg: dict, conn: AsyncConnection):
         symbol = msg['symbol']
         is_funding = (symbol[0] == 'f')
@@ -382,6 +380,9 @@ class Bitfinex(Feed, BitfinexRestMixin):
             LOG.warning('%s %s: Unexpected message %s', conn.uuid, pair, msg)
             return
 
+        if msg['channel'] == 'book' and handler != self._do_nothing:
+            self.book_channels[conn.uuid][msg['chanId']] = {key: msg[key] for key in ('channel', 'symbol', 'prec', 'freq', 'len') if key in msg}
+
         LOG.debug('%s: Register channel=%s pair=%s funding=%s %s -> %s()', conn.uuid, msg['channel'], pair, is_funding,
                   '='.join(list(msg.items())[-1]), handler.__name__ if hasattr(handler, '__name__') else handler.func.__name__)
         self.handlers[msg['chanId']] = handler
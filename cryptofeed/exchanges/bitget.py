@@ -16,7 +16,6 @@ from yapic import json
 
 from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, WebsocketEndpoint
 from cryptofeed.defines import ASK, BALANCES, BID, BITGET, BUY, CANCELLED, CANDLES, FILLED, L2_BOOK, LONG, OPEN, ORDER_INFO, PARTIAL, PERPETUAL, POSITIONS, SELL, SHORT, SPOT, TICKER, TRADES
-from cryptofeed.exceptions import BadChecksum
 from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol, str_to_symbol
 from cryptofeed.types import Ticker, Trade, Candle, OrderBook, Balance, Position, OrderInfo
@@ -233,8 +232,8 @@ class Bitget(Feed):
             asks = {Decimal(price): Decimal(amount) for price, amount in data['asks']}
             self._l2_book[symbol] = OrderBook(self.id, symbol, max_depth=self.max_depth, bids=bids, asks=asks, checksum_format=self.id)
 
-            if self.checksum_validation and self._l2_book[symbol].book.checksum() != (data['checksum'] & 0xFFFFFFFF):
-                raise BadChecksum
+            if self.checksum_validation:
+                self.validate_checksum(symbol, self._l2_book[symbol].book, self.id, data['checksum'] & 0xFFFFFFFF)
             await self.book_callback(L2_BOOK, self._l2_book[symbol], timestamp, checksum=data['checksum'], timestamp=self.timestamp_normalize(int(data['ts'])), raw=msg)
 
         else:
@@ -268,8 +267,8 @@ class Bitget(Feed):
                     else:
                         self._l2_book[symbol].book[side][price] = size
 
-            if self.checksum_validation and self._l2_book[symbol].book.checksum() != (data['checksum'] & 0xFFFFFFFF):
-                raise BadChecksum
+            if self.checksum_validation:
+                self.validate_checksum(symbol, self._l2_book[symbol].book, self.id, data['checksum'] & 0xFFFFFFFF, delta=delta)
             await self.book_callback(L2_BOOK, self._l2_book[symbol], timestamp, delta=delta, checksum=data['checksum'], timestamp=self.timestamp_normalize(int(data['ts'])), raw=msg)
 
     async def _account(self, msg: dict, symbol: str, timestamp: float):
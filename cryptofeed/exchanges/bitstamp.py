@@ -18,6 +18,7 @@ from cryptofeed.defines import BID, ASK, BITSTAMP, BUY, L2_BOOK, L3_BOOK, SELL,
 from cryptofeed.feed import Feed
 from cryptofeed.exchanges.mixins.bitstamp_rest import BitstampRestMixin
 from cryptofeed.types import OrderBook, Trade
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -89,15 +90,10 @@ class Bitstamp(Feed, BitstampRestMixin):
         ts = int(data['microtimestamp'])
         pair = self.exchange_symbol_to_std_symbol(chan.split('_')[-1])
 
-        book = OrderBook(self.id, pair, max_depth=self.max_depth)
+        book = OrderBook(self.id, pair, max_depth=self.max_depth, l3=True)
         for side in (BID, ASK):
             for price, size, order_id in data[side + 's']:
-                price = Decimal(price)
-                size = Decimal(size)
-                if price in book.book[side]:
-                    book.book[side][price][order_id] = size
-                else:
-                    book.book[side][price] = {order_id: size}
+                book.book.add(order_id, side, Decimal(price), Decimal(size))
 
         self._l3_book[pair] = book
         await self.book_callback(L3_BOOK, self._l3_book[pair], timestamp, timestamp=self.timestamp_normalize(ts), raw=msg)
@@ -160,7 +156,7 @@ class Bitstamp(Feed, BitstampRestMixin):
     async def _snapshot(self, pairs: list, conn: AsyncConnection):
         await asyncio.sleep(5)
         urls = [self.rest_endpoints[0].route('l2book', self.sandbox).format(sym) for sym in pairs]
-        results = [await self.http_conn.read(url) for url in urls]
+        results = await asyncio.gather(*[self.http_conn.read(url, priority=SNAPSHOT_PRIORITY) for url in urls])
         results = [json.loads(resp, parse_float=Decimal) for resp in results]
 
         for r, pair in zip(results, pairs):
@@ -15,6 +15,7 @@ from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exceptions import MissingSequenceNumber
 from cryptofeed.types import OrderBook, Trade, Ticker, Candle
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -147,7 +148,7 @@ class Bittrex(Feed):
 
     async def _snapshot(self, symbol: str, sequence_number: int):
         while True:
-            ret, headers = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(symbol, self.__depth()), return_headers=True)
+            ret, headers = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(symbol, self.__depth()), return_headers=True, priority=SNAPSHOT_PRIORITY)
             seq = int(headers['Sequence'])
             if seq >= sequence_number:
                 break
@@ -244,19 +245,19 @@ class Bittrex(Feed):
             for update in msg['M']:
                 if update['M'] == 'orderBook':
                     for message in update['A']:
-                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS), parse_float=Decimal)
                         await self.book(data, timestamp)
                 elif update['M'] == 'trade':
                     for message in update['A']:
-                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS), parse_float=Decimal)
                         await self.trades(data, timestamp)
                 elif update['M'] == 'ticker':
                     for message in update['A']:
-                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS), parse_float=Decimal)
                         await self.ticker(data, timestamp)
                 elif update['M'] == 'candle':
                     for message in update['A']:
-                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS).decode(), parse_float=Decimal)
+                        data = json.loads(zlib.decompress(base64.b64decode(message), -zlib.MAX_WBITS), parse_float=Decimal)
                         await self.candle(data, timestamp)
                 else:
                     LOG.warning("%s: Invalid message type %s", self.id, msg)
@@ -93,24 +93,22 @@ class Blockchain(Feed):
 
         if msg['event'] == 'snapshot':
             # Reset the book
-            self._l3_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth)
+            self._l3_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth, l3=True)
 
+        book = self._l3_book[pair].book
         for side in (BID, ASK):
             for update in msg[side + 's']:
                 price = update['px']
                 qty = update['qty']
                 order_id = update['id']
+                existing = book.order(order_id)
 
                 if qty <= 0:
-                    del self._l3_book[pair].book[side][price][order_id]
+                    book.remove(order_id)
+                elif existing is not None and existing[1] == price:
+                    book.change(order_id, qty)
                 else:
-                    if price in self._l3_book[pair].book[side]:
-                        self._l3_book[pair].book[side][price][order_id] = qty
-                    else:
-                        self._l3_book[pair].book[side][price] = {order_id: qty}
-
-                if len(self._l3_book[pair].book[side][price]) == 0:
-                    del self._l3_book[pair].book[side][price]
+                    book.add(order_id, side, price, qty)
 
                 delta[side].append((order_id, price, qty))
 
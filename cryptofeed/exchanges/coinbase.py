@@ -19,6 +19,7 @@ from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exchanges.mixins.coinbase_rest import CoinbaseRestMixin
 from cryptofeed.types import OrderBook, Ticker, Trade
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -26,7 +27,7 @@ LOG = logging.getLogger('feedhandler')
 
 class Coinbase(Feed, CoinbaseRestMixin):
     id = COINBASE
-    websocket_endpoints = [WebsocketEndpoint('wss://ws-feed.pro.coinbase.com', options={'compression': None})]
+    websocket_endpoints = [WebsocketEndpoint('wss://ws-feed.pro.coinbase.com', options={'decode': False, 'compression': None})]
     rest_endpoints = [RestEndpoint('https://api.pro.coinbase.com', routes=Routes('/products', l3book='/products/{}/book?level=3'))]
 
     websocket_channels = {
@@ -36,6 +37,7 @@ class Coinbase(Feed, CoinbaseRestMixin):
         TICKER: 'ticker',
     }
     request_limit = 10
+    native_book_support = True
 
     @classmethod
     def _parse_symbol_data(cls, data: list) -> Tuple[Dict, Dict]:
@@ -54,13 +56,13 @@ class Coinbase(Feed, CoinbaseRestMixin):
         # we only keep track of the L3 order book if we have at least one subscribed order-book callback.
         # use case: subscribing to the L3 book plus Trade type gives you order_type information (see _received below),
         # and we don't need to do the rest of the book-keeping unless we have an active callback
+        # (or L2/L1 callbacks derived from the L3 book)
         self.keep_l3_book = False
-        if callbacks and L3_BOOK in callbacks:
+        if callbacks and L3_BOOK in callbacks or self.derived_books:
             self.keep_l3_book = True
         self.__reset()
 
     def __reset(self):
-        self.order_map = {}
         self.order_type_map = {}
         self.seq_no = None
         # sequence number validation only works when the FULL data stream is enabled
@@ -131,19 +133,16 @@ class Coinbase(Feed, CoinbaseRestMixin):
             side = ASK if msg['side'] == 'sell' else BID
             size = Decimal(msg['size'])
             maker_order_id = msg['maker_order_id']
+            book = self._l3_book[pair].book
 
-            _, new_size = self.order_map[maker_order_id]
+            _, _, new_size = book.order(maker_order_id)
             new_size -= size
             if new_size <= 0:
-                del self.order_map[maker_order_id]
+                book.remove(maker_order_id)
                 self.order_type_map.pop(maker_order_id, None)
                 delta[side].append((maker_order_id, price, 0))
-                del self._l3_book[pair].book[side][price][maker_order_id]
-                if len(self._l3_book[pair].book[side][price]) == 0:
-                    del self._l3_book[pair].book[side][price]
             else:
-                self.order_map[maker_order_id] = (price, new_size)
-                self._l3_book[pair].book[side][price][maker_order_id] = new_size
+                book.change(maker_order_id, new_size)
                 delta[side].append((maker_order_id, price, new_size))
 
             await self.book_callback(L3_BOOK, self._l3_book[pair], timestamp, timestamp=ts, delta=delta, raw=msg, sequence_number=self.seq_no[pair])
@@ -164,13 +163,9 @@ class Coinbase(Feed, CoinbaseRestMixin):
 
     async def _pair_level2_snapshot(self, msg: dict, timestamp: float):
         pair = self.exchange_symbol_to_std_symbol(msg['product_id'])
-        bids = {Decimal(price): Decimal(amount) for price, amount in msg['bids']}
-        asks = {Decimal(price): Decimal(amount) for price, amount in msg['asks']}
         if pair not in self._l2_book:
-            self._l2_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth, bids=bids, asks=asks)
-        else:
-            self._l2_book[pair].book.bids = bids
-            self._l2_book[pair].book.asks = asks
+            self._l2_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth, native=self.native_book)
+        self._l2_book[pair].load(msg['bids'], msg['asks'], price=self.price_converter(pair))
 
         await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, raw=msg)
 
@@ -201,28 +196,18 @@ class Coinbase(Feed, CoinbaseRestMixin):
 
         urls = [self.rest_endpoints[0].route('l3book', self.sandbox).format(pair) for pair in pairs]
 
-        results = []
-        for url in urls:
-            ret = await self.http_conn.read(url)
-            results.append(ret)
-            # rate limit - 3 per second
-            await asyncio.sleep(0.3)
+        results = await asyncio.gather(*[self.http_conn.read(url, priority=SNAPSHOT_PRIORITY) for url in urls])
 
         timestamp = time.time()
         for res, pair in zip(results, pairs):
             orders = json.loads(res, parse_float=Decimal)
             npair = self.exchange_symbol_to_std_symbol(pair)
-            self._l3_book[npair] = OrderBook(self.id, pair, max_depth=self.max_depth)
+            self._l3_book[npair] = OrderBook(self.id, pair, max_depth=self.max_depth, l3=True)
             self.seq_no[npair] = orders['sequence']
+            book = self._l3_book[npair].book
             for side in (BID, ASK):
                 for price, size, order_id in orders[side + 's']:
-                    price = Decimal(price)
-                    size = Decimal(size)
-                    if price in self._l3_book[npair].book[side]:
-                        self._l3_book[npair].book[side][price][order_id] = size
-                    else:
-                        self._l3_book[npair].book[side][price] = {order_id: size}
-                    self.order_map[order_id] = (price, size)
+                    book.add(order_id, side, self.price(npair, price), Decimal(size))
             await self.book_callback(L3_BOOK, self._l3_book[npair], timestamp, raw=orders)
 
     async def _open(self, msg: dict, timestamp: float):
@@ -236,12 +221,7 @@ class Coinbase(Feed, CoinbaseRestMixin):
         order_id = msg['order_id']
         ts = self.timestamp_normalize(msg['time'])
 
-        if price in self._l3_book[pair].book[side]:
-            self._l3_book[pair].book[side][price][order_id] = size
-        else:
-            self._l3_book[pair].book[side][price] = {order_id: size}
-        self.order_map[order_id] = (price, size)
-
+        self._l3_book[pair].book.add(order_id, side, price, size)
         delta[side].append((order_id, price, size))
 
         await self.book_callback(L3_BOOK, self._l3_book[pair], timestamp, timestamp=ts, delta=delta, raw=msg, sequence_number=msg['sequence'])
@@ -254,29 +234,23 @@ class Coinbase(Feed, CoinbaseRestMixin):
         to self-trade prevention. There will be no open message for such orders. Done messages
         for orders which are not on the book should be ignored when maintaining a real-time order book.
         """
+        order_id = msg['order_id']
+        self.order_type_map.pop(order_id, None)
         if 'price' not in msg:
             # market order life cycle: received -> done
-            self.order_type_map.pop(msg['order_id'], None)
-            self.order_map.pop(msg['order_id'], None)
             return
 
-        order_id = msg['order_id']
-        self.order_type_map.pop(order_id, None)
-        if order_id not in self.order_map:
+        pair = self.exchange_symbol_to_std_symbol(msg['product_id'])
+        if pair not in self._l3_book or self._l3_book[pair].book.remove(order_id) is None:
             return
 
-        del self.order_map[order_id]
         if self.keep_l3_book:
             delta = {BID: [], ASK: []}
 
             price = Decimal(msg['price'])
             side = ASK if msg['side'] == 'sell' else BID
-            pair = self.exchange_symbol_to_std_symbol(msg['product_id'])
             ts = self.timestamp_normalize(msg['time'])
 
-            del self._l3_book[pair].book[side][price][order_id]
-            if len(self._l3_book[pair].book[side][price]) == 0:
-                del self._l3_book[pair].book[side][price]
             delta[side].append((order_id, price, 0))
 
             await self.book_callback(L3_BOOK, self._l3_book[pair], timestamp, delta=delta, timestamp=ts, raw=msg, sequence_number=msg['sequence'])
@@ -311,17 +285,14 @@ class Coinbase(Feed, CoinbaseRestMixin):
             return
 
         order_id = msg['order_id']
-        if order_id not in self.order_map:
+        pair = self.exchange_symbol_to_std_symbol(msg['product_id'])
+        new_size = Decimal(msg['new_size'])
+        if pair not in self._l3_book or self._l3_book[pair].book.change(order_id, new_size) is None:
             return
 
         ts = self.timestamp_normalize(msg['time'])
         price = Decimal(msg['price'])
         side = ASK if msg['side'] == 'sell' else BID
-        new_size = Decimal(msg['new_size'])
-        pair = self.exchange_symbol_to_std_symbol(msg['product_id'])
-
-        self._l3_book[pair].book[side][price][order_id] = new_size
-        self.order_map[order_id] = (price, new_size)
 
         delta[side].append((order_id, price, new_size))
 
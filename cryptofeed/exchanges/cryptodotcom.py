@@ -27,6 +27,7 @@ class CryptoDotCom(Feed):
     id = CRYPTODOTCOM
     websocket_endpoints = [WebsocketEndpoint('wss://stream.crypto.com/v2/market')]
     rest_endpoints = [RestEndpoint('https://api.crypto.com', routes=Routes('/v2/public/get-instruments'))]
+    snapshot_only_book = True
 
     websocket_channels = {
         L2_BOOK: 'book',
@@ -12,7 +12,6 @@ from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, Websock
 from cryptofeed.defines import BID, ASK, BUY, CANCELLED, DERIBIT, FAILED, FUNDING, FUTURES, L2_BOOK, LIMIT, LIQUIDATIONS, MAKER, MARKET, OPEN, OPEN_INTEREST, PERPETUAL, SELL, STOP_LIMIT, STOP_MARKET, TAKER, TICKER, TRADES, FILLED
 from cryptofeed.defines import CURRENCY, BALANCES, ORDER_INFO, FILLS, L1_BOOK
 from cryptofeed.feed import Feed
-from cryptofeed.exceptions import MissingSequenceNumber
 from cryptofeed.symbols import Symbol
 from cryptofeed.exchanges.mixins.deribit_rest import DeribitRestMixin
 from cryptofeed.types import OrderBook, Trade, Ticker, Funding, OpenInterest, Liquidation, OrderInfo, Balance, L1Book, Fill
@@ -247,6 +246,20 @@ class Deribit(Feed, DeribitRestMixin):
             LOG.debug(f'{conn.uuid}: Subscribing to private channels with message {msg}')
             await conn.write(json.dumps(msg))
 
+    async def _resubscribe_book(self, conn: AsyncConnection, channel: str):
+        """
+        Unsubscribe and subscribe to a single book channel, the subscription starts with a
+        new snapshot. Other channels and symbols on the connection are not affected.
+        """
+        if self.is_authenticated_channel(L2_BOOK):
+            scope = 'private'
+            params = {"scope": f"session:{conn.uuid}", "channels": [channel]}
+        else:
+            scope = 'public'
+            params = {"channels": [channel]}
+        await conn.write(json.dumps({"jsonrpc": "2.0", "id": "103", "method": f"{scope}/unsubscribe", "params": params}))
+        await conn.write(json.dumps({"jsonrpc": "2.0", "id": "104", "method": f"{scope}/subscribe", "params": params}))
+
     async def _book_snapshot(self, msg: dict, timestamp: float):
         """
         {
@@ -270,17 +283,24 @@ class Deribit(Feed, DeribitRestMixin):
         self._l2_book[pair].book.bids = {Decimal(price): Decimal(amount) for _, price, amount in msg["params"]["data"]["bids"]}
         self._l2_book[pair].book.asks = {Decimal(price): Decimal(amount) for _, price, amount in msg["params"]["data"]["asks"]}
         self.seq_no[pair] = msg["params"]["data"]["change_id"]
+        self.book_recovered(pair)
 
         await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, timestamp=self.timestamp_normalize(ts), sequence_number=msg["params"]["data"]["change_id"], raw=msg)
 
-    async def _book_update(self, msg: dict, timestamp: float):
+    async def _book_update(self, conn: AsyncConnection, msg: dict, timestamp: float):
         ts = msg["params"]["data"]["timestamp"]
         pair = self.exchange_symbol_to_std_symbol(msg["params"]["data"]["instrument_name"])
 
+        if pair not in self._l2_book:
+            # resubscribed after a gap, waiting for the snapshot
+            return
+
         if msg['params']['data']['prev_change_id'] != self.seq_no[pair]:
-            LOG.warning("%s: Missing sequence number detected for %s", self.id, pair)
-            LOG.warning("%s: Requesting book snapshot", self.id)
-            raise MissingSequenceNumber
+            LOG.warning("%s: Missing sequence number detected for %s, resubscribing to its book", self.id, pair)
+            self.book_gap(pair)
+            del self._l2_book[pair]
+            await self._resubscribe_book(conn, msg['params']['channel'])
+            return
 
         self.seq_no[pair] = msg['params']['data']['change_id']
 
@@ -321,6 +341,8 @@ class Deribit(Feed, DeribitRestMixin):
                 elif id == '102':
                     LOG.info("%s: Subscribed to authenticated channels", conn.uuid)
                     LOG.debug("%s: %s", conn.uuid, result)
+                elif id in {'103', '104'}:
+                    LOG.debug("%s: Book resubscription %s", conn.uuid, result)
                 elif id.startswith('auth') and "access_token" in result:
                     '''
                     Access token is another way to be authenticated while sending messages to Deribit.
@@ -350,7 +372,7 @@ class Deribit(Feed, DeribitRestMixin):
                     if "prev_change_id" not in msg_dict["params"]["data"].keys():
                         await self._book_snapshot(msg_dict, timestamp)
                     elif "prev_change_id" in msg_dict["params"]["data"].keys():
-                        await self._book_update(msg_dict, timestamp)
+                        await self._book_update(conn, msg_dict, timestamp)
 
                 elif "quote" == channel.split(".")[0]:
                     await self._quote(params['data'], timestamp)
@@ -19,7 +19,6 @@ from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, Websock
 from cryptofeed.defines import BID, ASK, BUY, CLOSED, FUTURES, LIMIT, MAKER, MARKET, OPEN, ORDER_INFO, PERPETUAL, SPOT, SUBMITTING, FILLS, TAKER
 from cryptofeed.defines import FTX as FTX_id
 from cryptofeed.defines import FUNDING, L2_BOOK, LIQUIDATIONS, OPEN_INTEREST, SELL, TICKER, TRADES, FILLED
-from cryptofeed.exceptions import BadChecksum
 from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exchanges.mixins.ftx_rest import FTXRestMixin
@@ -176,7 +175,6 @@ class FTX(Feed, FTXRestMixin):
                         )
                         await self.callback(OPEN_INTEREST, o, received)
                         self._open_interest_cache[pair] = oi
-                        await asyncio.sleep(1)
             await asyncio.sleep(60)
 
     async def _funding(self, pairs: Iterable):
@@ -294,8 +292,8 @@ class FTX(Feed, FTXRestMixin):
             self._l2_book[pair].book.bids = {Decimal(price): Decimal(amount) for price, amount in msg['data']['bids']}
             self._l2_book[pair].book.asks = {Decimal(price): Decimal(amount) for price, amount in msg['data']['asks']}
 
-            if self.checksum_validation and self._l2_book[pair].book.checksum() != check:
-                raise BadChecksum
+            if self.checksum_validation:
+                self.validate_checksum(pair, self._l2_book[pair].book, 'FTX', check)
             await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, timestamp=float(msg['data']['time']), raw=msg, checksum=check)
         else:
             # update
@@ -312,8 +310,8 @@ class FTX(Feed, FTXRestMixin):
                     else:
                         delta[s].append((price, amount))
                         self._l2_book[pair].book[s][price] = amount
-            if self.checksum_validation and self._l2_book[pair].book.checksum() != check:
-                raise BadChecksum
+            if self.checksum_validation:
+                self.validate_checksum(pair, self._l2_book[pair].book, 'FTX', check, delta=delta)
             await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, timestamp=float(msg['data']['time']), raw=msg, checksum=check, delta=delta)
 
     async def _fill(self, msg: dict, timestamp: float):
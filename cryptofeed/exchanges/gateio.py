@@ -7,6 +7,7 @@ associated with this software.
 from collections import defaultdict
 import logging
 from decimal import Decimal
+from functools import partial
 import time
 from typing import Dict, Tuple
 
@@ -18,6 +19,7 @@ from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.types import OrderBook, Trade, Ticker, Candle
 from cryptofeed.util.time import timedelta_str_to_sec
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -50,10 +52,19 @@ class Gateio(Feed):
         return ret, info
 
     def _reset(self):
+        self.cancel_book_resyncs()
         self._l2_book = {}
         self.last_update_id = {}
         self.forced = defaultdict(bool)
 
+    def _reset_pair(self, pair: str):
+        """
+        Drop a single book, it is rebuilt from a new snapshot
+        """
+        self._l2_book.pop(pair, None)
+        self.last_update_id.pop(pair, None)
+        self.forced.pop(pair, None)
+
     async def _ticker(self, msg: dict, timestamp: float):
         """
         {
@@ -120,14 +131,12 @@ class Gateio(Feed):
             "bids": [[price, amount], [...], ...]
         }
         """
-        ret = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(symbol))
+        ret = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(symbol), priority=SNAPSHOT_PRIORITY)
         data = json.loads(ret, parse_float=Decimal)
 
         symbol = self.exchange_symbol_to_std_symbol(symbol)
-        self._l2_book[symbol] = OrderBook(self.id, symbol, max_depth=self.max_depth)
+        self._l2_book[symbol] = OrderBook.from_snapshot(self.id, symbol, data['bids'], data['asks'], price=self.price_converter(symbol), max_depth=self.max_depth)
         self.last_update_id[symbol] = data['id']
-        self._l2_book[symbol].book.bids = {Decimal(price): Decimal(amount) for price, amount in data['bids']}
-        self._l2_book[symbol].book.asks = {Decimal(price): Decimal(amount) for price, amount in data['asks']}
         await self.book_callback(L2_BOOK, self._l2_book[symbol], time.time(), raw=data, sequence_number=data['id'])
 
     def _check_update_id(self, pair: str, msg: dict) -> Tuple[bool, bool]:
@@ -142,8 +151,9 @@ class Gateio(Feed):
         elif not forced and self.last_update_id[pair] + 1 == msg['U']:
             self.last_update_id[pair] = msg['u']
         else:
-            self._reset()
-            LOG.warning("%s: Missing book update detected, resetting book", self.id)
+            self.book_gap(pair)
+            self._reset_pair(pair)
+            LOG.warning("%s: Missing book update detected for %s, resyncing book", self.id, pair)
             skip_update = True
 
         return skip_update
@@ -167,11 +177,20 @@ class Gateio(Feed):
         }
         """
         symbol = self.exchange_symbol_to_std_symbol(msg['result']['s'])
-        if symbol not in self._l2_book:
-            await self._snapshot(msg['result']['s'])
+        if self.resync_pending(symbol):
+            self.buffer_book_update(symbol, msg, timestamp)
+        elif symbol not in self._l2_book:
+            self.resync_book(symbol, partial(self._snapshot, msg['result']['s']), self._book_update, msg, timestamp)
+        else:
+            await self._book_update(msg, timestamp)
 
+    async def _book_update(self, msg: dict, timestamp: float):
+        symbol = self.exchange_symbol_to_std_symbol(msg['result']['s'])
         skip_update = self._check_update_id(symbol, msg['result'])
         if skip_update:
+            if symbol not in self._l2_book:
+                # gap detected, the update is replayed after the new snapshot
+                self.resync_book(symbol, partial(self._snapshot, msg['result']['s']), self._book_update, msg, timestamp)
             return
 
         ts = msg['result']['t'] / 1000
@@ -26,6 +26,7 @@ class Huobi(Feed):
     id = HUOBI
     websocket_endpoints = [WebsocketEndpoint('wss://api.huobi.pro/ws')]
     rest_endpoints = [RestEndpoint('https://api.huobi.pro', routes=Routes('/v1/common/symbols'))]
+    snapshot_only_book = True
 
     valid_candle_intervals = {'1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w', '1M', '1Y'}
     candle_interval_map = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min', '1h': '60min', '4h': '4hour', '1d': '1day', '1M': '1mon', '1w': '1week', '1Y': '1year'}
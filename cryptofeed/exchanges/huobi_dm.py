@@ -26,6 +26,7 @@ class HuobiDM(Feed):
     id = HUOBI_DM
     websocket_endpoints = [WebsocketEndpoint('wss://www.hbdm.com/ws')]
     rest_endpoints = [RestEndpoint('https://www.hbdm.com', routes=Routes('/api/v1/contract_contract_info'))]
+    snapshot_only_book = True
 
     websocket_channels = {
         L2_BOOK: 'depth.step0',
@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 from typing import Dict, Tuple
@@ -19,6 +18,7 @@ from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exceptions import MissingSequenceNumber
 from cryptofeed.types import Trade, OrderBook
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -50,7 +50,6 @@ class IndependentReserve(Feed):
 
     def __reset(self):
         self._l3_book = {}
-        self._order_ids = defaultdict(dict)
         self._sequence_no = {}
 
     async def _trade(self, msg: dict, timestamp: float):
@@ -130,18 +129,12 @@ class IndependentReserve(Feed):
                 if instrument not in self._l3_book:
                     await self._snapshot(base, quote)
 
+                book = self._l3_book[instrument].book
                 if msg['Event'] == 'OrderCanceled':
                     uuid = msg['Data']['OrderGuid']
-                    if uuid in self._order_ids[instrument]:
-                        price, side = self._order_ids[instrument][uuid]
-
-                        if price in self._l3_book[instrument].book[side] and uuid in self._l3_book[instrument].book[side][price]:
-                            del self._l3_book[instrument].book[side][price][uuid]
-                            if len(self._l3_book[instrument].book[side][price]) == 0:
-                                del self._l3_book[instrument].book[side][price]
-                            delta[side].append((uuid, price, 0))
-
-                        del self._order_ids[instrument][uuid]
+                    level = book.remove(uuid)
+                    if level is not None:
+                        delta[level.side].append((uuid, level.price, 0))
                     else:
                         # during snapshots we might get cancelation messages that have already been removed
                         # from the snapshot, so we don't have anything to process, and we should not call the client callback
@@ -151,30 +144,15 @@ class IndependentReserve(Feed):
                     price = msg['Data']['Price'][quote]
                     size = msg['Data']['Volume']
                     side = BID if msg['Data']['OrderType'].endswith('Bid') else ASK
-                    self._order_ids[instrument][uuid] = (price, side)
-
-                    if price in self._l3_book[instrument].book[side]:
-                        self._l3_book[instrument].book[side][price][uuid] = size
-                    else:
-                        self._l3_book[instrument].book[side][price] = {uuid: size}
+                    book.add(uuid, side, price, size)
                     delta[side].append((uuid, price, size))
 
-                elif msg['event'] == 'OrderChanged':
+                elif msg['Event'] == 'OrderChanged':
                     uuid = msg['Data']['OrderGuid']
                     size = msg['Data']['Volume']
-                    side = BID if msg['Data']['OrderType'].endswith('Bid') else ASK
-                    if uuid in self._order_ids[instrument]:
-                        price, side = self._order_ids[instrument][uuid]
-
-                        if size == 0:
-                            del self._l3_book[instrument][side][price][uuid]
-                            if len(self._l3_book[instrument][side][price]) == 0:
-                                del self._l3_book[instrument][side][price]
-                        else:
-                            self._l3_book[instrument][side][price][uuid] = size
-
-                        del self._order_ids[instrument][uuid]
-                        delta[side].append((uuid, price, size))
+                    level = book.remove(uuid) if size == 0 else book.change(uuid, size)
+                    if level is not None:
+                        delta[level.side].append((uuid, level.price, size))
                     else:
                         continue
 
@@ -186,24 +164,16 @@ class IndependentReserve(Feed):
     async def _snapshot(self, base: str, quote: str):
         url = self.rest_endpoints[0].route('l3book', self.sandbox).format(base, quote)
         timestamp = time()
-        ret = await self.http_conn.read(url)
-        await asyncio.sleep(1 / self.request_limit)
+        ret = await self.http_conn.read(url, priority=SNAPSHOT_PRIORITY)
         ret = json.loads(ret, parse_float=Decimal)
 
         normalized = self.exchange_symbol_to_std_symbol(f"{base}-{quote}")
-        self._l3_book[normalized] = OrderBook(self.id, normalized, max_depth=self.max_depth)
+        self._l3_book[normalized] = OrderBook(self.id, normalized, max_depth=self.max_depth, l3=True)
+        book = self._l3_book[normalized].book
 
         for side, key in [(BID, 'BuyOrders'), (ASK, 'SellOrders')]:
             for order in ret[key]:
-                price = Decimal(order['Price'])
-                size = Decimal(order['Volume'])
-                uuid = order['Guid']
-                self._order_ids[normalized][uuid] = (price, side)
-
-                if price in self._l3_book[normalized].book[side]:
-                    self._l3_book[normalized].book[side][price][uuid] = size
-                else:
-                    self._l3_book[normalized].book[side][price] = {uuid: size}
+                book.add(order['Guid'], side, Decimal(order['Price']), Decimal(order['Volume']))
         await self.book_callback(L3_BOOK, self._l3_book[normalized], timestamp, raw=ret)
 
     async def message_handler(self, msg: str, conn: AsyncConnection, timestamp: float):
@@ -12,8 +12,7 @@ from typing import Dict, Tuple
 from yapic import json
 
 from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, WebsocketEndpoint
-from cryptofeed.defines import BID, ASK, BUY, CANDLES, KRAKEN, L2_BOOK, SELL, TICKER, TRADES
-from cryptofeed.exceptions import BadChecksum
+from cryptofeed.defines import BID, ASK, BUY, CANDLES, DECIMAL, FLOAT, KRAKEN, L2_BOOK, SCALED_INT, SELL, TICKER, TRADES
 from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.exchanges.mixins.kraken_rest import KrakenRestMixin
@@ -25,7 +24,7 @@ LOG = logging.getLogger('feedhandler')
 
 class Kraken(Feed, KrakenRestMixin):
     id = KRAKEN
-    websocket_endpoints = [WebsocketEndpoint('wss://ws.kraken.com', limit=20)]
+    websocket_endpoints = [WebsocketEndpoint('wss://ws.kraken.com', limit=20, options={'decode': False})]
     rest_endpoints = [RestEndpoint('https://api.kraken.com', routes=Routes('/0/public/AssetPairs'))]
 
     valid_candle_intervals = {'1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w', '15d'}
@@ -38,6 +37,7 @@ class Kraken(Feed, KrakenRestMixin):
         CANDLES: 'ohlc'
     }
     request_limit = 10
+    numeric_modes = (DECIMAL, FLOAT, SCALED_INT)
 
     @classmethod
     def _parse_symbol_data(cls, data: dict) -> Tuple[Dict, Dict]:
@@ -57,6 +57,7 @@ class Kraken(Feed, KrakenRestMixin):
 
             ret[s.normalized] = data['result'][symbol]['wsname']
             info['instrument_type'][s.normalized] = s.type
+            info['tick_size'][s.normalized] = str(Decimal(1).scaleb(-data['result'][symbol]['pair_decimals']))
         return ret, info
 
     def __init__(self, max_depth=1000, **kwargs):
@@ -106,8 +107,8 @@ class Kraken(Feed, KrakenRestMixin):
                 self.id,
                 pair,
                 BUY if side == 'b' else SELL,
-                Decimal(amount),
-                Decimal(price),
+                self.numeric_type(amount),
+                self.price(pair, price),
                 float(server_timestamp),
                 type=order_type,
                 raw=trade
@@ -119,18 +120,21 @@ class Kraken(Feed, KrakenRestMixin):
         [93, {'a': ['105.85000', 0, '0.46100000'], 'b': ['105.77000', 45, '45.00000000'], 'c': ['105.83000', '5.00000000'], 'v': ['92170.25739498', '121658.17399954'], 'p': ['107.58276', '107.95234'], 't': [4966, 6717], 'l': ['105.03000', '105.03000'], 'h': ['110.33000', '110.33000'], 'o': ['109.45000', '106.78000']}]
         channel id, asks: price, wholeLotVol, vol, bids: price, wholeLotVol, close: ...,, vol: ..., VWAP: ..., trades: ..., low: ...., high: ..., open: ...
         """
-        t = Ticker(self.id, pair, Decimal(msg[1]['b'][0]), Decimal(msg[1]['a'][0]), None, raw=msg)
+        t = Ticker(self.id, pair, self.price(pair, msg[1]['b'][0]), self.price(pair, msg[1]['a'][0]), None, raw=msg)
         await self.callback(TICKER, t, timestamp)
 
     async def _book(self, msg: dict, pair: str, timestamp: float):
         delta = {BID: [], ASK: []}
         msg = msg[1:-2]
+        to_size = self.numeric_type
 
         if 'as' in msg[0]:
             # Snapshot
-            bids = {Decimal(update[0]): Decimal(update[1]) for update in msg[0]['bs']}
-            asks = {Decimal(update[0]): Decimal(update[1]) for update in msg[0]['as']}
+            bids = {self.price(pair, update[0]): to_size(update[1]) for update in msg[0]['bs']}
+            asks = {self.price(pair, update[0]): to_size(update[1]) for update in msg[0]['as']}
             self._l2_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth, bids=bids, asks=asks, checksum_format='KRAKEN', truncate=self.max_depth != self.valid_depths[-1])
+            if self.checksum_validation:
+                self.validate_checksum(pair, self._l2_book[pair].book, 'KRAKEN', None)
             await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, raw=msg)
         else:
             for m in msg:
@@ -143,8 +147,8 @@ class Kraken(Feed, KrakenRestMixin):
                     if side:
                         for update in updates:
                             price, size, *_ = update
-                            price = Decimal(price)
-                            size = Decimal(size)
+                            price = self.price(pair, price)
+                            size = to_size(size)
                             if size == 0:
                                 # Per Kraken's technical support
                                 # they deliver erroneous deletion messages
@@ -156,8 +160,8 @@ class Kraken(Feed, KrakenRestMixin):
                                 delta[side].append((price, size))
                                 self._l2_book[pair].book[side][price] = size
 
-            if self.checksum_validation and 'c' in msg[0] and self._l2_book[pair].book.checksum() != int(msg[0]['c']):
-                raise BadChecksum("Checksum validation on orderbook failed")
+            if self.checksum_validation:
+                self.validate_checksum(pair, self._l2_book[pair].book, 'KRAKEN', int(msg[0]['c']) if 'c' in msg[0] else None, delta=delta)
             await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, delta=delta, raw=msg, checksum=int(msg[0]['c']) if 'c' in msg[0] else None)
 
     async def _candle(self, msg: list, pair: str, timestamp: float):
@@ -185,11 +189,11 @@ class Kraken(Feed, KrakenRestMixin):
             float(end),
             self.normalize_candle_interval[interval],
             count,
-            Decimal(open),
-            Decimal(close),
-            Decimal(high),
-            Decimal(low),
-            Decimal(volume),
+            self.price(pair, open),
+            self.price(pair, close),
+            self.price(pair, high),
+            self.price(pair, low),
+            self.numeric_type(volume),
             None,
             float(start),
             raw=msg
@@ -198,7 +202,7 @@ class Kraken(Feed, KrakenRestMixin):
 
     async def message_handler(self, msg: str, conn, timestamp: float):
 
-        msg = json.loads(msg, parse_float=Decimal)
+        msg = json.loads(msg, parse_float=self.numeric_type)
 
         if isinstance(msg, list):
             channel, pair = msg[-2:]
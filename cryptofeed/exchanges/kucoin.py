@@ -5,6 +5,7 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 from decimal import Decimal
+from functools import partial
 import logging
 import time
 from typing import Dict, Tuple
@@ -20,6 +21,7 @@ from cryptofeed.util.time import timedelta_str_to_sec
 from cryptofeed.symbols import Symbol
 from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, WebsocketEndpoint
 from cryptofeed.types import OrderBook, Trade, Ticker, Candle
+from cryptofeed.util.rate_limit import SNAPSHOT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -67,6 +69,7 @@ class KuCoin(Feed):
         self.__reset()
 
     def __reset(self):
+        self.cancel_book_resyncs()
         self._l2_book = {}
         self.seq_no = {}
 
@@ -182,14 +185,12 @@ class KuCoin(Feed):
     async def _snapshot(self, symbol: str):
         str_to_sign = "GET" + self.rest_endpoints[0].routes.l2book.format(symbol)
         headers = self.generate_token(str_to_sign)
-        data = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(symbol), header=headers)
+        data = await self.http_conn.read(self.rest_endpoints[0].route('l2book', self.sandbox).format(symbol), header=headers, priority=SNAPSHOT_PRIORITY)
         timestamp = time.time()
         data = json.loads(data, parse_float=Decimal)
         data = data['data']
         self.seq_no[symbol] = int(data['sequence'])
-        bids = {Decimal(price): Decimal(amount) for price, amount in data['bids']}
-        asks = {Decimal(price): Decimal(amount) for price, amount in data['asks']}
-        self._l2_book[symbol] = OrderBook(self.id, symbol, max_depth=self.max_depth, bids=bids, asks=asks)
+        self._l2_book[symbol] = OrderBook.from_snapshot(self.id, symbol, data['bids'], data['asks'], price=self.price_converter(symbol), max_depth=self.max_depth)
 
         await self.book_callback(L2_BOOK, self._l2_book[symbol], timestamp, raw=data, sequence_number=int(data['sequence']))
 
@@ -210,14 +211,23 @@ class KuCoin(Feed):
             'type': 'message'
         }
         """
+        if self.resync_pending(symbol):
+            self.buffer_book_update(symbol, msg, timestamp)
+        elif symbol not in self._l2_book:
+            self.resync_book(symbol, partial(self._snapshot, symbol), partial(self._book_update, symbol), msg, timestamp)
+        else:
+            await self._book_update(symbol, msg, timestamp)
+
+    async def _book_update(self, symbol: str, msg: dict, timestamp: float):
         data = msg['data']
         sequence = data['sequenceStart']
-        if symbol not in self._l2_book or sequence > self.seq_no[symbol] + 1:
-            if symbol in self.seq_no and sequence > self.seq_no[symbol] + 1:
-                LOG.warning("%s: Missing book update detected, resetting book", self.id)
-            await self._snapshot(symbol)
+        if sequence > self.seq_no[symbol] + 1:
+            LOG.warning("%s: Missing book update detected for %s, resyncing book", self.id, symbol)
+            self.book_gap(symbol)
+            del self._l2_book[symbol]
+            self.resync_book(symbol, partial(self._snapshot, symbol), partial(self._book_update, symbol), msg, timestamp)
+            return
 
-        data = msg['data']
         if sequence < self.seq_no[symbol]:
             return
 
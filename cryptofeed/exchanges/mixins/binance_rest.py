@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import hashlib
 import hmac
@@ -17,6 +16,7 @@ from yapic import json
 from cryptofeed.defines import BALANCES, BUY, CANCEL_ORDER, CANDLES, DELETE, FILL_OR_KILL, GET, GOOD_TIL_CANCELED, IMMEDIATE_OR_CANCEL, LIMIT, MARKET, ORDERS, ORDER_STATUS, PLACE_ORDER, POSITIONS, POST, SELL, TRADES
 from cryptofeed.exchange import RestExchange
 from cryptofeed.types import Candle
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -82,7 +82,7 @@ class BinanceRestMixin(RestExchange):
             else:
                 endpoint = f"{self.api}aggTrades?symbol={symbol}&limit=1000"
 
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
 
             if data:
@@ -96,7 +96,6 @@ class BinanceRestMixin(RestExchange):
 
             if len(data) < 1000 or end is None:
                 break
-            await asyncio.sleep(1 / self.request_limit)
 
     def _trade_normalization(self, symbol: str, trade: list) -> dict:
         ret = {
@@ -124,7 +123,7 @@ class BinanceRestMixin(RestExchange):
                 endpoint = f'{ep}&startTime={start}&endTime={end}'
             else:
                 endpoint = ep
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
             start = data[-1][6]
             data = [Candle(self.id, symbol, self.timestamp_normalize(e[0]), self.timestamp_normalize(e[6]), interval, e[8], Decimal(e[1]), Decimal(e[4]), Decimal(e[2]), Decimal(e[3]), Decimal(e[5]), True, self.timestamp_normalize(e[6]), raw=e) for e in data]
@@ -132,7 +131,6 @@ class BinanceRestMixin(RestExchange):
 
             if len(data) < 1000 or end is None:
                 break
-            await asyncio.sleep(1 / self.request_limit)
 
     # Trading APIs
     async def place_order(self, symbol: str, side: str, order_type: str, amount: Decimal, price=None, time_in_force=None, test=False):
@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 import hashlib
 import hmac
 import time
@@ -16,6 +15,7 @@ from cryptofeed.defines import BID, ASK, L2_BOOK, L3_BOOK, BUY, SELL, TICKER, TR
 from cryptofeed.exchange import RestExchange
 from cryptofeed.util.time import timedelta_str_to_sec
 from cryptofeed.types import OrderBook, Candle
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 class BitfinexRestMixin(RestExchange):
@@ -102,7 +102,7 @@ class BitfinexRestMixin(RestExchange):
             if start and end:
                 endpoint = f"{self.api}trades/{symbol}/hist?limit=5000&start={start}&end={end}&sort=1"
 
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
 
             if data:
@@ -120,7 +120,6 @@ class BitfinexRestMixin(RestExchange):
 
             if len(orig_data) < 5000:
                 break
-            await asyncio.sleep(1 / self.request_limit)
 
     async def ticker(self, symbol: str, retry_count=1, retry_delay=60):
         sym = self.std_symbol_to_exchange_symbol(symbol)
@@ -192,7 +191,7 @@ class BitfinexRestMixin(RestExchange):
             else:
                 endpoint = f"{base_endpoint}/last"
 
-            r = await self.http_conn.read(endpoint, retry_delay=retry_delay, retry_count=retry_count)
+            r = await self.http_conn.read(endpoint, retry_delay=retry_delay, retry_count=retry_count, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
             if not isinstance(data[0], list):
                 data = [data]
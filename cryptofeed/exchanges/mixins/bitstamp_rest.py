@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 
@@ -14,6 +13,7 @@ from cryptofeed.defines import CANDLES
 from cryptofeed.exchange import RestExchange
 from cryptofeed.util.time import timedelta_str_to_sec
 from cryptofeed.types import Candle
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -35,7 +35,7 @@ class BitstampRestMixin(RestExchange):
             if start and end:
                 endpoint = f'{base}&start={int(start)}&end={int(end)}'
 
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)['data']['ohlc']
             data = [Candle(self.id, symbol, float(e['timestamp']), float(e['timestamp']) + interval_sec, interval, None, Decimal(e['open']), Decimal(e['close']), Decimal(e['high']), Decimal(e['low']), Decimal(e['volume']), True, float(e['timestamp']), raw=e) for e in data]
             yield data
@@ -43,4 +43,3 @@ class BitstampRestMixin(RestExchange):
             end = data[0].start - interval_sec
             if not start or start >= end:
                 break
-            await asyncio.sleep(1 / self.request_limit)
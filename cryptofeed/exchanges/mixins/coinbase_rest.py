@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 import base64
 from cryptofeed.util.time import timedelta_str_to_sec
 import hmac
@@ -21,6 +20,7 @@ from cryptofeed.defines import BUY, CANCELLED, FILLED, FILL_OR_KILL, IMMEDIATE_O
 from cryptofeed.exceptions import UnexpectedMessage
 from cryptofeed.exchange import RestExchange
 from cryptofeed.types import OrderBook, Candle, Trade, Ticker, OrderInfo, Balance
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY, DEFAULT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -92,18 +92,18 @@ class CoinbaseRestMixin(RestExchange):
             "Content-Type": "application/json"
         }
 
-    async def _request(self, method: str, endpoint: str, auth: bool = False, body=None, retry_count=1, retry_delay=60):
+    async def _request(self, method: str, endpoint: str, auth: bool = False, body=None, retry_count=1, retry_delay=60, priority=DEFAULT_PRIORITY):
         api = self.sandbox_api if self.sandbox else self.api
         header = None
         if auth:
             header = self._generate_signature(endpoint, method, body=json.dumps(body) if body else '')
 
         if method == "GET":
-            data = await self.http_conn.read(f'{api}{endpoint}', header=header, retry_count=retry_count, retry_delay=retry_delay)
+            data = await self.http_conn.read(f'{api}{endpoint}', header=header, retry_count=retry_count, retry_delay=retry_delay, priority=priority)
         elif method == 'POST':
-            data = await self.http_conn.write(f'{api}{endpoint}', msg=json.dumps(body), header=header, retry_count=retry_count, retry_delay=retry_delay)
+            data = await self.http_conn.write(f'{api}{endpoint}', msg=json.dumps(body), header=header, retry_count=retry_count, retry_delay=retry_delay, priority=priority)
         elif method == 'DELETE':
-            data = await self.http_conn.delete(f'{api}{endpoint}', header=header, retry_count=retry_count, retry_delay=retry_delay)
+            data = await self.http_conn.delete(f'{api}{endpoint}', header=header, retry_count=retry_count, retry_delay=retry_delay, priority=priority)
         return json.loads(data, parse_float=Decimal)
 
     async def _date_to_trade(self, symbol: str, timestamp: float) -> int:
@@ -116,7 +116,7 @@ class CoinbaseRestMixin(RestExchange):
         lower = 0
         bound = (upper - lower) // 2
         while True:
-            data = await self._request('GET', f'/products/{symbol}/trades?after={bound}')
+            data = await self._request('GET', f'/products/{symbol}/trades?after={bound}', priority=BACKFILL_PRIORITY)
             data = list(reversed(data))
             if len(data) == 0:
                 return bound
@@ -132,7 +132,6 @@ class CoinbaseRestMixin(RestExchange):
                 else:
                     upper = bound
                     bound = (upper + lower) // 2
-            await asyncio.sleep(1 / self.request_limit)
 
     def _trade_normalize(self, symbol: str, data: dict) -> dict:
         return Trade(
@@ -159,13 +158,12 @@ class CoinbaseRestMixin(RestExchange):
                     limit = 100 - (start_id - end_id)
                     start_id = end_id
                 if limit > 0:
-                    data = await self._request('GET', f'/products/{symbol}/trades?after={start_id}&limit={limit}', retry_count=retry_count, retry_delay=retry_delay)
+                    data = await self._request('GET', f'/products/{symbol}/trades?after={start_id}&limit={limit}', retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
                     data = list(reversed(data))
 
                 yield list(map(lambda x: self._trade_normalize(symbol, x), data))
                 if start_id >= end_id:
                     break
-                await asyncio.sleep(1 / self.request_limit)
         else:
             data = await self._request('GET', f"/products/{symbol}/trades", retry_count=retry_count, retry_delay=retry_delay)
             yield [self._trade_normalize(symbol, d) for d in data]
@@ -330,10 +328,9 @@ class CoinbaseRestMixin(RestExchange):
                     break
 
                 url = f'/products/{symbol}/candles?granularity={valid_intervals[interval]}&start={self._to_isoformat(start_id)}&end={self._to_isoformat(end_id)}'
-                data = await self._request('GET', url, retry_count=retry_count, retry_delay=retry_delay)
+                data = await self._request('GET', url, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
                 data = list(reversed(data))
                 yield list(map(lambda x: self._candle_normalize(symbol, x, interval), data))
-                await asyncio.sleep(1 / self.request_limit)
                 start_id = end_id + valid_intervals[interval]
         else:
             data = await self._request('GET', f"/products/{symbol}/candles?granularity={valid_intervals[interval]}", retry_count=retry_count, retry_delay=retry_delay)
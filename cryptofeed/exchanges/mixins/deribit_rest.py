@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 
@@ -13,6 +12,7 @@ from yapic import json
 from cryptofeed.defines import BUY, L2_BOOK, SELL, TRADES
 from cryptofeed.exchange import RestExchange
 from cryptofeed.types import OrderBook
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -35,7 +35,7 @@ class DeribitRestMixin(RestExchange):
             if start and end:
                 endpoint = f"{self.api}get_last_trades_by_instrument_and_time?&start_timestamp={start}&end_timestamp={end}&instrument_name={symbol}&include_old=true&count=1000"
 
-            data = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            data = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(data, parse_float=Decimal)["result"]["trades"]
 
             if data:
@@ -51,7 +51,6 @@ class DeribitRestMixin(RestExchange):
 
             if len(orig_data) < 1000 or not start or not end:
                 break
-            await asyncio.sleep(1 / self.request_limit)
 
     def _trade_normalization(self, trade: list) -> dict:
 
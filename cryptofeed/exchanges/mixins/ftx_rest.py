@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 
@@ -14,6 +13,7 @@ from cryptofeed.defines import BUY, CANDLES, FUNDING, L2_BOOK, TICKER, TRADES, S
 from cryptofeed.exchange import RestExchange
 from cryptofeed.util.time import timedelta_str_to_sec
 from cryptofeed.types import OrderBook, Candle
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -56,7 +56,7 @@ class FTXRestMixin(RestExchange):
             if start and end:
                 endpoint = f"{self.api}/markets/{symbol}/trades?start_time={start}&end_time={end}"
 
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)['result']
 
             orig_data = list(data)
@@ -69,7 +69,6 @@ class FTXRestMixin(RestExchange):
             if len(orig_data) < 5000:
                 break
             end = int(data[-1]['timestamp'])
-            await asyncio.sleep(1 / self.request_limit)
 
     async def funding(self, symbol: str, retry_count=1, retry_delay=10):
         sym = self.std_symbol_to_exchange_symbol(symbol)
@@ -90,7 +89,7 @@ class FTXRestMixin(RestExchange):
             if start and end:
                 endpoint = f'{base}&start_time={start}&end_time={end}'
 
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)['result']
             data = [Candle(self.id, symbol, self.timestamp_normalize(e['startTime']), self.timestamp_normalize(e['startTime']) + interval_sec, interval, None, Decimal(e['open']), Decimal(e['close']), Decimal(e['high']), Decimal(e['low']), Decimal(e['volume']), True, self.timestamp_normalize(e['startTime']), raw=e) for e in data]
             yield data
@@ -98,7 +97,6 @@ class FTXRestMixin(RestExchange):
             end = data[0].start - interval_sec
             if not start or len(data) < 1501:
                 break
-            await asyncio.sleep(1 / self.request_limit)
 
     @staticmethod
     def _dedupe(data, last):
@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 
@@ -13,6 +12,7 @@ from yapic import json
 from cryptofeed.defines import BALANCES, BUY, CANCELLED, CANCEL_ORDER, FILLED, FILL_OR_KILL, IMMEDIATE_OR_CANCEL, L2_BOOK, LIMIT, MAKER_OR_CANCEL, OPEN, ORDER_STATUS, PARTIAL, PLACE_ORDER, SELL, TICKER, TRADES, TRADE_HISTORY
 from cryptofeed.exchange import RestExchange
 from cryptofeed.types import OrderBook
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY, DEFAULT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -54,9 +54,9 @@ class GeminiRestMixin(RestExchange):
             'order_status': status
         }
 
-    async def _get(self, command: str, retry_count, retry_delay, params=''):
+    async def _get(self, command: str, retry_count, retry_delay, params='', priority=DEFAULT_PRIORITY):
         api = self.api if not self.sandbox else self.sandbox_api
-        resp = await self.http_conn.read(f"{api}{command}{params}", retry_count=retry_count, retry_delay=retry_delay)
+        resp = await self.http_conn.read(f"{api}{command}{params}", retry_count=retry_count, retry_delay=retry_delay, priority=priority)
         return json.loads(resp, parse_float=Decimal)
 
     async def _post(self, command: str, payload=None):
@@ -110,7 +110,7 @@ class GeminiRestMixin(RestExchange):
             }
 
         while True:
-            data = reversed(await self._get(f"/v1/trades/{sym}?", retry_count, retry_delay, params=params))
+            data = reversed(await self._get(f"/v1/trades/{sym}?", retry_count, retry_delay, params=params, priority=BACKFILL_PRIORITY))
             if end:
                 data = [_trade_normalize(d) for d in data if d['timestampms'] <= end_ts]
             else:
@@ -121,7 +121,6 @@ class GeminiRestMixin(RestExchange):
                 params['since'] = int(data[-1]['timestamp'] * 1000) + 1
             if len(data) < 500 or not start:
                 break
-            await asyncio.sleep(1 / self.request_limit)
 
     # Trading APIs
     async def place_order(self, symbol: str, side: str, order_type: str, amount: Decimal, price=None, client_order_id=None, options=None):
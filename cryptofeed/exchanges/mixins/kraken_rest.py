@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 import base64
 import hashlib
 import hmac
@@ -18,6 +17,7 @@ from yapic import json
 from cryptofeed.defines import BALANCES, BUY, CANCELLED, CANCEL_ORDER, FILLED, L2_BOOK, LIMIT, MAKER_OR_CANCEL, MARKET, OPEN, ORDERS, ORDER_STATUS, PLACE_ORDER, SELL, TICKER, TRADES, TRADE_HISTORY
 from cryptofeed.exchange import RestExchange
 from cryptofeed.types import OrderBook
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -131,12 +131,11 @@ class KrakenRestMixin(RestExchange):
 
         while start_date < end_date:
             endpoint = f"{self.api}/public/Trades?pair={symbol}&since={start_date}"
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
             yield data
 
             start_date = int(int(data['result']['last']) / 1_000_000_000)
-            await asyncio.sleep(1 / self.request_limit)
 
     def _trade_normalization(self, trade: list, symbol: str) -> dict:
         """
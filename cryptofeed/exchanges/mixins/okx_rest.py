@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 
@@ -14,6 +13,7 @@ from cryptofeed.exchange import RestExchange
 from cryptofeed.types import Candle
 from cryptofeed.defines import CANDLES
 from cryptofeed.util.time import timedelta_str_to_sec
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 LOG = logging.getLogger('feedhandler')
 
@@ -41,7 +41,7 @@ class OKXRestMixin(RestExchange):
         while True:
             if start and end:
                 endpoint = f"{base_endpoint}&before={int(start * 1000)}&after={int(end * 1000)}&bar={interval}&limit=300"
-            r = await self.http_conn.read(endpoint, retry_delay=retry_delay, retry_count=retry_count)
+            r = await self.http_conn.read(endpoint, retry_delay=retry_delay, retry_count=retry_count, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
             data = [Candle(self.id, symbol, int(e[0]) / 1000, int(e[0]) / 1000 + offset, interval, None, Decimal(e[1]), Decimal(e[4]), Decimal(e[2]), Decimal(e[3]), Decimal(e[5]), True, int(e[0]) / 1000, raw=e) for e in reversed(data['data'])]
             yield data
@@ -49,5 +49,3 @@ class OKXRestMixin(RestExchange):
             if len(data) < 300 or start >= end:
                 break
             end = data[0].timestamp
-
-            await asyncio.sleep(1 / self.request_limit)
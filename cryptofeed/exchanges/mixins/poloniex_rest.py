@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 import hashlib
 import hmac
 import urllib
@@ -17,6 +16,7 @@ from yapic import json
 from cryptofeed.defines import BALANCES, BUY, CANCELLED, CANCEL_ORDER, FILLED, FILL_OR_KILL, IMMEDIATE_OR_CANCEL, L2_BOOK, LIMIT, MAKER_OR_CANCEL, OPEN, ORDER_INFO, ORDER_STATUS, PARTIAL, PLACE_ORDER, SELL, TICKER, TRADES, TRADE_HISTORY
 from cryptofeed.exchange import RestExchange
 from cryptofeed.types import OrderBook
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY, DEFAULT_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -93,9 +93,9 @@ class PoloniexRestMixin(RestExchange):
             'order_status': FILLED
         }
 
-    async def _get(self, command: str, params='', retry_count=1, retry_delay=60):
+    async def _get(self, command: str, params='', retry_count=1, retry_delay=60, priority=DEFAULT_PRIORITY):
         base_url = f"{self.api}/public?command={command}{params}"
-        resp = await self.http_conn.read(base_url, retry_count=retry_count, retry_delay=retry_delay)
+        resp = await self.http_conn.read(base_url, retry_count=retry_count, retry_delay=retry_delay, priority=priority)
         return json.loads(resp, parse_float=Decimal)
 
     async def _post(self, command: str, payload=None):
@@ -161,7 +161,7 @@ class PoloniexRestMixin(RestExchange):
                 if e > end:
                     e = end
 
-                data = await self._get("returnTradeHistory", params=f"&currencyPair={symbol}&start={start}&end={end}", retry_count=retry_count, retry_delay=retry_delay)
+                data = await self._get("returnTradeHistory", params=f"&currencyPair={symbol}&start={start}&end={end}", retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
                 data.reverse()
                 yield list(map(lambda x: self._trade_normalize(x, symbol), data))
 
@@ -169,7 +169,6 @@ class PoloniexRestMixin(RestExchange):
                 e += 21600
                 if s >= end:
                     break
-                await asyncio.sleep(1 / self.request_limit)
 
     # Trading API Routes
     async def balances(self):
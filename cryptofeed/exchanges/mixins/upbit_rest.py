@@ -4,7 +4,6 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-import asyncio
 from decimal import Decimal
 import logging
 from datetime import datetime, timezone
@@ -15,6 +14,7 @@ from cryptofeed.defines import CANDLES
 from cryptofeed.exchange import RestExchange
 from cryptofeed.util.time import timedelta_str_to_sec
 from cryptofeed.types import Candle
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY
 
 
 LOG = logging.getLogger('feedhandler')
@@ -75,7 +75,7 @@ class UpbitRestMixin(RestExchange):
                 end_timestamp = end_timestamp.replace(microsecond=0).isoformat() + 'Z'
                 endpoint = f'{base}&to={end_timestamp}'
 
-            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay)
+            r = await self.http_conn.read(endpoint, retry_count=retry_count, retry_delay=retry_delay, priority=BACKFILL_PRIORITY)
             data = json.loads(r, parse_float=Decimal)
             data = [Candle(self.id, symbol, _ts_norm(e['candle_date_time_utc']), _ts_norm(e['candle_date_time_utc']) + interval_mins * 60, interval, None, Decimal(e['opening_price']), None, Decimal(e['high_price']), Decimal(e['low_price']), Decimal(e['candle_acc_trade_volume']), True, float(e['timestamp']) / 1000, raw=e) for e in data]
             data = list(sorted([c for c in data if retain(c, _last)], key=lambda x: x.start))
@@ -88,4 +88,3 @@ class UpbitRestMixin(RestExchange):
             start = data[-1].start + offset
             if not end or start >= end:
                 break
-            await asyncio.sleep(1 / self.request_limit)
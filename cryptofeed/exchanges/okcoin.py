@@ -14,7 +14,6 @@ from yapic import json
 
 from cryptofeed.connection import AsyncConnection, RestEndpoint, Routes, WebsocketEndpoint
 from cryptofeed.defines import ASK, BID, BUY, L2_BOOK, OKCOIN, SELL, TICKER, TRADES
-from cryptofeed.exceptions import BadChecksum
 from cryptofeed.feed import Feed
 from cryptofeed.symbols import Symbol
 from cryptofeed.types import OrderBook, Trade, Ticker
@@ -111,8 +110,8 @@ class OKCoin(Feed):
                 asks = {Decimal(price): Decimal(amount) for price, amount, *_ in update['asks']}
                 self._l2_book[pair] = OrderBook(self.id, pair, max_depth=self.max_depth, checksum_format='OKCOIN', bids=bids, asks=asks)
 
-                if self.checksum_validation and self._l2_book[pair].book.checksum() != (update['checksum'] & 0xFFFFFFFF):
-                    raise BadChecksum
+                if self.checksum_validation:
+                    self.validate_checksum(pair, self._l2_book[pair].book, 'OKCOIN', update['checksum'] & 0xFFFFFFFF)
                 await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, timestamp=self.timestamp_normalize(update['timestamp']), raw=msg, checksum=update['checksum'] & 0xFFFFFFFF)
         else:
             # update
@@ -132,8 +131,8 @@ class OKCoin(Feed):
                             delta[s].append((price, amount))
                             self._l2_book[pair].book[s][price] = amount
 
-                if self.checksum_validation and self._l2_book[pair].book.checksum() != (update['checksum'] & 0xFFFFFFFF):
-                    raise BadChecksum
+                if self.checksum_validation:
+                    self.validate_checksum(pair, self._l2_book[pair].book, 'OKCOIN', update['checksum'] & 0xFFFFFFFF, delta=delta)
                 await self.book_callback(L2_BOOK, self._l2_book[pair], timestamp, timestamp=self.timestamp_normalize(update['timestamp']), raw=msg, delta=delta, checksum=update['checksum'] & 0xFFFFFFFF)
 
     async def message_handler(self, msg: str, conn, timestamp: float):
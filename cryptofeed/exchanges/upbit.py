@@ -32,6 +32,7 @@ class Upbit(Feed, UpbitRestMixin):
         TRADES: TRADES,
     }
     request_limit = 10
+    snapshot_only_book = True
 
     @classmethod
     def timestamp_normalize(cls, ts: float) -> float:
@@ -88,7 +89,8 @@ class Upbit(Feed, UpbitRestMixin):
         """
         Doc : https://docs.upbit.com/v1.0.7/reference#시세-호가-정보orderbook-조회
 
-        Currently, Upbit orderbook api only provides 15 depth book state and does not support delta
+        Currently, Upbit orderbook api only provides 15 depth book state and does not support delta,
+        the delta is computed from the previous snapshot in book_callback
 
         {
             'ty': 'orderbook'       // Event type
@@ -5,8 +5,10 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
-from collections import defaultdict
+from collections import defaultdict, deque
+from decimal import Decimal
 import logging
+import time
 from typing import Tuple, Callable, List, Union
 
 from aiohttp.typedefs import StrOrURL
@@ -14,17 +16,28 @@ from aiohttp.typedefs import StrOrURL
 from cryptofeed.callback import Callback
 from cryptofeed.connection import AsyncConnection, HTTPAsyncConn, WSAsyncConn
 from cryptofeed.connection_handler import ConnectionHandler
-from cryptofeed.defines import BALANCES, CANDLES, FUNDING, INDEX, L2_BOOK, L3_BOOK, LIQUIDATIONS, OPEN_INTEREST, ORDER_INFO, POSITIONS, TICKER, TRADES, FILLS
-from cryptofeed.exceptions import BidAskOverlapping
+from cryptofeed.defines import ASK, BALANCES, BID, CANDLES, DECIMAL, FLOAT, FUNDING, INDEX, L2_BOOK, L3_BOOK, LIQUIDATIONS, OPEN_INTEREST, ORDER_INFO, POSITIONS, SCALED_INT, TICKER, TRADES, FILLS, L1_BOOK
+from cryptofeed.exceptions import BadChecksum, BidAskOverlapping
 from cryptofeed.exchange import Exchange
-from cryptofeed.types import OrderBook
+from cryptofeed.symbols import Symbols
+from cryptofeed.types import BookChecksum, L1Book, OrderBook
+from cryptofeed.util.book import DecimalCache, sorted_side_delta
+from cryptofeed.util.rate_limit import RateLimiter
 
 
 LOG = logging.getLogger('feedhandler')
 
 
 class Feed(Exchange):
-    def __init__(self, candle_interval='1m', candle_closed_only=True, timeout=120, timeout_interval=30, retries=10, symbols=None, channels=None, subscription=None, callbacks=None, max_depth=0, checksum_validation=False, cross_check=False, exceptions=None, log_message_on_error=False, delay_start=0, http_proxy: StrOrURL = None, **kwargs):
+    # numeric modes the exchange's market data parsers support
+    numeric_modes = (DECIMAL,)
+    # True if the exchange's books can use the array backed book engine (cryptofeed.types.ArrayBook)
+    native_book_support = False
+    # True if every L2 book message is a full snapshot that replaces book.bids and book.asks.
+    # book_callback computes the delta from the previous snapshot for these exchanges
+    snapshot_only_book = False
+
+    def __init__(self, candle_interval='1m', candle_closed_only=True, timeout=120, timeout_interval=30, retries=10, symbols=None, channels=None, subscription=None, callbacks=None, max_depth=0, checksum_validation=False, checksum_interval=1, checksum_period=0, cross_check=False, exceptions=None, log_message_on_error=False, delay_start=0, http_proxy: StrOrURL = None, numeric_mode=DECIMAL, native_book=False, **kwargs):
         """
         candle_interval: str
             the candle interval. See the specific exchange to see what intervals they support
@@ -45,6 +58,12 @@ class Feed(Exchange):
             Length of time between a candle's Open and Close. Valid on exchanges with support for candles
         checksum_validation: bool
             Toggle checksum validation, when supported by an exchange.
+        checksum_interval: int
+            With checksum_validation, validate every Nth book update per symbol (snapshots are always validated).
+            0 to only use checksum_period.
+        checksum_period: float
+            With checksum_validation, validate a symbol's book when at least this many seconds have passed since
+            it was last validated. 0 (the default) to only use checksum_interval.
         cross_check: bool
             Toggle a check for a crossed book. Should not be needed on exchanges that support
             checksums or provide message sequence numbers.
@@ -59,8 +78,30 @@ class Feed(Exchange):
             on a single exchange, you may encounter 429s. You can use this to stagger the starts.
         http_proxy: str
             URL of proxy server. Passed to HTTPPoll and HTTPAsyncConn. Only used for HTTP GET requests.
+        numeric_mode: str
+            numeric type used for prices and sizes in market data (trades, tickers, books, etc).
+            DECIMAL (default) uses decimal.Decimal, FLOAT uses float. SCALED_INT stores prices as
+            integer multiples of the symbol's tick size, and sizes as floats. Only supported on some
+            exchanges (see numeric_modes on the exchange class).
+        native_book: bool
+            store books in the array backed book engine (cryptofeed.types.ArrayBook) rather than
+            order_book.OrderBook. Only supported on some exchanges (see native_book_support).
         """
         super().__init__(**kwargs)
+        if numeric_mode not in (DECIMAL, FLOAT, SCALED_INT):
+            raise ValueError(f"numeric_mode must be one of {(DECIMAL, FLOAT, SCALED_INT)}")
+        if numeric_mode not in self.numeric_modes:
+            raise ValueError(f"{self.id} does not support numeric_mode {numeric_mode}")
+        if numeric_mode != DECIMAL and checksum_validation:
+            raise ValueError("checksum_validation requires numeric_mode DECIMAL")
+        if native_book and not self.native_book_support:
+            raise ValueError(f"{self.id} does not support native_book")
+        self.numeric_mode = numeric_mode
+        self.native_book = native_book
+        self.numeric_type = Decimal if numeric_mode == DECIMAL else float
+        self._tick_scale = {}
+        # interned Decimal prices, see price_converter()
+        self._prices = DecimalCache()
         self.log_on_error = log_message_on_error
         self.retries = retries
         self.exceptions = exceptions
@@ -71,16 +112,31 @@ class Feed(Exchange):
         self.cross_check = cross_check
         self.normalized_symbols = []
         self.max_depth = max_depth
-        self.previous_book = defaultdict(dict)
+        # symbol -> (bids, asks) of the last L2 snapshot, for snapshot_only_book exchanges
+        self.previous_book = {}
         self.checksum_validation = checksum_validation
+        self.checksum_interval = checksum_interval
+        self.checksum_period = checksum_period
+        # symbol -> BookChecksum, see validate_checksum()
+        self.book_checksums = {}
         self.requires_authentication = False
         self._feed_config = defaultdict(list)
-        self.http_conn = HTTPAsyncConn(self.id, http_proxy)
+        # REST requests to the exchange share one rate limiter per process, per API key if one is configured
+        rate_limiter = None
+        if self.request_limit is not NotImplemented:
+            rate_limiter = RateLimiter.get((self.id, self.key_id) if self.key_id else self.id, self.request_limit)
+        self.http_conn = HTTPAsyncConn(self.id, http_proxy, rate_limiter=rate_limiter)
         self.http_proxy = http_proxy
         self.start_delay = delay_start
         self.candle_interval = candle_interval
         self.candle_closed_only = candle_closed_only
         self._sequence_no = {}
+        # per symbol book gap and recovery counters, see book_gap() and book_recovered()
+        self.book_recovery = defaultdict(lambda: {'gaps': 0, 'recoveries': 0, 'last_recovery_time': None, 'max_recovery_time': 0.0, 'total_recovery_time': 0.0})
+        self._recovery_start = {}
+        self._resync_tasks = {}
+        self._resync_buffer = {}
+        self._resync_restart = set()
 
         if self.valid_candle_intervals != NotImplemented:
             if candle_interval not in self.valid_candle_intervals:
@@ -146,6 +202,52 @@ class Feed(Exchange):
             if not isinstance(callback, list):
                 self.callbacks[key] = [callback]
 
+        # L2_BOOK and L1_BOOK callbacks on a feed subscribed to L3_BOOK, but not to the exchange's
+        # L2/L1 channel, are fed from the L3 books (see derived_book_callback)
+        self.derived_books = set()
+        l3_channel = self.websocket_channels.get(L3_BOOK)
+        if callbacks and l3_channel is not None and l3_channel in self.subscription:
+            for book_type in (L2_BOOK, L1_BOOK):
+                if book_type in callbacks and self.websocket_channels.get(book_type) not in self.subscription:
+                    self.derived_books.add(book_type)
+        # symbol -> [L2 OrderBook view of the L3 book, last top of book]
+        self._derived_books = {}
+
+    def price(self, symbol: str, value):
+        """
+        Convert a price for the (normalized) symbol to the feed's numeric mode
+        """
+        if self.numeric_mode == SCALED_INT:
+            return round(float(value) * self.tick_scale(symbol))
+        if self.numeric_mode == DECIMAL and isinstance(value, str):
+            return self._prices[value]
+        return self.numeric_type(value)
+
+    def price_converter(self, symbol: str):
+        """
+        A callable that converts raw (string) prices for the (normalized) symbol to the
+        feed's numeric mode, for bulk conversion of snapshots (see OrderBook.load). Decimal
+        prices are interned, so the levels of a snapshot and the updates that follow share
+        objects whose hashes are already computed.
+        """
+        if self.numeric_mode == SCALED_INT:
+            scale = self.tick_scale(symbol)
+            return lambda value: round(float(value) * scale)
+        if self.numeric_mode == DECIMAL:
+            return self._prices.__getitem__
+        return self.numeric_type
+
+    def tick_scale(self, symbol: str) -> float:
+        """
+        The multiplier that converts a price for the symbol to an integer number of ticks
+        """
+        try:
+            return self._tick_scale[symbol]
+        except KeyError:
+            tick_size = Symbols.get(self.id)[1]['tick_size'][symbol]
+            self._tick_scale[symbol] = float(1 / Decimal(str(tick_size)))
+            return self._tick_scale[symbol]
+
     def _connect_rest(self):
         """
         Child classes should override this method to generate connection objects that
@@ -239,12 +341,204 @@ class Feed(Exchange):
         if self.cross_check:
             self.check_bid_ask_overlapping(book)
 
+        if delta is None and self.snapshot_only_book and book_type == L2_BOOK:
+            delta = self.snapshot_delta(book)
+
         book.timestamp = timestamp
         book.raw = raw
         book.sequence_number = sequence_number
         book.delta = delta
         book.checksum = checksum
         await self.callback(book_type, book, receipt_timestamp)
+        if self.derived_books and book_type == L3_BOOK:
+            await self.derived_book_callback(book, receipt_timestamp)
+
+    async def derived_book_callback(self, book: OrderBook, receipt_timestamp: float):
+        """
+        Deliver the L2 and top of book (L1) views of an L3 book update. The L2 book is the
+        L3 book's aggregated view (OrderBook.l2_view), and its delta holds the new aggregate
+        size of each level the L3 delta touched. L1Book updates are only sent when the top of
+        the book changes.
+        """
+        l3 = book.book
+        state = self._derived_books.get(book.symbol)
+        if state is None or state[0].book is not l3.l2:
+            state = self._derived_books[book.symbol] = [book.l2_view(), None]
+
+        if L2_BOOK in self.derived_books:
+            delta = None
+            if book.delta is not None:
+                delta = {BID: [], ASK: []}
+                for side in (BID, ASK):
+                    levels = l3[side]
+                    seen = set()
+                    for _, price, _ in book.delta[side]:
+                        if price not in seen:
+                            seen.add(price)
+                            delta[side].append((price, levels[price].size if price in levels else 0))
+            if delta is None or delta[BID] or delta[ASK]:
+                await self.book_callback(L2_BOOK, state[0], receipt_timestamp, timestamp=book.timestamp, raw=book.raw, sequence_number=book.sequence_number, delta=delta)
+
+        if L1_BOOK in self.derived_books and len(l3.bids) and len(l3.asks):
+            bid, bid_level = l3.bids.index(0)
+            ask, ask_level = l3.asks.index(0)
+            top = (bid, bid_level.size, ask, ask_level.size)
+            if top != state[1]:
+                state[1] = top
+                await self.callback(L1_BOOK, L1Book(self.id, book.symbol, *top, book.timestamp if book.timestamp is not None else receipt_timestamp), receipt_timestamp)
+
+    def snapshot_delta(self, book: OrderBook):
+        """
+        Delta between book and the previous snapshot of the same symbol, or None for the
+        first snapshot. Assigning a side refills the book's sorted dict in place, so the
+        previous snapshot is kept as each side's sorted prices and sizes, both produced by
+        the sorted dict itself.
+        """
+        bids = book.book.bids
+        asks = book.book.asks
+        current = (bids.keys(), bids.to_dict(), asks.keys(), asks.to_dict())
+        previous = self.previous_book.get(book.symbol)
+        self.previous_book[book.symbol] = current
+        if previous is None:
+            return None
+        return {BID: sorted_side_delta(previous[0], previous[1], current[0], current[1], True),
+                ASK: sorted_side_delta(previous[2], previous[3], current[2], current[3], False)}
+
+    def validate_checksum(self, symbol: str, book, checksum_format: str, expected, delta: dict = None):
+        """
+        Validate book (the order_book/ArrayBook in OrderBook.book) against the exchange's checksum
+        with an incremental BookChecksum per symbol. Pass delta=None for a snapshot, which is
+        always validated, and the update's delta otherwise (expected can be None if the update
+        has no checksum). Updates are validated according to checksum_interval and checksum_period.
+
+        A mismatch is checked again with a full checksum of the book. If that matches, the
+        incremental state is rebuilt, otherwise BadChecksum is raised so the book is resynced.
+        """
+        engine = self.book_checksums.get(symbol)
+        if delta is None or engine is None:
+            if engine is None:
+                engine = self.book_checksums[symbol] = BookChecksum(checksum_format, max_depth=self.max_depth)
+            engine.load(book)
+            if delta is not None:
+                engine.rebuilds += 1
+        else:
+            engine.update(delta)
+            if expected is None:
+                return
+            engine.updates += 1
+            if self.checksum_interval != 1 or self.checksum_period:
+                now = time.time() if self.checksum_period else 0
+                if not ((self.checksum_interval and engine.updates >= self.checksum_interval) or (self.checksum_period and now - engine.last_check >= self.checksum_period)):
+                    return
+                engine.last_check = now
+            engine.updates = 0
+
+        if expected is None:
+            return
+        engine.checks += 1
+        if engine.checksum() == expected:
+            return
+        if book.checksum() == expected:
+            LOG.warning("%s: incremental checksum state for %s was out of sync with the book, rebuilding it", self.id, symbol)
+            engine.load(book)
+            engine.rebuilds += 1
+            return
+        raise BadChecksum(f"Checksum validation on {symbol} orderbook failed")
+
+    def book_gap(self, symbol: str):
+        """
+        Record a gap (missed update) in the book for symbol. The recovery time is measured
+        from the first gap until book_recovered() is called for the symbol.
+        """
+        self.book_recovery[symbol]['gaps'] += 1
+        if symbol not in self._recovery_start:
+            self._recovery_start[symbol] = time.time()
+
+    def book_recovered(self, symbol: str):
+        """
+        Record that the book for symbol is in sync again (a no-op if there was no gap)
+        """
+        start = self._recovery_start.pop(symbol, None)
+        if start is None:
+            return
+        elapsed = time.time() - start
+        stats = self.book_recovery[symbol]
+        stats['recoveries'] += 1
+        stats['last_recovery_time'] = elapsed
+        stats['max_recovery_time'] = max(stats['max_recovery_time'], elapsed)
+        stats['total_recovery_time'] += elapsed
+        LOG.info("%s: book for %s recovered in %.3f seconds", self.id, symbol, elapsed)
+
+    def book_recovering(self, symbol: str) -> bool:
+        return symbol in self._recovery_start
+
+    def resync_pending(self, symbol: str) -> bool:
+        return symbol in self._resync_tasks
+
+    def buffer_book_update(self, symbol: str, msg, timestamp: float):
+        """
+        Hold an update for symbol while resync_book() is fetching a snapshot
+        """
+        self._resync_buffer[symbol].append((msg, timestamp))
+
+    def resync_book(self, symbol: str, snapshot: Callable, handler: Callable, msg=None, timestamp: float = None, buffer_size=1000):
+        """
+        Rebuild the book for a single symbol in the background, without affecting the
+        connection or any other symbol.
+
+        snapshot: coroutine function that fetches the book (eg. over REST) and stores it
+        handler: coroutine function (msg, timestamp) that applies an update to the book. Updates held
+            with buffer_book_update() while the snapshot was in flight are replayed through it.
+        msg, timestamp: an update to buffer before starting
+
+        If called again for the symbol while its buffer is being replayed (ie. handler found
+        another gap), a new snapshot is fetched and msg is replayed again, ahead of the rest
+        of the buffer.
+        """
+        if symbol in self._resync_tasks:
+            self._resync_restart.add(symbol)
+            if msg is not None:
+                self._resync_buffer[symbol].appendleft((msg, timestamp))
+            return
+
+        self._resync_buffer[symbol] = deque(maxlen=buffer_size)
+        self._resync_tasks[symbol] = asyncio.create_task(self._resync_book(symbol, snapshot, handler))
+        if msg is not None:
+            self.buffer_book_update(symbol, msg, timestamp)
+
+    async def _resync_book(self, symbol: str, snapshot: Callable, handler: Callable):
+        buffer = self._resync_buffer[symbol]
+        delay = 1
+        try:
+            while True:
+                self._resync_restart.discard(symbol)
+                try:
+                    await snapshot()
+                    while buffer and symbol not in self._resync_restart:
+                        msg, timestamp = buffer.popleft()
+                        await handler(msg, timestamp)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    LOG.error("%s: failed to resync book for %s, retrying in %d seconds", self.id, symbol, delay, exc_info=True)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+                    self._resync_restart.add(symbol)
+                if symbol not in self._resync_restart:
+                    break
+            self.book_recovered(symbol)
+        finally:
+            if self._resync_tasks.get(symbol) is asyncio.current_task():
+                del self._resync_tasks[symbol]
+                del self._resync_buffer[symbol]
+                self._resync_restart.discard(symbol)
+
+    def cancel_book_resyncs(self):
+        for task in self._resync_tasks.values():
+            task.cancel()
+        self._resync_tasks = {}
+        self._resync_buffer = {}
+        self._resync_restart = set()
 
     def check_bid_ask_overlapping(self, data):
         bid, ask = data.book.bids, data.book.asks
@@ -268,6 +562,7 @@ class Feed(Exchange):
 
     async def shutdown(self):
         LOG.info('%s: feed shutdown starting...', self.id)
+        self.cancel_book_resyncs()
         await self.http_conn.close()
 
         for callbacks in self.callbacks.values():
@@ -296,6 +591,6 @@ class Feed(Exchange):
             for callback in callbacks:
                 if hasattr(callback, 'start'):
                     cb_name = callback.__class__.__name__ if hasattr(callback, '__class__') else callback.__name__
-                    LOG.info('%s: starting backend task %s with multiprocessing=%s', self.id, cb_name, 'True' if self.config.backend_multiprocessing else 'False')
+                    LOG.info('%s: starting backend task %s with multiprocessing=%s', self.id, cb_name, self.config.backend_multiprocessing or False)
                     # Backends start tasks to write messages
                     callback.start(loop, multiprocess=self.config.backend_multiprocessing)
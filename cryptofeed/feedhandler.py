@@ -5,11 +5,14 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
+from collections import Counter
 from cryptofeed.connection import Connection
 import logging
+from multiprocessing import Process
 import signal
 from signal import SIGABRT, SIGINT, SIGTERM
 import sys
+import time
 from typing import List
 
 try:
@@ -22,16 +25,21 @@ except ImportError:
 from yapic import json
 
 from cryptofeed.config import Config
-from cryptofeed.defines import L2_BOOK
+from cryptofeed.defines import L2_BOOK, L3_BOOK
 from cryptofeed.feed import Feed
 from cryptofeed.log import get_logger
 from cryptofeed.nbbo import NBBO
+from cryptofeed.util.rate_limit import RateLimiter
 from cryptofeed.exchanges import EXCHANGE_MAP
 
 
 LOG = logging.getLogger('feedhandler')
 
 
+# relative cost of a single symbol on a channel, used to balance feeds across processes
+DEFAULT_CHANNEL_WEIGHTS = {L2_BOOK: 10, L3_BOOK: 20}
+
+
 def setup_signal_handlers(loop):
     """
     This must be run from the loop in the main thread
@@ -47,19 +55,63 @@ def setup_signal_handlers(loop):
             loop.add_signal_handler(sig, handle_stop_signals)
 
 
+def _shard_worker(shard: int, config, feeds: list, raw_data_collection, exception_handler=None, rate_shares=None):
+    """
+    Entry point for a shard process. Feeds are either Feed objects or (class, kwargs) tuples
+    that are instantiated in the worker. rate_shares maps exchange id to the number of shards
+    carrying the exchange, which split its REST request limit.
+    """
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    if rate_shares:
+        RateLimiter.set_processes(rate_shares)
+    if raw_data_collection:
+        # connection ids are only unique within a process
+        raw_data_collection.prefix = f'shard{shard}-'
+    fh = FeedHandler(config=config, raw_data_collection=raw_data_collection)
+    for feed in feeds:
+        if isinstance(feed, tuple):
+            cls, kwargs = feed
+            fh.add_feed(cls(config=fh.config, **kwargs))
+        else:
+            fh.add_feed(feed)
+    LOG.info('FH: shard %d starting with %d feeds', shard, len(fh.feeds))
+    fh.run(exception_handler=exception_handler)
+
+
 class FeedHandler:
-    def __init__(self, config=None, raw_data_collection=None):
+    def __init__(self, config=None, raw_data_collection=None, processes=0, channel_weights=None, process_retries=-1, restart_delay=5):
         """
         config: str, dict or None
             if str, absolute path (including file name) of the config file. If not provided, config can also be a dictionary of values, or
             can be None, which will default options. See docs/config.md for more information.
         raw_data_collection: callback (see AsyncFileCallback) or None
             if set, enables collection of raw data from exchanges. ALL https/wss traffic from the exchanges will be collected.
+            With processes, the callback must have a prefix attribute (AsyncFileCallback and BinaryFileCallback do), which
+            is set to shard<N>- in each worker process so shards carrying the same exchange write to different files.
+        processes: int
+            if greater than 0, feeds are sharded across this many worker processes. Feeds added by name (string) are split
+            into symbol groups that can be placed in different processes, feed objects are placed as a whole. Callbacks
+            and backends run in the worker process that owns the feed.
+        channel_weights: dict
+            relative cost of one symbol on a channel, used to balance the shards. Channels not present have a weight of 1.
+            Defaults to DEFAULT_CHANNEL_WEIGHTS.
+        process_retries: int
+            number of times a failed worker process is restarted. Set to -1 for infinite
+        restart_delay: int, float
+            seconds to wait before restarting a failed worker process
         """
         self.feeds = []
         self.config = Config(config=config)
         self.raw_data_collection = None
         self.running = False
+        self.processes = processes
+        self.channel_weights = DEFAULT_CHANNEL_WEIGHTS if channel_weights is None else channel_weights
+        self.process_retries = process_retries
+        self.restart_delay = restart_delay
+        # (weight, co-location group, feed entries) for sharded mode
+        self._shard_units = []
+        if raw_data_collection and processes and not hasattr(raw_data_collection, 'prefix'):
+            raise ValueError("raw_data_collection with processes requires a callback with a file prefix (AsyncFileCallback, BinaryFileCallback)")
         if raw_data_collection:
             Connection.raw_data_callback = raw_data_collection
             self.raw_data_collection = raw_data_collection
@@ -88,6 +140,10 @@ class FeedHandler:
             if a string is used for the feed, kwargs will be passed to the
             newly instantiated object
         """
+        if self.processes:
+            self._add_shard_feed(feed, kwargs)
+            return
+
         if isinstance(feed, str):
             if feed in EXCHANGE_MAP:
                 self.feeds.append((EXCHANGE_MAP[feed](config=self.config, **kwargs)))
@@ -104,7 +160,7 @@ class FeedHandler:
 
             self.feeds[-1].start(loop)
 
-    def add_nbbo(self, feeds: List[Feed], symbols: List[str], callback, config=None):
+    def add_nbbo(self, feeds: List[Feed], symbols: List[str], callback, config=None, **kwargs):
         """
         feeds: list of feed classes
             list of feeds (exchanges) that comprises the NBBO
@@ -114,24 +170,186 @@ class FeedHandler:
             the callback to be invoked when a new tick is calculated for the NBBO
         config: dict, str, or None
             optional information to pass to each exchange that is part of the NBBO feed
+        kwargs:
+            passed to NBBO, e.g. batch_size to batch calls to a synchronous callback
         """
-        cb = NBBO(callback, symbols)
+        cb = NBBO(callback, symbols, **kwargs)
+        if self.processes:
+            # the NBBO state is per process, so all of its feeds must be placed in the same shard
+            group = object()
+            for feed in feeds:
+                feed = feed(channels=[L2_BOOK], symbols=symbols, callbacks={L2_BOOK: cb}, config=config)
+                self._shard_units.append((self._feed_weight(feed), group, [feed]))
+            return
+
         for feed in feeds:
             self.add_feed(feed(channels=[L2_BOOK], symbols=symbols, callbacks={L2_BOOK: cb}, config=config))
 
+    def _feed_weight(self, feed: Feed) -> float:
+        weight = 0
+        for chan, symbols in feed.subscription.items():
+            weight += len(symbols) * self.channel_weights.get(feed.exchange_channel_to_std(chan), 1)
+        return max(weight, 1)
+
+    def _add_shard_feed(self, feed, kwargs: dict):
+        if not isinstance(feed, str):
+            self._shard_units.append((self._feed_weight(feed), None, [feed]))
+            return
+        if feed not in EXCHANGE_MAP:
+            raise ValueError("Invalid feed specified")
+
+        cls = EXCHANGE_MAP[feed]
+        kwargs = dict(kwargs)
+        subscription = kwargs.pop('subscription', None)
+        symbols = kwargs.pop('symbols', None)
+        channels = kwargs.pop('channels', None)
+        if subscription is None and symbols and channels:
+            subscription = {chan: list(symbols) for chan in channels}
+        if not subscription:
+            if symbols is not None:
+                kwargs['symbols'] = symbols
+            if channels is not None:
+                kwargs['channels'] = channels
+            self._shard_units.append((1, None, [(cls, kwargs)]))
+            return
+
+        # split the subscription into one group per symbol, each group carrying all of that symbol's channels.
+        # groups from the same feed that end up in the same process are merged back into a single feed.
+        groups = {}
+        for chan, syms in subscription.items():
+            for sym in syms:
+                groups.setdefault(sym, []).append(chan)
+        key = object()
+        for sym, chans in groups.items():
+            weight = sum(self.channel_weights.get(chan, 1) for chan in chans)
+            self._shard_units.append((weight, None, [(key, cls, kwargs, {chan: [sym] for chan in chans})]))
+
+    def _build_shards(self) -> List[list]:
+        """
+        Assign the shard units to processes, heaviest first, each to the least loaded process
+        """
+        units = {}
+        for weight, group, entries in self._shard_units:
+            group = id(entries) if group is None else group
+            if group in units:
+                units[group][0] += weight
+                units[group][1].extend(entries)
+            else:
+                units[group] = [weight, list(entries)]
+
+        loads = [0] * self.processes
+        assigned = [[] for _ in range(self.processes)]
+        for weight, entries in sorted(units.values(), key=lambda u: u[0], reverse=True):
+            shard = loads.index(min(loads))
+            loads[shard] += weight
+            assigned[shard].extend(entries)
+
+        shards = []
+        for shard, entries in enumerate(assigned):
+            feeds = []
+            merged = {}
+            for entry in entries:
+                if isinstance(entry, tuple) and len(entry) == 4:
+                    key, cls, kwargs, sub = entry
+                    if key not in merged:
+                        merged[key] = (cls, dict(kwargs), {})
+                        feeds.append(key)
+                    for chan, syms in sub.items():
+                        merged[key][2].setdefault(chan, []).extend(syms)
+                else:
+                    feeds.append(entry)
+            feeds = [(merged[f][0], {**merged[f][1], 'subscription': merged[f][2]}) if f in merged else f for f in feeds]
+            if feeds:
+                LOG.info('FH: shard %d assigned %d feeds with weight %s', shard, len(feeds), loads[shard])
+                shards.append(feeds)
+        return shards
+
+    def _rate_shares(self, shards: List[list]) -> dict:
+        """
+        number of shards carrying each exchange
+        """
+        shares = Counter()
+        for feeds in shards:
+            shares.update({feed[0].id if isinstance(feed, tuple) else feed.id for feed in feeds})
+        return dict(shares)
+
+    def _start_shard(self, shard: int, feeds: list, exception_handler=None, rate_shares=None) -> Process:
+        process = Process(target=_shard_worker, args=(shard, self.config, feeds, self.raw_data_collection, exception_handler, rate_shares), name=f'cryptofeed-shard-{shard}')
+        process.start()
+        return process
+
+    def _run_sharded(self, install_signal_handlers: bool, exception_handler=None):
+        """
+        Start the shard processes and supervise them, restarting any that exit, until a stop signal is received
+        """
+        def handle_stop_signals(*args):
+            raise SystemExit
+
+        if install_signal_handlers:
+            for sig in SIGNALS:
+                signal.signal(sig, handle_stop_signals)
+
+        shards = self._build_shards()
+        rate_shares = self._rate_shares(shards)
+        processes = [self._start_shard(shard, feeds, exception_handler, rate_shares) for shard, feeds in enumerate(shards)]
+        restarts = [0] * len(processes)
+        failed_at = [None] * len(processes)
+        try:
+            while self.running and any(p is not None for p in processes):
+                for shard, process in enumerate(processes):
+                    if process is None or process.is_alive():
+                        continue
+                    if failed_at[shard] is None:
+                        if process.exitcode == 0:
+                            # a shard that shut down cleanly (eg. stopped by a signal) is not restarted
+                            LOG.info('FH: shard %d exited', shard)
+                            processes[shard] = None
+                            continue
+                        failed_at[shard] = time.time()
+                        LOG.error('FH: shard %d exited with code %s', shard, process.exitcode)
+                        if self.process_retries != -1 and restarts[shard] >= self.process_retries:
+                            LOG.error('FH: shard %d failed after %d restarts - not restarting', shard, restarts[shard])
+                            processes[shard] = None
+                        continue
+                    if time.time() - failed_at[shard] >= self.restart_delay:
+                        restarts[shard] += 1
+                        failed_at[shard] = None
+                        LOG.warning('FH: restarting shard %d (restart %d)', shard, restarts[shard])
+                        processes[shard] = self._start_shard(shard, shards[shard], exception_handler, rate_shares)
+                time.sleep(0.5)
+        except (SystemExit, KeyboardInterrupt):
+            LOG.info('FH: System Exit received - shutting down shards')
+        finally:
+            self.running = False
+            for process in processes:
+                if process is not None and process.is_alive():
+                    process.terminate()
+            for process in processes:
+                if process is not None:
+                    process.join()
+
     def run(self, start_loop: bool = True, install_signal_handlers: bool = True, exception_handler=None):
         """
         start_loop: bool, default True
-            if false, will not start the event loop.
+            if false, will not start the event loop. Not supported with processes, the shard
+            processes always run their own loops
         install_signal_handlers: bool, default True
             if True, will install the signal handlers on the event loop. This
             can only be done from the main thread's loop, so if running cryptofeed on
             a child thread, this must be set to false, and setup_signal_handlers must
             be called from the main/parent thread's event loop
         exception_handler: asyncio exception handler function pointer
-            a custom exception handler for asyncio
+            a custom exception handler for asyncio. With processes, it is set on the loop of
+            every shard process, so it must be picklable (eg. a module level function)
         """
+        if self.processes and not start_loop:
+            raise ValueError("start_loop=False is not supported with processes")
         self.running = True
+        if self.processes:
+            self._run_sharded(install_signal_handlers, exception_handler)
+            LOG.info('FH: leaving run()')
+            return
+
         loop = asyncio.get_event_loop()
         # Good to enable when debugging or without code change: export PYTHONASYNCIODEBUG=1)
         # loop.set_debug(True)
@@ -5,43 +5,120 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 import asyncio
+from bisect import bisect_left, insort
+import time
 
 from cryptofeed.callback import Callback
+from cryptofeed.defines import ASK, BID
 
 
 class NBBO(Callback):
-    def __init__(self, callback, symbols):
-        self.bids = {symbol: {} for symbol in symbols}
-        self.asks = {symbol: {} for symbol in symbols}
+    """
+    Consolidated best bid and offer across exchanges. Each symbol keeps its venues' top of
+    book in two sorted arrays of (price, exchange), so a book update that moves a venue's
+    best bid or ask is a binary search and an insert (O(log V) comparisons for V venues)
+    rather than a scan of every venue, and an update that leaves the venue's top of book
+    unchanged does no work at all. The callback is only invoked when the consolidated best
+    bid or ask (price, size or exchange) of the symbol changes.
+    """
+    def __init__(self, callback, symbols, depth=0, **kwargs):
+        """
+        depth: int
+            if non zero, the callback is also passed the consolidated top `depth` levels of
+            the venues' books ({BID: [(price, size), ...], ASK: [...]}) as its last argument.
+            See consolidated_book()
+        """
+        self.depth = depth
+        # symbol -> exchange -> (bid, bid size, ask, ask size) of the venue's top of book
+        self.tops = {symbol: {} for symbol in symbols}
+        # symbol -> [(price, exchange), ...] ascending, of the venues' best bids and best asks
+        self.bids = {symbol: [] for symbol in symbols}
+        self.asks = {symbol: [] for symbol in symbols}
+        # symbol -> exchange -> receipt timestamp of the venue's last book update
+        self.last_seen = {symbol: {} for symbol in symbols}
+        # symbol -> exchange -> the venue's book (order_book/ArrayBook)
+        self.books = {symbol: {} for symbol in symbols}
+        # symbol -> last consolidated (bid, bid size, ask, ask size, bid exchange, ask exchange)
+        self.last_update = {symbol: None for symbol in symbols}
 
-        self.last_update = None
+        super(NBBO, self).__init__(callback, **kwargs)
 
-        super(NBBO, self).__init__(callback)
+    @staticmethod
+    def _move(levels: list, exchange: str, old, new):
+        if old == new:
+            return
+        if old is not None:
+            del levels[bisect_left(levels, (old, exchange))]
+        if new is not None:
+            insort(levels, (new, exchange))
 
-    def _update(self, book):
-        bid, size = book.book.bids.index(0)
-        self.bids[book.symbol][book.exchange] = {'price': bid, 'size': size}
-        ask, size = book.book.asks.index(0)
-        self.asks[book.symbol][book.exchange] = {'price': ask, 'size': size}
+    def _update(self, book, receipt_timestamp: float):
+        symbol = book.symbol
+        exchange = book.exchange
+        self.last_seen[symbol][exchange] = receipt_timestamp
+        self.books[symbol][exchange] = book.book
 
-        min_ask = min(self.asks[book.symbol], key=lambda x: self.asks[book.symbol][x]['price'])
-        max_bid = max(self.bids[book.symbol], key=lambda x: self.bids[book.symbol][x]['price'])
+        bids, asks = book.book.bids, book.book.asks
+        bid, bid_size = bids.index(0) if len(bids) else (None, None)
+        ask, ask_size = asks.index(0) if len(asks) else (None, None)
+        top = (bid, bid_size, ask, ask_size)
+        tops = self.tops[symbol]
+        previous = tops.get(exchange)
+        if previous == top:
+            return None
+        tops[exchange] = top
+        self._move(self.bids[symbol], exchange, previous[0] if previous else None, bid)
+        self._move(self.asks[symbol], exchange, previous[2] if previous else None, ask)
 
-        return self.bids[book.symbol][max_bid], self.asks[book.symbol][min_ask], max_bid, min_ask
+        if not self.bids[symbol] or not self.asks[symbol]:
+            return None
+        # best bid is the end of the ascending bids, best ask the start of the asks
+        bid, bid_feed = self.bids[symbol][-1]
+        ask, ask_feed = self.asks[symbol][0]
+        update = (bid, tops[bid_feed][1], ask, tops[ask_feed][3], bid_feed, ask_feed)
+        if self.last_update[symbol] == update:
+            return None
+        self.last_update[symbol] = update
+        return update
 
-    async def __call__(self, book, receipt_timestamp: float):
-        update = self._update(book)
+    def consolidated_book(self, symbol: str, depth: int) -> dict:
+        """
+        the top `depth` price levels of the symbol across all venues, with the sizes of the
+        venues at each price summed
+        """
+        ret = {}
+        for side in (BID, ASK):
+            levels = {}
+            for book in self.books[symbol].values():
+                book_side = book[side]
+                for i in range(min(depth, len(book_side))):
+                    price, size = book_side.index(i)
+                    levels[price] = levels[price] + size if price in levels else size
+            ret[side] = sorted(levels.items(), reverse=side == BID)[:depth]
+        return ret
 
-        # only write updates when a best bid / best aks changes
-        if self.last_update == update:
-            return
-        self.last_update = update
+    def staleness(self, symbol: str, now: float = None) -> dict:
+        """
+        seconds since each venue's last book update for the symbol
+        """
+        if now is None:
+            now = time.time()
+        return {exchange: now - ts for exchange, ts in self.last_seen[symbol].items()}
 
-        bid, ask, bid_feed, ask_feed = update
-        if bid is None:
+    async def __call__(self, book, receipt_timestamp: float):
+        update = self._update(book, receipt_timestamp)
+        # only write updates when a best bid / best ask changes
+        if update is None:
             return
+
+        bid, bid_size, ask, ask_size, bid_feed, ask_feed = update
+        args = (book.symbol, bid, bid_size, ask, ask_size, bid_feed, ask_feed)
+        if self.depth:
+            args += (self.consolidated_book(book.symbol, self.depth),)
         if self.is_async:
-            await self.callback(book.symbol, bid['price'], bid['size'], ask['price'], ask['size'], bid_feed, ask_feed)
+            await self.callback(*args)
+        elif self.batcher:
+            await self.batcher.submit(book.symbol, *args)
         else:
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.callback, book.symbol, bid['price'], bid['size'], ask['price'], ask['size'], bid_feed, ask_feed)
+            await loop.run_in_executor(None, self.callback, *args)
@@ -6,27 +6,265 @@ associated with this software.
 '''
 import asyncio
 import atexit
-from collections import defaultdict
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
 import functools
 import ast
+import mmap
+import os
+import struct
 
 from yapic import json
 from aiofile import AIOFile
 
-from cryptofeed.defines import HUOBI, UPBIT, OKX, OKCOIN
+from cryptofeed.defines import HUOBI, UPBIT
 from cryptofeed.exchanges import EXCHANGE_MAP
 
 
+# Binary capture format
+#
+# file:   MAGIC | VERSION | record*
+# record: RECORD_HEADER | uuid | address | meta | payload
+#
+# Each capture file has a sidecar index file (<capture>.idx) made up of
+# INDEX_ENTRY structs (receipt timestamp, file offset of the record). An entry is
+# written for every `index_interval` records so playback can seek into the middle
+# of a capture without decoding the records before it.
+MAGIC = b'CFCAP'
+VERSION = 1
+FILE_HEADER = struct.Struct('<5sB')
+RECORD_HEADER = struct.Struct('<dBBHHII')
+INDEX_ENTRY = struct.Struct('<dQ')
+
+# record directions
+RECEIVE = 0
+SEND = 1
+CONNECT = 2
+HTTP = 3
+CONFIG = 4
+
+# record flags
+BYTES_PAYLOAD = 1
+
+CaptureRecord = namedtuple('CaptureRecord', ['timestamp', 'uuid', 'direction', 'address', 'meta', 'data'])
+
+
 def bytes_string_to_bytes(string):
     tree = ast.parse(string)
     return tree.body[0].value.s
 
 
-def playback(feed: str, filenames: list, callbacks: dict = None, config: str = 'config.yaml'):
-    return asyncio.run(_playback(feed, filenames, callbacks, config))
-
-
-async def _playback(feed: str, filenames: list, callbacks: dict, config: str):
+def encode_record(timestamp: float, uuid: str, direction: int, data=None, address: str = None, meta: str = None) -> bytes:
+    flags = 0
+    if data is None:
+        payload = b''
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        payload = bytes(data)
+        flags |= BYTES_PAYLOAD
+    else:
+        payload = data.encode()
+    uuid = uuid.encode()
+    address = address.encode() if address else b''
+    meta = meta.encode() if meta else b''
+    return RECORD_HEADER.pack(float(timestamp), direction, flags, len(uuid), len(address), len(meta), len(payload)) + uuid + address + meta + payload
+
+
+class BinaryCaptureReader:
+    """
+    Memory-mapped reader for captures written by BinaryFileCallback. Records are decoded
+    lazily, and the sidecar time index (if present) is used to seek to the start of a time range.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.index = []
+        self._fp = open(filename, 'rb')
+        self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(filename) else b''
+        if self._mm:
+            magic, version = FILE_HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION:
+                self.close()
+                raise ValueError(f'{filename} is not a cryptofeed binary capture (version {VERSION})')
+
+        if os.path.exists(filename + '.idx'):
+            with open(filename + '.idx', 'rb') as fp:
+                self.index = list(INDEX_ENTRY.iter_unpack(fp.read()))
+        self._index_ts = [ts for ts, _ in self.index]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._fp.close()
+
+    def _seek(self, start: float) -> int:
+        pos = bisect_right(self._index_ts, start) - 1
+        if pos < 0:
+            return FILE_HEADER.size
+        return self.index[pos][1]
+
+    def records(self, start: float = None, end: float = None):
+        """
+        start: float
+            receipt timestamp of the first record to return. Uses the time index to skip
+            directly to the nearest preceding indexed record.
+        end: float
+            stop once a record with a receipt timestamp later than end is encountered
+        """
+        mm = self._mm
+        size = len(mm)
+        offset = FILE_HEADER.size if start is None else self._seek(start)
+        header_size = RECORD_HEADER.size
+
+        while offset + header_size <= size:
+            timestamp, direction, flags, uuid_len, addr_len, meta_len, data_len = RECORD_HEADER.unpack_from(mm, offset)
+            offset += header_size
+            record_end = offset + uuid_len + addr_len + meta_len + data_len
+            if record_end > size:
+                # truncated final record, capture was not cleanly shut down
+                break
+            if end is not None and timestamp > end:
+                break
+            if start is not None and timestamp < start:
+                offset = record_end
+                continue
+
+            uuid = mm[offset:offset + uuid_len].decode()
+            offset += uuid_len
+            address = mm[offset:offset + addr_len].decode() if addr_len else None
+            offset += addr_len
+            meta = mm[offset:offset + meta_len].decode() if meta_len else None
+            offset += meta_len
+            data = mm[offset:record_end]
+            if not flags & BYTES_PAYLOAD:
+                data = data.decode()
+            offset = record_end
+            yield CaptureRecord(timestamp, uuid, direction, address, meta, data)
+
+
+def _parse_text_line(line: str):
+    """
+    Parse one line of a text capture (as written by AsyncFileCallback) into
+    (timestamp, direction, address, meta, data)
+    """
+    line = line.rstrip('\n')
+    if line.startswith('configuration: '):
+        return 0.0, CONFIG, None, None, line.split(': ', 1)[1]
+
+    start = line[:3]
+    if start in ('wss', 'htt'):
+        address, arrow, rest = line.split(' ', 2)
+        if arrow == '<->':
+            return float(rest), CONNECT, address, None, None
+        timestamp, data = rest.split(': ', 1)
+        if arrow == '<-':
+            return float(timestamp), SEND, address, None, data
+        meta = None
+        if ' header: ' in data:
+            data, meta = data.split(' header: ')
+        return float(timestamp), HTTP, address, meta, data
+
+    timestamp, data = line.split(': ', 1)
+    if data.startswith("b'") or data.startswith('b"'):
+        data = bytes_string_to_bytes(data)
+    return float(timestamp), RECEIVE, None, None, data
+
+
+def convert_capture(source: str, destination: str, uuid: str = None, index_interval: int = 100):
+    """
+    Convert a text capture written by AsyncFileCallback into the binary capture format.
+
+    source: str
+        text capture file
+    destination: str
+        binary capture file to write. The time index is written to destination + '.idx'
+    uuid: str
+        connection uuid to store with each record. Defaults to the uuid in the source filename
+    """
+    if uuid is None:
+        uuid = os.path.basename(source).rsplit('.', 1)[0]
+
+    with open(source, 'r', encoding='utf-8') as src, open(destination, 'wb') as dst, open(destination + '.idx', 'wb') as idx:
+        dst.write(FILE_HEADER.pack(MAGIC, VERSION))
+        count = 0
+        for line in src:
+            if line == "\n":
+                continue
+            timestamp, direction, address, meta, data = _parse_text_line(line)
+            if count % index_interval == 0:
+                idx.write(INDEX_ENTRY.pack(timestamp, dst.tell()))
+            dst.write(encode_record(timestamp, uuid, direction, data=data, address=address, meta=meta))
+            count += 1
+
+
+def playback(feed: str, filenames: list, callbacks: dict = None, config: str = 'config.yaml', start: float = None, end: float = None, **kwargs):
+    """
+    feed: str
+        the exchange the capture was collected from
+    filenames: list of str
+        text (AsyncFileCallback) or binary (BinaryFileCallback, suffix .bin) capture files
+    start, end: float
+        optional receipt timestamp range. Only websocket messages received within the range are replayed.
+        Binary captures use their time index to seek directly to the start of the range.
+    kwargs:
+        passed through to the feed's constructor (e.g. numeric_mode)
+    """
+    return asyncio.run(_playback(feed, filenames, callbacks, config, start, end, kwargs))
+
+
+def _is_binary(filename: str) -> bool:
+    return filename.endswith('.bin')
+
+
+def _text_messages(filename: str, start: float, end: float):
+    """
+    Yields (counted, timestamp, message) tuples from a text websocket capture. Messages
+    that are counted, but not replayed (http requests), have a message of None.
+    """
+    with open(filename, 'r') as fp:
+        for line in fp:
+            if line == "\n":
+                continue
+            start_chars = line[:3]
+            if start_chars == 'wss':
+                continue
+            if start_chars == 'htt':
+                yield None, None
+                continue
+
+            timestamp, message = line.split(": ", 1)
+            if start is not None or end is not None:
+                ts = float(timestamp)
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    return
+
+            if HUOBI in filename:
+                message = bytes_string_to_bytes(message)
+            elif UPBIT in filename:
+                if message.startswith('b\'') or message.startswith('b"'):
+                    message = message.strip()[2:-1]
+            elif message.startswith('b\'') or message.startswith('b"'):
+                # binary frames, and text frames read as bytes (WSAsyncConn with decode=False)
+                message = bytes_string_to_bytes(message)
+            yield timestamp, message
+
+
+def _binary_messages(filename: str, start: float, end: float):
+    with BinaryCaptureReader(filename) as reader:
+        for record in reader.records(start=start, end=end):
+            if record.direction == RECEIVE:
+                yield record.timestamp, record.data
+            elif record.direction == HTTP:
+                yield None, None
+
+
+async def _playback(feed: str, filenames: list, callbacks: dict, config: str, start: float, end: float, feed_kwargs: dict):
     callback_stats = defaultdict(int)
 
     class FakeWS:
@@ -36,23 +274,31 @@ async def _playback(feed: str, filenames: list, callbacks: dict, config: str):
             self.cache = defaultdict(list)
 
             for filename in filenames:
-                if 'http' in filename:
+                if 'http' not in filename:
+                    continue
+                if _is_binary(filename):
+                    with BinaryCaptureReader(filename) as reader:
+                        for record in reader.records():
+                            if record.direction == HTTP:
+                                self.cache[record.address].append((record.data, record.meta))
+                else:
                     with open(filename, 'r', encoding='utf-8') as fp:
                         for line in fp.readlines():
                             if line.startswith('http'):
                                 file_url, data = line.split(' -> ')
                                 _, msg = data.split(": ", 1)
-                                self.cache[file_url].append(msg)
+                                header = None
+                                if "header:" in msg:
+                                    msg, header = msg.split(" header: ")
+                                self.cache[file_url].append((msg, header))
 
         async def write(self, *args, **kwargs):
             pass
 
         async def read(self, url, **kwargs):
-            data = self.cache[url].pop(0)
-            if "header:" in data:
-                ret = data.split(" header: ")
-                header = ret[1].strip()
-                return ret[0], json.loads(header)
+            data, header = self.cache[url].pop(0)
+            if header:
+                return data, json.loads(header.strip())
             return data
 
     ws = FakeWS(filenames)
@@ -60,8 +306,15 @@ async def _playback(feed: str, filenames: list, callbacks: dict, config: str):
     sub = None
     for f in filenames:
         if 'ws' not in f and 'http' not in f:
-            exchange = f.rsplit("/", 1)[1]
-            exchange = exchange.split(".", 1)[0]
+            if _is_binary(f):
+                with BinaryCaptureReader(f) as reader:
+                    for record in reader.records():
+                        if record.direction == CONFIG:
+                            sub = json.loads(record.data)
+                            ws.subscription = sub
+                        elif record.direction == HTTP:
+                            symbol_data.append(json.loads(record.data))
+                continue
             with open(f, 'r', encoding='utf-8') as fp:
                 for line in fp.readlines():
                     if 'configuration' in line:
@@ -90,7 +343,7 @@ async def _playback(feed: str, filenames: list, callbacks: dict, config: str):
     else:
         for ctype in callbacks.keys():
             callbacks[ctype] = [callbacks[ctype], functools.partial(internal_cb, cb_type=ctype)]
-    feed = EXCHANGE_MAP[feed](candle_closed_only=False, config=config, subscription=sub, callbacks=callbacks)
+    feed = EXCHANGE_MAP[feed](candle_closed_only=False, config=config, subscription=sub, callbacks=callbacks, **feed_kwargs)
 
     exchange_sub = {}
     for chan in ws.subscription:
@@ -105,36 +358,24 @@ async def _playback(feed: str, filenames: list, callbacks: dict, config: str):
     counter = 0
     filenames = [filename for filename in filenames if '.ws.' in filename]
     for filename in filenames:
-        with open(filename, 'r') as fp:
-            for line in fp:
-                if line == "\n":
-                    continue
-                start = line[:3]
-                if start == 'wss':
-                    continue
-                if start == 'htt':
-                    counter += 1
-                    continue
-
-                try:
-                    timestamp, message = line.split(": ", 1)
-                    counter += 1
-
-                    if OKCOIN in filename or OKX in filename:
-                        if message.startswith('b\'') or message.startswith('b"'):
-                            message = bytes_string_to_bytes(message)
-                    elif HUOBI in filename:
-                        message = bytes_string_to_bytes(message)
-                    elif UPBIT in filename:
-                        if message.startswith('b\'') or message.startswith('b"'):
-                            message = message.strip()[2:-1]
-
-                    await handler(message, ws, timestamp)
-                except Exception:
-                    print("Playback failed on message:", message)
-                    feed.stop()
-                    await feed.shutdown()
-                    raise
+        messages = _binary_messages(filename, start, end) if _is_binary(filename) else _text_messages(filename, start, end)
+        for timestamp, message in messages:
+            counter += 1
+            if message is None:
+                continue
+
+            try:
+                await handler(message, ws, timestamp)
+                # let background work started by the feed (e.g. book resyncs) run
+                await asyncio.sleep(0)
+            except Exception:
+                print("Playback failed on message:", message)
+                feed.stop()
+                await feed.shutdown()
+                raise
+    pending = asyncio.all_tasks() - {asyncio.current_task()}
+    if pending:
+        await asyncio.wait(pending)
     feed.stop()
     await feed.shutdown()
 
@@ -144,8 +385,13 @@ async def _playback(feed: str, filenames: list, callbacks: dict, config: str):
 
 
 class AsyncFileCallback:
-    def __init__(self, path, length=10000, rotate=1024 * 1024 * 100):
+    def __init__(self, path, length=10000, rotate=1024 * 1024 * 100, prefix=''):
+        """
+        prefix: str
+            prepended to the file names, set per process by a sharded FeedHandler
+        """
         self.path = path
+        self.prefix = prefix
         self.length = length
         self.data = defaultdict(list)
         self.rotate = rotate
@@ -158,18 +404,18 @@ class AsyncFileCallback:
 
     def stop(self):
         for uuid in list(self.data.keys()):
-            with open(f"{self.path}/{uuid}.{self.count[uuid]}", 'a') as fp:
+            with open(f"{self.path}/{self.prefix}{uuid}.{self.count[uuid]}", 'a') as fp:
                 fp.write("\n".join(self.data[uuid]) + "\n")
                 self.data[uuid] = []
                 fp.flush()
 
     def write_header(self, uuid, data):
-        with open(f"{self.path}/{uuid}.{0}", 'a') as fp:
+        with open(f"{self.path}/{self.prefix}{uuid}.{0}", 'a') as fp:
             fp.write(f"configuration: {data}\n")
             fp.flush()
 
     async def write(self, uuid):
-        p = f"{self.path}/{uuid}.{self.count[uuid]}"
+        p = f"{self.path}/{self.prefix}{uuid}.{self.count[uuid]}"
         async with AIOFile(p, mode='a') as fp:
             r = await fp.write("\n".join(self.data[uuid]) + "\n", offset=self.pointer[uuid])
             self.pointer[uuid] += r
@@ -209,6 +455,122 @@ class AsyncFileCallback:
         else:
             w = f"{timestamp}: {data}"
 
-        with open(f"{self.path}/{uuid}.{0}", 'a') as fp:
+        with open(f"{self.path}/{self.prefix}{uuid}.{0}", 'a') as fp:
             fp.write(w + "\n")
             fp.flush()
+
+
+class BinaryFileCallback:
+    def __init__(self, path, length=10000, rotate=1024 * 1024 * 100, index_interval=100, prefix=''):
+        """
+        Writes raw data in the length-prefixed binary capture format (see BinaryCaptureReader). Files are
+        named <uuid>.<count>.bin, with the time index for each file stored in <uuid>.<count>.bin.idx
+
+        length: int
+            number of records to buffer, per connection, before writing to disk
+        rotate: int
+            size, in bytes, at which a new capture file is started
+        index_interval: int
+            a time index entry is written for every index_interval records
+        prefix: str
+            prepended to the file names, set per process by a sharded FeedHandler
+        """
+        self.path = path
+        self.prefix = prefix
+        self.length = length
+        self.rotate = rotate
+        self.index_interval = index_interval
+        self.data = defaultdict(list)
+        self.index = defaultdict(list)
+        self.buffered = defaultdict(int)
+        self.records = defaultdict(int)
+        self.count = defaultdict(int)
+        self.pointer = defaultdict(int)
+        atexit.register(self.__del__)
+
+    def __del__(self):
+        self.stop()
+
+    def _filename(self, uuid):
+        return f"{self.path}/{self.prefix}{uuid}.{self.count[uuid]}.bin"
+
+    def _append(self, uuid: str, record: bytes, timestamp: float):
+        if self.pointer[uuid] == 0 and self.buffered[uuid] == 0:
+            header = FILE_HEADER.pack(MAGIC, VERSION)
+            self.data[uuid].append(header)
+            self.buffered[uuid] += len(header)
+        if self.records[uuid] % self.index_interval == 0:
+            self.index[uuid].append(INDEX_ENTRY.pack(timestamp, self.pointer[uuid] + self.buffered[uuid]))
+        self.data[uuid].append(record)
+        self.buffered[uuid] += len(record)
+        self.records[uuid] += 1
+
+    def _take(self, uuid: str):
+        """
+        Detach the buffered records (and their index entries) for uuid, reserving
+        their space in the current capture file before any await takes place
+        """
+        p = self._filename(uuid)
+        offset = self.pointer[uuid]
+        data = b''.join(self.data[uuid])
+        index = b''.join(self.index[uuid])
+
+        self.pointer[uuid] += self.buffered[uuid]
+        self.data[uuid] = []
+        self.index[uuid] = []
+        self.buffered[uuid] = 0
+
+        if self.pointer[uuid] >= self.rotate:
+            self.count[uuid] += 1
+            self.pointer[uuid] = 0
+            self.records[uuid] = 0
+        return p, offset, data, index
+
+    def stop(self):
+        for uuid in list(self.data.keys()):
+            if not self.data[uuid]:
+                continue
+            p, _, data, index = self._take(uuid)
+            with open(p, 'ab') as fp:
+                fp.write(data)
+            with open(p + '.idx', 'ab') as fp:
+                fp.write(index)
+
+    def write_header(self, uuid, data):
+        self._write_sync(uuid, encode_record(0.0, uuid, CONFIG, data=data))
+
+    def _write_sync(self, uuid: str, record: bytes):
+        p = f"{self.path}/{self.prefix}{uuid}.0.bin"
+        with open(p, 'ab') as fp:
+            if fp.tell() == 0:
+                fp.write(FILE_HEADER.pack(MAGIC, VERSION))
+            fp.write(record)
+            fp.flush()
+
+    async def write(self, uuid):
+        p, offset, data, index = self._take(uuid)
+        async with AIOFile(p, mode='ab') as fp:
+            await fp.write(data, offset=offset)
+            await fp.fsync()
+        if index:
+            async with AIOFile(p + '.idx', mode='ab') as fp:
+                await fp.write(index)
+
+    @staticmethod
+    def _encode(data, timestamp: float, uuid: str, endpoint: str = None, send: str = None, connect: str = None, header: str = None) -> bytes:
+        if endpoint:
+            return encode_record(timestamp, uuid, HTTP, data=data, address=endpoint, meta=json.dumps(header) if header else None)
+        elif send:
+            return encode_record(timestamp, uuid, SEND, data=data, address=send)
+        elif connect:
+            return encode_record(timestamp, uuid, CONNECT, address=connect)
+        return encode_record(timestamp, uuid, RECEIVE, data=data)
+
+    async def __call__(self, data, timestamp: float, uuid: str, endpoint: str = None, send: str = None, connect: str = None, header: str = None):
+        self._append(uuid, self._encode(data, timestamp, uuid, endpoint=endpoint, send=send, connect=connect, header=header), timestamp)
+
+        if len(self.data[uuid]) >= self.length:
+            await asyncio.create_task(self.write(uuid))
+
+    def sync_callback(self, data, timestamp: float, uuid: str, endpoint: str = None, send: str = None, connect: str = None, header: str = None):
+        self._write_sync(uuid, self._encode(data, timestamp, uuid, endpoint=endpoint, send=send, connect=connect, header=header))
@@ -4,12 +4,29 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt, timezone
-from typing import Dict, Tuple, Union
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
 
 from cryptofeed.defines import FUTURES, FX, OPTION, PERPETUAL, SPOT, CALL, PUT, CURRENCY
 
 
+LOG = logging.getLogger('feedhandler')
+
+# version of the symbol cache's file format, cache files with a different version are ignored
+SYMBOL_CACHE_VERSION = 1
+try:
+    from importlib.metadata import version
+    CRYPTOFEED_VERSION = version('cryptofeed')
+except Exception:
+    CRYPTOFEED_VERSION = None
+
+
 class Symbol:
     symbol_sep = '-'
 
@@ -89,29 +106,126 @@ class Symbol:
         raise ValueError(f"Unsupported symbol type: {self.type}")
 
 
+class SymbolCache:
+    """
+    On disk cache of the parsed symbol data (normalized symbol mapping and exchange info) of
+    each exchange, one pickle file per exchange. Files written by a different cache format or
+    cryptofeed version are ignored, and entries older than ttl seconds are stale.
+    """
+    def __init__(self, path: str = None, ttl: float = 86400):
+        self.path = path if path else os.path.join(os.path.expanduser('~'), '.cache', 'cryptofeed', 'symbols')
+        self.ttl = ttl
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, exchange: str) -> str:
+        return os.path.join(self.path, f'{exchange}.pickle')
+
+    def load(self, exchange: str) -> Optional[Tuple[Dict, Dict, bool]]:
+        """
+        the cached (normalized, info, stale) of the exchange, or None if it is not cached
+        """
+        try:
+            with open(self._file(exchange), 'rb') as fp:
+                entry = pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            LOG.warning("%s: unable to read cached symbol data: %s", exchange, e)
+            return None
+        if entry.get('version') != (SYMBOL_CACHE_VERSION, CRYPTOFEED_VERSION):
+            return None
+        return entry['normalized'], entry['info'], time.time() - entry['timestamp'] > self.ttl
+
+    def store(self, exchange: str, normalized: dict, exchange_info: dict):
+        entry = {'version': (SYMBOL_CACHE_VERSION, CRYPTOFEED_VERSION), 'timestamp': time.time(), 'normalized': normalized, 'info': exchange_info}
+        path = self._file(exchange)
+        # write to a temporary file first, so a concurrent reader never sees a partial file
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}'
+        try:
+            with open(tmp, 'wb') as fp:
+                pickle.dump(entry, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            LOG.warning("%s: unable to cache symbol data: %s", exchange, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
 class _Symbols:
     def __init__(self):
         self.data = {}
+        self.cache = None
+        # exchanges whose stale cached symbol data is being refreshed
+        self.refreshing = set()
 
     def clear(self):
         self.data = {}
 
-    def load_all(self):
+    def enable_cache(self, path: str = None, ttl: float = 86400):
+        """
+        Cache symbol data on disk (see SymbolCache). Exchanges that are not populated load their
+        symbol data from the cache instead of their REST endpoints. Stale entries are used and
+        refreshed from the exchange in a background thread.
+        """
+        self.cache = SymbolCache(path=path, ttl=ttl)
+
+    def disable_cache(self):
+        self.cache = None
+
+    def load_all(self, exchanges: List[str] = None, refresh=True, workers=16):
+        """
+        load the symbol data of the exchanges (all exchanges if None), requesting
+        up to workers exchanges' symbol endpoints concurrently
+        """
         from cryptofeed.exchanges import EXCHANGE_MAP
 
-        for _, exchange in EXCHANGE_MAP.items():
-            exchange.symbols(refresh=True)
+        exchanges = [EXCHANGE_MAP[exchange] for exchange in exchanges] if exchanges else list(EXCHANGE_MAP.values())
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(exchange.symbols, refresh=refresh) for exchange in exchanges]
+        for future in futures:
+            future.result()
 
     def set(self, exchange: str, normalized: dict, exchange_info: dict):
-        self.data[exchange] = {}
-        self.data[exchange]['normalized'] = normalized
-        self.data[exchange]['info'] = exchange_info
+        # a single assignment, so threads loading other exchanges never see a partial entry
+        self.data[exchange] = {'normalized': normalized, 'info': exchange_info}
+        if self.cache:
+            self.cache.store(exchange, normalized, exchange_info)
 
     def get(self, exchange: str) -> Tuple[Dict, Dict]:
         return self.data[exchange]['normalized'], self.data[exchange]['info']
 
     def populated(self, exchange: str) -> bool:
-        return exchange in self.data
+        if exchange in self.data:
+            return True
+        if self.cache is None:
+            return False
+
+        entry = self.cache.load(exchange)
+        if entry is None:
+            return False
+        normalized, exchange_info, stale = entry
+        self.data[exchange] = {'normalized': normalized, 'info': exchange_info}
+        if stale:
+            self._refresh(exchange)
+        return True
+
+    def _refresh(self, exchange: str):
+        from cryptofeed.exchanges import EXCHANGE_MAP
+
+        if exchange in self.refreshing or exchange not in EXCHANGE_MAP:
+            return
+
+        def refresh():
+            try:
+                EXCHANGE_MAP[exchange].symbol_mapping(refresh=True)
+            except Exception:
+                # symbol_mapping logs the error, the cached symbol data stays in use
+                pass
+            finally:
+                self.refreshing.discard(exchange)
+
+        self.refreshing.add(exchange)
+        threading.Thread(target=refresh, name=f'{exchange} symbol refresh', daemon=True).start()
 
     def find(self, symbol: Union[str, Symbol]):
         ret = []
@@ -5,7 +5,11 @@ Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
 cimport cython
+from bisect import bisect_left
 from decimal import Decimal
+from zlib import crc32
+
+from yapic import json
 
 from cryptofeed.defines import BID, ASK
 from order_book import OrderBook as _OrderBook
@@ -22,6 +26,9 @@ cdef extern from *:
     cdef bint _COMPILED_WITH_ASSERTIONS
 COMPILED_WITH_ASSERTIONS = _COMPILED_WITH_ASSERTIONS
 
+# market data may be Decimal, float, or integer ticks depending on the feed's numeric_mode
+NUMERIC_TYPES = (Decimal, float, int)
+
 
 cdef dict convert_none_values(d: dict, s: str):
     for key, value in d.items():
@@ -43,8 +50,8 @@ cdef class Trade:
     cdef readonly object raw  # can be dict or list
 
     def __init__(self, exchange, symbol, side, amount, price, timestamp, id=None, type=None, raw=None):
-        assert isinstance(price, Decimal)
-        assert isinstance(amount, Decimal)
+        assert isinstance(price, NUMERIC_TYPES)
+        assert isinstance(amount, NUMERIC_TYPES)
 
         self.exchange = exchange
         self.symbol = symbol
@@ -76,6 +83,12 @@ cdef class Trade:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'side': self.side, 'amount': numeric_type(self.amount), 'price': numeric_type(self.price), 'id': self.id, 'type': self.type, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} side: {self.side} amount: {self.amount} price: {self.price} id: {self.id} type: {self.type} timestamp: {self.timestamp}"
 
@@ -95,8 +108,8 @@ cdef class Ticker:
     cdef readonly object raw
 
     def __init__(self, exchange, symbol, bid, ask, timestamp, raw=None):
-        assert isinstance(bid, Decimal)
-        assert isinstance(ask, Decimal)
+        assert isinstance(bid, NUMERIC_TYPES)
+        assert isinstance(ask, NUMERIC_TYPES)
         assert timestamp is None or isinstance(timestamp, float)
 
         self.exchange = exchange
@@ -123,6 +136,12 @@ cdef class Ticker:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'bid': numeric_type(self.bid), 'ask': numeric_type(self.ask), 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} bid: {self.bid} ask: {self.ask} timestamp: {self.timestamp}"
 
@@ -145,8 +164,8 @@ cdef class Liquidation:
     cdef readonly dict raw
 
     def __init__(self, exchange, symbol, side, quantity, price, id, status, timestamp, raw=None):
-        assert isinstance(quantity, Decimal)
-        assert isinstance(price, Decimal)
+        assert isinstance(quantity, NUMERIC_TYPES)
+        assert isinstance(price, NUMERIC_TYPES)
         assert timestamp is None or isinstance(timestamp, float)
 
         self.exchange = exchange
@@ -179,6 +198,12 @@ cdef class Liquidation:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'side': self.side, 'quantity': numeric_type(self.quantity), 'price': numeric_type(self.price), 'id': self.id, 'status': self.status, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} side: {self.side} quantity: {self.quantity} price: {self.price} id: {self.id} status: {self.status} timestamp: {self.timestamp}"
 
@@ -200,10 +225,10 @@ cdef class Funding:
     cdef readonly object raw
 
     def __init__(self, exchange, symbol, mark_price, rate, next_funding_time, timestamp, predicted_rate=None, raw=None):
-        assert mark_price is None or isinstance(mark_price, Decimal)
-        assert rate is None or isinstance(rate, Decimal)
+        assert mark_price is None or isinstance(mark_price, NUMERIC_TYPES)
+        assert rate is None or isinstance(rate, NUMERIC_TYPES)
         assert next_funding_time is None or isinstance(next_funding_time, float)
-        assert predicted_rate is None or isinstance(predicted_rate, Decimal)
+        assert predicted_rate is None or isinstance(predicted_rate, NUMERIC_TYPES)
 
         self.exchange = exchange
         self.symbol = symbol
@@ -233,6 +258,12 @@ cdef class Funding:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'mark_price': numeric_type(self.mark_price) if self.mark_price else None, 'rate': numeric_type(self.rate), 'next_funding_time': self.next_funding_time, 'predicted_rate': numeric_type(self.predicted_rate) if self.predicted_rate is not None else None, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} mark_price: {self.mark_price} rate: {self.rate} next_funding_time: {self.next_funding_time} predicted_rate: {self.predicted_rate} timestamp: {self.timestamp}"
 
@@ -261,11 +292,11 @@ cdef class Candle:
 
     def __init__(self, exchange, symbol, start, stop, interval, trades, open, close, high, low, volume, closed, timestamp, raw=None):
         assert trades is None or isinstance(trades, int)
-        assert isinstance(open, Decimal)
-        assert isinstance(close, Decimal)
-        assert isinstance(high, Decimal)
-        assert isinstance(low, Decimal)
-        assert isinstance(volume, Decimal)
+        assert isinstance(open, NUMERIC_TYPES)
+        assert isinstance(close, NUMERIC_TYPES)
+        assert isinstance(high, NUMERIC_TYPES)
+        assert isinstance(low, NUMERIC_TYPES)
+        assert isinstance(volume, NUMERIC_TYPES)
         assert timestamp is None or isinstance(timestamp, float)
 
         self.exchange = exchange
@@ -308,6 +339,12 @@ cdef class Candle:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'start': self.start, 'stop': self.stop, 'interval': self.interval, 'trades': self.trades, 'open': numeric_type(self.open), 'close': numeric_type(self.close), 'high': numeric_type(self.high), 'low': numeric_type(self.low), 'volume': numeric_type(self.volume), 'closed': self.closed, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} start: {self.start} stop: {self.stop} interval: {self.interval} trades: {self.trades} open: {self.open} close: {self.close} high: {self.high} low: {self.low} volume: {self.volume} closed: {self.closed} timestamp: {self.timestamp}"
 
@@ -341,6 +378,12 @@ cdef class Index:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'price': numeric_type(self.price), 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} price: {self.price} timestamp: {self.timestamp}"
 
@@ -359,7 +402,7 @@ cdef class OpenInterest:
     cdef readonly dict raw
 
     def __init__(self, exchange, symbol, open_interest, timestamp, raw=None):
-        assert isinstance(open_interest, Decimal)
+        assert isinstance(open_interest, NUMERIC_TYPES)
         assert timestamp is None or isinstance(timestamp, float)
 
         self.exchange = exchange
@@ -375,6 +418,12 @@ cdef class OpenInterest:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'open_interest': numeric_type(self.open_interest), 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} open_interest: {self.open_interest} timestamp: {self.timestamp}"
 
@@ -385,29 +434,793 @@ cdef class OpenInterest:
         return hash(self.__repr__())
 
 
+cdef class ArrayBookSide:
+    """
+    One side of an ArrayBook. Price levels are kept in a sorted array (binary search
+    on insert/delete) with sizes in a hash table, so the best level is always
+    at a known end of the array and reads never need to re-sort.
+
+    Supports the same interface as order_book.SortedDict.
+    """
+    cdef list _prices  # ascending, so bids are best-last and asks are best-first
+    cdef dict _levels
+    cdef readonly bint descending
+    cdef readonly int max_depth
+    cdef readonly bint strict
+
+    def __init__(self, bint descending, int max_depth=0, bint strict=False, data=None):
+        self.descending = descending
+        self.max_depth = max_depth
+        self.strict = strict
+        self._levels = {}
+        self._prices = []
+        if data:
+            self.update(data)
+
+    cpdef update(self, dict data):
+        """
+        bulk load price levels, replacing the existing contents
+        """
+        self._levels = dict(data)
+        # timsort finds the single run in presorted (best-first) snapshots, so this is O(n)
+        self._prices = sorted(self._levels)
+
+    def __len__(self):
+        cdef Py_ssize_t n = len(self._prices)
+        if self.max_depth and n > self.max_depth:
+            return self.max_depth
+        return n
+
+    def __contains__(self, price):
+        return price in self._levels
+
+    def __getitem__(self, price):
+        return self._levels[price]
+
+    def __setitem__(self, price, size):
+        if price not in self._levels:
+            self._prices.insert(bisect_left(self._prices, price), price)
+        self._levels[price] = size
+        if self.strict:
+            self.truncate()
+
+    def __delitem__(self, price):
+        del self._levels[price]
+        del self._prices[bisect_left(self._prices, price)]
+
+    def __iter__(self):
+        return reversed(self._prices) if self.descending else iter(self._prices)
+
+    cpdef tuple index(self, Py_ssize_t i):
+        """
+        return the (price, size) tuple for the Nth best level
+        """
+        if i < 0 or i >= len(self._prices):
+            raise IndexError('tuple index out of range')
+        price = self._prices[-1 - i] if self.descending else self._prices[i]
+        return price, self._levels[price]
+
+    cdef list _top(self, Py_ssize_t n):
+        cdef Py_ssize_t size = len(self._prices)
+        if n <= 0 or n > size:
+            n = size
+        if self.descending:
+            return self._prices[:size - n - 1:-1] if n < size else self._prices[::-1]
+        return self._prices[:n]
+
+    def depth(self, n=0) -> tuple:
+        """
+        return the prices and sizes of the N best levels (all levels up to max_depth if N is 0) as two lists
+        """
+        prices = self._top(n if n else self.max_depth)
+        levels = self._levels
+        return prices, [levels[price] for price in prices]
+
+    def keys(self) -> tuple:
+        return tuple(self._top(self.max_depth))
+
+    def to_dict(self, to_type=None) -> dict:
+        levels = self._levels
+        if to_type is None:
+            return {price: levels[price] for price in self._top(self.max_depth)}
+        return {to_type(price): to_type(levels[price]) for price in self._top(self.max_depth)}
+
+    cpdef truncate(self):
+        cdef Py_ssize_t extra = len(self._prices) - self.max_depth
+        if self.max_depth <= 0 or extra <= 0:
+            return
+        if self.descending:
+            removed = self._prices[:extra]
+            del self._prices[:extra]
+        else:
+            removed = self._prices[self.max_depth:]
+            del self._prices[self.max_depth:]
+        for price in removed:
+            del self._levels[price]
+
+
+cdef dict _snapshot_side(levels, price, size):
+    # one pass over [price, size, ...] levels, without building intermediate tuples
+    cdef dict ret = {}
+    for level in levels:
+        ret[price(level[0])] = size(level[1])
+    return ret
+
+
+cdef str _checksum_str(value):
+    # exchanges checksum plain decimal notation (never exponents), with the precision they sent
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    return str(value)
+
+
+cdef class ArrayBook:
+    """
+    Array backed alternative to order_book.OrderBook, supporting the same interface
+    (bids/asks, book[side], to_dict(), checksum(), max_depth truncation).
+    """
+    cdef readonly ArrayBookSide bids
+    cdef readonly ArrayBookSide asks
+    cdef readonly int max_depth
+    cdef readonly object checksum_format
+
+    def __init__(self, int max_depth=0, checksum_format=None, bint max_depth_strict=False):
+        if checksum_format is not None and checksum_format not in ('KRAKEN', 'OKX', 'OKCOIN', 'FTX', 'BITGET'):
+            raise ValueError('invalid checksum format specified')
+        self.max_depth = max_depth
+        self.checksum_format = checksum_format
+        self.bids = ArrayBookSide(True, max_depth=max_depth, strict=max_depth_strict)
+        self.asks = ArrayBookSide(False, max_depth=max_depth, strict=max_depth_strict)
+
+    def __setattr__(self, name, value):
+        if name not in ('bids', 'asks', 'bid', 'ask'):
+            raise AttributeError(f"attribute '{name}' of 'ArrayBook' objects is not writable")
+        if not isinstance(value, dict):
+            raise ValueError('value must be a dict')
+        side = self.bids if name in ('bids', 'bid') else self.asks
+        side.update(value)
+
+    @property
+    def bid(self):
+        return self.bids
+
+    @property
+    def ask(self):
+        return self.asks
+
+    def __getitem__(self, side):
+        if side == BID or side == 'bids':
+            return self.bids
+        if side == ASK or side == 'asks':
+            return self.asks
+        raise KeyError('key does not exist')
+
+    def to_dict(self, to_type=None) -> dict:
+        return {BID: self.bids.to_dict(to_type=to_type), ASK: self.asks.to_dict(to_type=to_type)}
+
+    def checksum(self):
+        if self.checksum_format is None:
+            raise ValueError('no checksum format specified')
+        if self.checksum_format == 'KRAKEN':
+            return self._kraken_checksum()
+        return self._interleaved_checksum(100 if self.checksum_format == 'FTX' else 25)
+
+    cdef object _kraken_checksum(self):
+        if self.max_depth and self.max_depth < 10:
+            raise ValueError('Max depth is less than usual number of levels for Kraken checksum')
+        parts = []
+        for side in (self.asks, self.bids):
+            prices, sizes = side.depth(10)
+            for price, size in zip(prices, sizes):
+                parts.append(_checksum_str(price).replace('.', '').lstrip('0'))
+                parts.append(_checksum_str(size).replace('.', '').lstrip('0'))
+        return crc32(''.join(parts).encode())
+
+    cdef object _interleaved_checksum(self, Py_ssize_t levels):
+        if self.max_depth and self.max_depth < levels:
+            raise ValueError('Max depth is less than minimum number of levels for checksum')
+        bid_prices, bid_sizes = self.bids.depth(levels)
+        ask_prices, ask_sizes = self.asks.depth(levels)
+        parts = []
+        for i in range(max(len(bid_prices), len(ask_prices))):
+            if i < len(bid_prices):
+                parts.append(_checksum_str(bid_prices[i]))
+                parts.append(_checksum_str(bid_sizes[i]))
+            if i < len(ask_prices):
+                parts.append(_checksum_str(ask_prices[i]))
+                parts.append(_checksum_str(ask_sizes[i]))
+        return crc32(':'.join(parts).encode())
+
+
+@cython.final
+cdef class L3Level:
+    """
+    The orders resting at one price along with their aggregate size. Orders are kept in
+    an insertion ordered order id -> size dict, which is the level's FIFO queue: removal
+    is O(1) and a size change keeps the order's time priority. Behaves as a read only
+    mapping of order id -> size, the same as the dicts L3 books held before.
+    """
+    cdef readonly object price
+    cdef readonly str side
+    cdef readonly object size
+    cdef dict _orders
+
+    def __init__(self, price, str side):
+        self.price = price
+        self.side = side
+        self.size = 0
+        self._orders = {}
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __getitem__(self, order_id):
+        return self._orders[order_id]
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def __iter__(self):
+        return iter(self._orders)
+
+    def keys(self):
+        return self._orders.keys()
+
+    def values(self):
+        return self._orders.values()
+
+    def items(self):
+        return self._orders.items()
+
+    def get(self, order_id, default=None):
+        return self._orders.get(order_id, default)
+
+    def to_dict(self, to_type=None) -> dict:
+        if to_type is None:
+            return dict(self._orders)
+        return {order_id: to_type(size) for order_id, size in self._orders.items()}
+
+    def __eq__(self, cmp):
+        if isinstance(cmp, L3Level):
+            return self._orders == (<L3Level>cmp)._orders
+        return self._orders == cmp
+
+    def __repr__(self):
+        return repr(self._orders)
+
+
+cdef class L3BookSide:
+    """
+    One side of an L3Book, price levels in a sorted array (as in ArrayBookSide) mapping
+    to L3Levels. Supports the read interface of order_book.SortedDict, with L3Levels
+    as the values.
+    """
+    cdef list _prices  # ascending
+    cdef dict _levels
+    cdef dict _index
+    cdef readonly str side
+    cdef readonly bint descending
+    cdef readonly int max_depth
+
+    def __init__(self, str side, dict index, int max_depth=0):
+        self.side = side
+        self.descending = side == BID
+        self.max_depth = max_depth
+        self._index = index
+        self._prices = []
+        self._levels = {}
+
+    cdef L3Level _level(self, price):
+        cdef L3Level level = self._levels.get(price)
+        if level is None:
+            level = L3Level(price, self.side)
+            self._levels[price] = level
+            self._prices.insert(bisect_left(self._prices, price), price)
+        return level
+
+    cdef void _drop(self, L3Level level):
+        del self._levels[level.price]
+        del self._prices[bisect_left(self._prices, level.price)]
+
+    cdef void _clear(self):
+        cdef L3Level level
+        for level in self._levels.values():
+            for order_id in level._orders:
+                del self._index[order_id]
+        self._prices = []
+        self._levels = {}
+
+    def update(self, dict data):
+        """
+        bulk load {price: {order_id: size}} levels, replacing the existing contents
+        """
+        cdef L3Level level
+        self._clear()
+        for price, orders in data.items():
+            if not orders:
+                continue
+            level = self._level(price)
+            for order_id, size in orders.items():
+                if order_id in self._index:
+                    raise ValueError(f'duplicate order id {order_id}')
+                level._orders[order_id] = size
+                level.size = size if len(level._orders) == 1 else level.size + size
+                self._index[order_id] = level
+
+    def __len__(self):
+        cdef Py_ssize_t n = len(self._prices)
+        if self.max_depth and n > self.max_depth:
+            return self.max_depth
+        return n
+
+    def __contains__(self, price):
+        return price in self._levels
+
+    def __getitem__(self, price):
+        return self._levels[price]
+
+    def __iter__(self):
+        return reversed(self._prices) if self.descending else iter(self._prices)
+
+    cpdef tuple index(self, Py_ssize_t i):
+        """
+        return the (price, L3Level) tuple for the Nth best level
+        """
+        if i < 0 or i >= len(self._prices):
+            raise IndexError('tuple index out of range')
+        price = self._prices[-1 - i] if self.descending else self._prices[i]
+        return price, self._levels[price]
+
+    cdef list _top(self, Py_ssize_t n):
+        cdef Py_ssize_t size = len(self._prices)
+        if n <= 0 or n > size:
+            n = size
+        if self.descending:
+            return self._prices[:size - n - 1:-1] if n < size else self._prices[::-1]
+        return self._prices[:n]
+
+    def depth(self, n=0) -> tuple:
+        """
+        return the prices and aggregate sizes of the N best levels (all levels up to max_depth if N is 0) as two lists
+        """
+        cdef L3Level level
+        prices = self._top(n if n else self.max_depth)
+        levels = self._levels
+        return prices, [(<L3Level>levels[price]).size for price in prices]
+
+    def keys(self) -> tuple:
+        return tuple(self._top(self.max_depth))
+
+    def to_dict(self, to_type=None) -> dict:
+        levels = self._levels
+        if to_type is None:
+            return {price: levels[price].to_dict() for price in self._top(self.max_depth)}
+        return {to_type(price): to_type(levels[price].to_dict()) for price in self._top(self.max_depth)}
+
+    def to_l2(self, to_type=None) -> dict:
+        """
+        the aggregate size at each price level, as an L2 book side
+        """
+        cdef L3Level level
+        levels = self._levels
+        if to_type is None:
+            return {price: (<L3Level>levels[price]).size for price in self._top(self.max_depth)}
+        return {to_type(price): to_type((<L3Level>levels[price]).size) for price in self._top(self.max_depth)}
+
+
+cdef class L3Book:
+    """
+    Order by order (L3) book. Each price level is a FIFO queue of order id -> size entries
+    and a single order id -> level index covers both sides, so add, change and remove are
+    O(1) (plus a binary search when a price level is created or emptied) and exchanges no
+    longer need an order map of their own. Each level keeps its aggregate size, so the L2
+    view of the book (to_l2, depth) needs no extra work.
+
+    The sides support the same reads as order_book.SortedDict, with L3Levels (read only
+    order id -> size mappings) as values, so to_dict() output is unchanged from the dict
+    of dicts L3 books used before.
+    """
+    cdef readonly L3BookSide bids
+    cdef readonly L3BookSide asks
+    cdef readonly int max_depth
+    cdef readonly object l2  # L2BookView
+    cdef dict _index
+
+    def __init__(self, int max_depth=0):
+        self.max_depth = max_depth
+        self._index = {}
+        self.bids = L3BookSide(BID, self._index, max_depth=max_depth)
+        self.asks = L3BookSide(ASK, self._index, max_depth=max_depth)
+        self.l2 = L2BookView(self)
+
+    def __setattr__(self, name, value):
+        if name not in ('bids', 'asks', 'bid', 'ask'):
+            raise AttributeError(f"attribute '{name}' of 'L3Book' objects is not writable")
+        if not isinstance(value, dict):
+            raise ValueError('value must be a dict')
+        side = self.bids if name in ('bids', 'bid') else self.asks
+        side.update(value)
+
+    @property
+    def bid(self):
+        return self.bids
+
+    @property
+    def ask(self):
+        return self.asks
+
+    def __getitem__(self, side):
+        if side == BID or side == 'bids':
+            return self.bids
+        if side == ASK or side == 'asks':
+            return self.asks
+        raise KeyError('key does not exist')
+
+    @property
+    def order_count(self):
+        return len(self._index)
+
+    cpdef tuple order(self, order_id):
+        """
+        (side, price, size) of the resting order with the id, or None
+        """
+        cdef L3Level level = self._index.get(order_id)
+        if level is None:
+            return None
+        return level.side, level.price, level._orders[order_id]
+
+    cpdef L3Level add(self, order_id, str side, price, size):
+        """
+        add an order to the back of the queue at its price. An existing order with the
+        same id is removed first (it loses its time priority)
+        """
+        cdef L3Level level
+        if order_id in self._index:
+            self.remove(order_id)
+        level = (self.bids if side == BID else self.asks)._level(price)
+        level._orders[order_id] = size
+        level.size = size if len(level._orders) == 1 else level.size + size
+        self._index[order_id] = level
+        return level
+
+    cpdef L3Level change(self, order_id, size):
+        """
+        change the size of a resting order, keeping its time priority. Returns the
+        order's level, or None if the order is not in the book
+        """
+        cdef L3Level level = self._index.get(order_id)
+        if level is None:
+            return None
+        level.size = level.size + (size - level._orders[order_id])
+        level._orders[order_id] = size
+        return level
+
+    cpdef L3Level remove(self, order_id):
+        """
+        remove a resting order. Returns the level it was removed from, or None if the
+        order is not in the book
+        """
+        cdef L3Level level = self._index.pop(order_id, None)
+        if level is None:
+            return None
+        size = level._orders.pop(order_id)
+        if level._orders:
+            level.size = level.size - size
+        else:
+            level.size = 0
+            (self.bids if level.side == BID else self.asks)._drop(level)
+        return level
+
+    def to_dict(self, to_type=None) -> dict:
+        return {BID: self.bids.to_dict(to_type=to_type), ASK: self.asks.to_dict(to_type=to_type)}
+
+    def to_l2(self, to_type=None) -> dict:
+        return {BID: self.bids.to_l2(to_type=to_type), ASK: self.asks.to_l2(to_type=to_type)}
+
+    def checksum(self):
+        raise ValueError('no checksum format specified')
+
+
+cdef class L2SideView:
+    """
+    Read only L2 view of an L3BookSide, prices map to the aggregate size of their level
+    """
+    cdef L3BookSide _side
+
+    def __init__(self, L3BookSide side):
+        self._side = side
+
+    @property
+    def max_depth(self):
+        return self._side.max_depth
+
+    def __len__(self):
+        return len(self._side)
+
+    def __contains__(self, price):
+        return price in self._side
+
+    def __getitem__(self, price):
+        return (<L3Level>self._side._levels[price]).size
+
+    def __iter__(self):
+        return iter(self._side)
+
+    def index(self, Py_ssize_t i) -> tuple:
+        """
+        return the (price, size) tuple for the Nth best level
+        """
+        price, level = self._side.index(i)
+        return price, (<L3Level>level).size
+
+    def depth(self, n=0) -> tuple:
+        return self._side.depth(n)
+
+    def keys(self) -> tuple:
+        return self._side.keys()
+
+    def to_dict(self, to_type=None) -> dict:
+        return self._side.to_l2(to_type=to_type)
+
+
+cdef class L2BookView:
+    """
+    Read only L2 view of an L3Book (L3Book.l2). It shares the L3 book's levels, so it is
+    always up to date and costs nothing to maintain.
+    """
+    cdef readonly L2SideView bids
+    cdef readonly L2SideView asks
+    cdef readonly int max_depth
+
+    def __init__(self, L3Book book):
+        self.bids = L2SideView(book.bids)
+        self.asks = L2SideView(book.asks)
+        self.max_depth = book.max_depth
+
+    @property
+    def bid(self):
+        return self.bids
+
+    @property
+    def ask(self):
+        return self.asks
+
+    def __getitem__(self, side):
+        if side == BID or side == 'bids':
+            return self.bids
+        if side == ASK or side == 'asks':
+            return self.asks
+        raise KeyError('key does not exist')
+
+    def to_dict(self, to_type=None) -> dict:
+        return {BID: self.bids.to_dict(to_type=to_type), ASK: self.asks.to_dict(to_type=to_type)}
+
+    def checksum(self):
+        raise ValueError('no checksum format specified')
+
+
+cdef class _ChecksumSide:
+    cdef list prices  # ascending
+    cdef dict sizes
+    cdef dict strings  # price -> formatted level, built on first use
+    cdef bint descending
+
+    def __init__(self, bint descending):
+        self.descending = descending
+        self.prices = []
+        self.sizes = {}
+        self.strings = {}
+
+    cdef load(self, dict levels):
+        self.sizes = dict(levels)
+        self.prices = sorted(self.sizes)
+        self.strings = {}
+
+    cdef set(self, price, size):
+        if size == 0:
+            if price in self.sizes:
+                del self.sizes[price]
+                del self.prices[bisect_left(self.prices, price)]
+                self.strings.pop(price, None)
+            return
+        if price not in self.sizes:
+            self.prices.insert(bisect_left(self.prices, price), price)
+        self.sizes[price] = size
+        self.strings.pop(price, None)
+
+    cdef list top(self, Py_ssize_t n, bint kraken):
+        cdef Py_ssize_t size = len(self.prices)
+        if n > size:
+            n = size
+        if self.descending:
+            prices = self.prices[:size - n - 1:-1] if n < size else self.prices[::-1]
+        else:
+            prices = self.prices[:n]
+        strings = self.strings
+        ret = []
+        for price in prices:
+            level = strings.get(price)
+            if level is None:
+                if kraken:
+                    level = _checksum_str(price).replace('.', '').lstrip('0') + _checksum_str(self.sizes[price]).replace('.', '').lstrip('0')
+                else:
+                    level = _checksum_str(price) + ':' + _checksum_str(self.sizes[price])
+                strings[price] = level
+            ret.append(level)
+        return ret
+
+
+cdef class BookChecksum:
+    """
+    Incremental version of the exchange checksums in order_book / ArrayBook. It keeps
+    its own sorted copy of the price levels, updated from the book deltas, and caches
+    each level's formatted string until a delta touches it. A checksum only formats
+    the changed levels in the top N and never re-sorts the book.
+
+    load() (re)builds the state from a book, update() applies a delta in the
+    {BID: [(price, size), ...], ASK: [...]} form used by book_callback (size 0 deletes).
+    """
+    cdef readonly str checksum_format
+    cdef readonly Py_ssize_t levels
+    cdef _ChecksumSide _bids
+    cdef _ChecksumSide _asks
+    # sampling state and counters, maintained by Feed.validate_checksum
+    cdef public Py_ssize_t updates
+    cdef public double last_check
+    cdef public Py_ssize_t checks
+    cdef public Py_ssize_t rebuilds
+
+    def __init__(self, str checksum_format, int max_depth=0):
+        if checksum_format not in ('KRAKEN', 'OKX', 'OKCOIN', 'FTX', 'BITGET'):
+            raise ValueError('invalid checksum format specified')
+        self.checksum_format = checksum_format
+        self.levels = 10 if checksum_format == 'KRAKEN' else 100 if checksum_format == 'FTX' else 25
+        if max_depth and max_depth < self.levels:
+            raise ValueError('Max depth is less than minimum number of levels for checksum')
+        self._bids = _ChecksumSide(True)
+        self._asks = _ChecksumSide(False)
+        self.updates = 0
+        self.last_check = 0
+        self.checks = 0
+        self.rebuilds = 0
+
+    cpdef load(self, book):
+        self._bids.load(book[BID].to_dict())
+        self._asks.load(book[ASK].to_dict())
+
+    cpdef update(self, dict delta):
+        cdef _ChecksumSide side = self._bids
+        for price, size in delta[BID]:
+            side.set(price, size)
+        side = self._asks
+        for price, size in delta[ASK]:
+            side.set(price, size)
+
+    cpdef object checksum(self):
+        cdef Py_ssize_t i
+        if self.checksum_format == 'KRAKEN':
+            return crc32(''.join(self._asks.top(10, True) + self._bids.top(10, True)).encode())
+
+        bids = self._bids.top(self.levels, False)
+        asks = self._asks.top(self.levels, False)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.append(bids[i])
+            if i < len(asks):
+                parts.append(asks[i])
+        return crc32(':'.join(parts).encode())
+
+
 cdef class OrderBook:
+    """
+    to_dict() output is cached per (delta, numeric_type, none_to) so several backends
+    serializing the same update only convert the book once. Each call returns a shallow
+    copy of the cached dict. The cache is cleared whenever one of the update fields
+    (delta, timestamp, sequence_number, checksum) is set, which book_callback does for
+    every update. Call clear_cache() after modifying the book directly.
+    """
     cdef readonly str exchange
     cdef readonly str symbol
     cdef readonly object book
-    cdef public dict delta
-    cdef public object sequence_number
-    cdef public object checksum
-    cdef public object timestamp
+    cdef dict _book_delta
+    cdef object _sequence_number
+    cdef object _checksum
+    cdef object _timestamp
     cdef public object raw  # Can be dict or list
+    cdef dict _cache
 
-    def __init__(self, exchange, symbol, bids=None, asks=None, max_depth=0, truncate=False, checksum_format=None):
+    def __init__(self, exchange, symbol, bids=None, asks=None, max_depth=0, truncate=False, checksum_format=None, native=False, l3=False):
         self.exchange = exchange
         self.symbol = symbol
-        self.book = _OrderBook(max_depth=max_depth, checksum_format=checksum_format, max_depth_strict=truncate)
+        if l3:
+            self.book = L3Book(max_depth=max_depth)
+        elif native:
+            self.book = ArrayBook(max_depth=max_depth, checksum_format=checksum_format, max_depth_strict=truncate)
+        else:
+            self.book = _OrderBook(max_depth=max_depth, checksum_format=checksum_format, max_depth_strict=truncate)
         if bids:
             self.book.bids = bids
         if asks:
             self.book.asks = asks
-        self.delta = None
-        self.timestamp = None
-        self.sequence_number = None
-        self.checksum = None
+        self._book_delta = None
+        self._timestamp = None
+        self._sequence_number = None
+        self._checksum = None
         self.raw = None
+        self._cache = None
+
+    @property
+    def delta(self):
+        return self._book_delta
+
+    @delta.setter
+    def delta(self, dict value):
+        self._book_delta = value
+        self._cache = None
+
+    @property
+    def timestamp(self):
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value):
+        self._timestamp = value
+        self._cache = None
+
+    @property
+    def sequence_number(self):
+        return self._sequence_number
+
+    @sequence_number.setter
+    def sequence_number(self, value):
+        self._sequence_number = value
+        self._cache = None
+
+    @property
+    def checksum(self):
+        return self._checksum
+
+    @checksum.setter
+    def checksum(self, value):
+        self._checksum = value
+        self._cache = None
+
+    def clear_cache(self):
+        self._cache = None
+
+    def l2_view(self) -> OrderBook:
+        """
+        An L2 OrderBook for this L3 book's symbol, whose book is the L3 book's aggregated
+        view (L3Book.l2). The update fields (delta, timestamp, etc) are independent.
+        """
+        if not isinstance(self.book, L3Book):
+            raise ValueError('not an L3 book')
+        cdef OrderBook ob = OrderBook.__new__(OrderBook)
+        ob.exchange = self.exchange
+        ob.symbol = self.symbol
+        ob.book = self.book.l2
+        return ob
+
+    def load(self, bids, asks, price=Decimal, size=Decimal):
+        """
+        Replace the contents of the book with a snapshot in its raw form, lists of
+        [price, size] levels (extra fields are ignored). Levels should be best-first, as
+        exchanges send them, so the sides are built without re-sorting. price and size
+        convert the raw values, see Feed.price_converter
+        """
+        self.book.bids = _snapshot_side(bids, price, size)
+        self.book.asks = _snapshot_side(asks, price, size)
+        self._cache = None
+
+    @staticmethod
+    def from_snapshot(exchange, symbol, bids, asks, price=Decimal, size=Decimal, max_depth=0, truncate=False, checksum_format=None, native=False) -> OrderBook:
+        """
+        Bulk load a book from raw snapshot levels, see load()
+        """
+        ob = OrderBook(exchange, symbol, max_depth=max_depth, truncate=truncate, checksum_format=checksum_format, native=native)
+        ob.load(bids, asks, price=price, size=size)
+        return ob
 
     @staticmethod
     def from_dict(data: dict) -> OrderBook:
@@ -419,14 +1232,26 @@ cdef class OrderBook:
 
     def _delta(self, numeric_type) -> dict:
         return {
-            BID: [tuple([numeric_type(v) if isinstance(v, Decimal) else v for v in value]) for value in self.delta[BID]],
-            ASK: [tuple([numeric_type(v) if isinstance(v, Decimal) else v for v in value]) for value in self.delta[ASK]]
+            BID: [tuple([numeric_type(v) if isinstance(v, Decimal) else v for v in value]) for value in self._book_delta[BID]],
+            ASK: [tuple([numeric_type(v) if isinstance(v, Decimal) else v for v in value]) for value in self._book_delta[ASK]]
         }
 
     def to_dict(self, delta=False, numeric_type=None, none_to=False) -> dict:
-        assert self.sequence_number is None or isinstance(self.sequence_number, int)
-        assert self.checksum is None or isinstance(self.checksum, (str, int))
-        assert self.timestamp is None or isinstance(self.timestamp, float)
+        key = (delta, numeric_type, none_to)
+        if self._cache is None:
+            self._cache = {}
+        else:
+            data = self._cache.get(key)
+            if data is not None:
+                return dict(data)
+        data = self._to_dict(delta, numeric_type, none_to)
+        self._cache[key] = data
+        return dict(data)
+
+    cdef dict _to_dict(self, bint delta, numeric_type, none_to):
+        assert self._sequence_number is None or isinstance(self._sequence_number, int)
+        assert self._checksum is None or isinstance(self._checksum, (str, int))
+        assert self._timestamp is None or isinstance(self._timestamp, float)
 
         def helper(x):
             if isinstance(x, dict):
@@ -436,20 +1261,58 @@ cdef class OrderBook:
 
         if delta:
             if numeric_type is None:
-                data = {'exchange': self.exchange, 'symbol': self.symbol, 'delta': self.delta, 'timestamp': self.timestamp}
+                data = {'exchange': self.exchange, 'symbol': self.symbol, 'delta': self._book_delta, 'timestamp': self._timestamp}
             else:
-                data = {'exchange': self.exchange, 'symbol': self.symbol, 'delta': self._delta(numeric_type) if self.delta else None, 'timestamp': self.timestamp}
+                data = {'exchange': self.exchange, 'symbol': self.symbol, 'delta': self._delta(numeric_type) if self._book_delta else None, 'timestamp': self._timestamp}
             return data if not none_to else convert_none_values(data, none_to)
 
         if numeric_type is None:
             book_dict = self.book.to_dict()
-            data = {'exchange': self.exchange, 'symbol': self.symbol, 'book': book_dict, 'delta': self.delta, 'timestamp': self.timestamp}
+            data = {'exchange': self.exchange, 'symbol': self.symbol, 'book': book_dict, 'delta': self._book_delta, 'timestamp': self._timestamp}
             return data if not none_to else convert_none_values(data, none_to)
 
         book_dict = self.book.to_dict(to_type=helper)
-        data = {'exchange': self.exchange, 'symbol': self.symbol, 'book': book_dict, 'delta': self._delta(numeric_type) if self.delta else None, 'timestamp': self.timestamp}
+        data = {'exchange': self.exchange, 'symbol': self.symbol, 'book': book_dict, 'delta': self._delta(numeric_type) if self._book_delta else None, 'timestamp': self._timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, delta=False, numeric_type=None, none_to=False) -> str:
+        """
+        JSON encoding of to_dict(), cached with it
+        """
+        return self._serialized('json', delta, numeric_type, none_to)
+
+    def to_bytes(self, delta=False, numeric_type=None, none_to=False) -> bytes:
+        """
+        UTF-8 JSON encoding of to_dict(), cached with it
+        """
+        return self._serialized('bytes', delta, numeric_type, none_to)
+
+    cdef object _serialized(self, str fmt, delta, numeric_type, none_to):
+        key = (fmt, delta, numeric_type, none_to)
+        if self._cache is not None:
+            ret = self._cache.get(key)
+            if ret is not None:
+                return ret
+        # to_dict() fills the cache if it is empty, the cached dict is encoded without copying it
+        self.to_dict(delta=delta, numeric_type=numeric_type, none_to=none_to)
+        data = self._cache[(delta, numeric_type, none_to)]
+        ret = json.dumps(data) if fmt == 'json' else json.dumpb(data)
+        self._cache[key] = ret
+        return ret
+
+    def __copy__(self):
+        # shares the underlying book, the update fields (delta, timestamp, etc) are independent
+        cdef OrderBook ob = OrderBook.__new__(OrderBook)
+        ob.exchange = self.exchange
+        ob.symbol = self.symbol
+        ob.book = self.book
+        ob._book_delta = self._book_delta
+        ob._sequence_number = self._sequence_number
+        ob._checksum = self._checksum
+        ob._timestamp = self._timestamp
+        ob.raw = self.raw
+        return ob
+
     def __repr__(self):
         return f"exchange: {self.exchange} symbol: {self.symbol} book: {self.book} timestamp: {self.timestamp}"
 
@@ -506,6 +1369,12 @@ cdef class Order:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'client_order_id': self.client_order_id, 'side': self.side, 'type': self.type, 'price': numeric_type(self.price), 'amount': numeric_type(self.amount), 'account': self.account, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} symbol: {self.symbol} client_order_id: {self.client_order_id} side: {self.side} type: {self.type} price: {self.price} amount: {self.amount} account: {self.account} timestamp: {self.timestamp}'
 
@@ -580,6 +1449,12 @@ cdef class OrderInfo:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'id': self.id, 'client_order_id': self.client_order_id, 'side': self.side, 'status': self.status, 'type': self.type, 'price': numeric_type(self.price), 'amount': numeric_type(self.amount), 'remaining': numeric_type(self.remaining), 'account': self.account, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} symbol: {self.symbol} id: {self.id} client_order_id: {self.client_order_id} side: {self.side} status: {self.status} type: {self.type} price: {self.price} amount: {self.amount} remaining: {self.remaining} account: {self.account} timestamp: {self.timestamp}'
 
@@ -614,6 +1489,12 @@ cdef class Balance:
             data = {'exchange': self.exchange, 'currency': self.currency, 'balance': numeric_type(self.balance), 'reserved': numeric_type(self.reserved)}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} currency: {self.currency} balance: {self.balance} reserved: {self.reserved}'
 
@@ -656,6 +1537,12 @@ cdef class L1Book:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'bid_price': numeric_type(self.bid_price), 'bid_size': numeric_type(self.bid_size), 'ask_price': numeric_type(self.ask_price), 'ask_size': numeric_type(self.ask_size), 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} symbol: {self.symbol} bid_price: {self.bid_price} bid_size: {self.bid_size}, ask_price: {self.ask_price} ask_size: {self.ask_size} timestamp: {self.timestamp}'
 
@@ -693,6 +1580,12 @@ cdef class Transaction:
             data = {'exchange': self.exchange, 'currency': self.currency, 'type': self.type, 'status': self.status, 'amount': numeric_type(self.amount), 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} currency: {self.currency} type: {self.type} status: {self.status} amount: {self.amount} timestamp {self.timestamp}'
 
@@ -744,6 +1637,12 @@ cdef class Fill:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'side': self.side, 'amount': numeric_type(self.amount), 'price': numeric_type(self.price), 'fee': numeric_type(self.fee), 'liquidity': self.liquidity, 'id': self.id, 'order_id': self.order_id, 'type': self.type, 'account': self.account, 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} symbol: {self.symbol} side: {self.side} amount: {self.amount} price: {self.price} fee: {self.fee} liquidity: {self.liquidity} id: {self.id} order_id: {self.order_id} type: {self.type} account: {self.account} timestamp: {self.timestamp}'
 
@@ -786,6 +1685,12 @@ cdef class Position:
             data = {'exchange': self.exchange, 'symbol': self.symbol, 'position': numeric_type(self.position), 'entry_price': numeric_type(self.entry_price),  'side': self.side, 'unrealised_pnl': numeric_type(self.unrealised_pnl), 'timestamp': self.timestamp}
         return data if not none_to else convert_none_values(data, none_to)
 
+    def to_json(self, numeric_type=None, none_to=False) -> str:
+        return json.dumps(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
+    def to_bytes(self, numeric_type=None, none_to=False) -> bytes:
+        return json.dumpb(self.to_dict(numeric_type=numeric_type, none_to=none_to))
+
     def __repr__(self):
         return f'exchange: {self.exchange} symbol: {self.symbol} position: {self.position} entry_price: {self.entry_price} side: {self.side} unrealised_pnl: {self.unrealised_pnl} timestamp: {self.timestamp}'
 
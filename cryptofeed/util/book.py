@@ -4,9 +4,32 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+from decimal import Decimal
+
 from cryptofeed.defines import BID, ASK, L2_BOOK
 
 
+class DecimalCache(dict):
+    """
+    Interns the Decimal conversion of price strings. Snapshots and updates for a symbol
+    repeat the same few thousand price levels, and a Decimal that has already been hashed
+    caches its hash, so reusing it makes inserting the level into a book (or a delta dict)
+    several times cheaper than hashing a freshly parsed Decimal. Keys must be strings, two
+    strings for the same value ('1.0' and '1') intern to different Decimals so the exchange's
+    formatting (used by checksums) is preserved. The cache is emptied once it holds max_size
+    entries.
+    """
+    def __init__(self, max_size: int = 100000):
+        super().__init__()
+        self.max_size = max_size
+
+    def __missing__(self, key: str) -> Decimal:
+        if len(self) >= self.max_size:
+            self.clear()
+        value = self[key] = Decimal(key)
+        return value
+
+
 def book_delta(former: dict, latter: dict, book_type=L2_BOOK) -> list:
     ret = {BID: [], ASK: []}
     if book_type == L2_BOOK:
@@ -26,3 +49,42 @@ def book_delta(former: dict, latter: dict, book_type=L2_BOOK) -> list:
         raise ValueError("Not supported for L3 Books")
 
     return ret
+
+
+def sorted_side_delta(fprices: tuple, former: dict, lprices: tuple, latter: dict, descending: bool) -> list:
+    """
+    Delta between two versions of one side of a book. fprices and lprices are the
+    prices in book order (descending for bids) as returned by order_book.SortedDict.keys(),
+    former and latter map price to size. The sorted prices are merged in a single pass,
+    so no sets of prices are built. Removed levels have a size of 0.
+    """
+    ret = []
+    flen = len(fprices)
+    llen = len(lprices)
+    i = j = 0
+
+    while i < flen and j < llen:
+        fprice = fprices[i]
+        lprice = lprices[j]
+        if fprice == lprice:
+            size = latter[lprice]
+            if former[fprice] != size:
+                ret.append((lprice, size))
+            i += 1
+            j += 1
+        elif (fprice > lprice) != descending:
+            # lprice comes first in book order, so it is not in former
+            ret.append((lprice, latter[lprice]))
+            j += 1
+        else:
+            ret.append((fprice, 0))
+            i += 1
+
+    while i < flen:
+        ret.append((fprices[i], 0))
+        i += 1
+    while j < llen:
+        lprice = lprices[j]
+        ret.append((lprice, latter[lprice]))
+        j += 1
+    return ret
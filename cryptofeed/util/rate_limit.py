@@ -0,0 +1,122 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from heapq import heappop, heappush
+from itertools import count
+import time
+
+
+# request priorities, lower values are served first
+SNAPSHOT_PRIORITY = 0
+DEFAULT_PRIORITY = 1
+BACKFILL_PRIORITY = 2
+
+
+class RateLimiter:
+    """
+    Token bucket for the REST requests to an exchange. Tokens accrue at rate per second up
+    to burst, and a request of a given weight waits until that many tokens are available.
+    Waiting requests are served in priority order (then in arrival order), so a book
+    snapshot queued behind a historical backfill is sent first.
+
+    Limiters are shared with get(), keyed by exchange (and API key), so every feed and
+    REST call for the same exchange in a process draws from the same bucket. Buckets are not
+    shared between processes: a sharded FeedHandler sets processes so each of the shard
+    processes carrying an exchange gets an equal part of its limit.
+    """
+    _limiters = {}
+    # exchange id -> number of processes sharing the exchange's request limit
+    processes = {}
+
+    @classmethod
+    def get(cls, key, rate: float, burst: float = 1) -> 'RateLimiter':
+        limiter = cls._limiters.get(key)
+        if limiter is None:
+            limiter = cls._limiters[key] = cls(rate / cls.processes.get(cls._exchange(key), 1), burst=burst)
+        return limiter
+
+    @classmethod
+    def set_processes(cls, processes: dict):
+        """
+        Split each exchange's limit between the given number of processes (exchange id -> processes),
+        including the limiters that already exist, eg. those of feeds created in a parent process
+        """
+        for key, limiter in cls._limiters.items():
+            exchange = cls._exchange(key)
+            limiter.rate = limiter.rate * cls.processes.get(exchange, 1) / processes.get(exchange, 1)
+        cls.processes = processes
+
+    @staticmethod
+    def _exchange(key) -> str:
+        return key[0] if isinstance(key, tuple) else key
+
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # heap of (priority, arrival, weight, future) of the waiting requests
+        self._waiters = []
+        self._arrival = count()
+        self._timer = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, weight: float = 1, priority: int = DEFAULT_PRIORITY):
+        self._refill()
+        if not self._waiters and self.tokens >= min(weight, self.burst):
+            self.tokens -= weight
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heappush(self._waiters, (priority, next(self._arrival), weight, future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # granted and cancelled at the same time, hand the tokens back
+                self.tokens += weight
+                self._schedule()
+            raise
+
+    def backoff(self, seconds: float):
+        """
+        stop granting requests for the given number of seconds, eg. after a 429 response
+        """
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+        self._schedule()
+
+    def _schedule(self):
+        self._refill()
+        while self._waiters:
+            _, _, weight, future = self._waiters[0]
+            if future.done() or future.get_loop().is_closed():
+                heappop(self._waiters)
+                continue
+            # a request heavier than the bucket is sent once the bucket is full
+            if self.tokens < min(weight, self.burst):
+                break
+            heappop(self._waiters)
+            self.tokens -= weight
+            future.set_result(None)
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiters:
+            _, _, weight, future = self._waiters[0]
+            delay = (min(weight, self.burst) - self.tokens) / self.rate
+            self._timer = future.get_loop().call_later(delay, self._wakeup)
+
+    def _wakeup(self):
+        self._timer = None
+        self._schedule()
@@ -91,6 +91,7 @@ setup(
         "gcp_pubsub": ["google_cloud_pubsub>=2.4.1", "gcloud_aio_pubsub"],
         "kafka": ["aiokafka>=0.7.0"],
         "mongo": ["motor"],
+        "parquet": ["pyarrow"],
         "postgres": ["asyncpg"],
         "rabbit": ["aio_pika", "pika"],
         "redis": ["hiredis", "aioredis>=2.0.0"],
@@ -101,6 +102,7 @@ setup(
             "gcloud_aio_pubsub",
             "aiokafka>=0.7.0",
             "motor",
+            "pyarrow",
             "asyncpg",
             "aio_pika",
             "pika",
@@ -4,9 +4,13 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+import asyncio
+import json
 import random
 
+from cryptofeed.defines import BINANCE, L2_BOOK
 from cryptofeed.exchanges import Binance
+from cryptofeed.symbols import Symbols
 
 
 def test_binance_address_generation():
@@ -40,3 +44,56 @@ def test_binance_address_generation():
         assert len(chans) == len(channels) * length == len(syms)
         assert len(set(chans)) == len(channels)
         assert (len(set(syms))) == length
+
+
+def test_binance_snapshot_resync_does_not_block():
+    Symbols.set(BINANCE, {'BTC-USDT': 'BTCUSDT', 'ETH-USDT': 'ETHUSDT'}, {'instrument_type': {}})
+    books = []
+
+    async def book(b, receipt_timestamp):
+        books.append((b.symbol, b.sequence_number))
+
+    def update(pair, first, last):
+        return json.dumps({'stream': f'{pair.lower()}@depth@100ms', 'data': {'e': 'depthUpdate', 'E': 0, 's': pair, 'U': first, 'u': last, 'b': [['1.0', '1.0']], 'a': []}})
+
+    async def run():
+        feed = Binance(symbols=['BTC-USDT', 'ETH-USDT'], channels=[L2_BOOK], callbacks={L2_BOOK: book})
+        release = asyncio.Event()
+        snapshot_id = 3
+
+        async def read(url, **kwargs):
+            if 'BTCUSDT' in url:
+                await release.wait()
+            return json.dumps({'lastUpdateId': snapshot_id, 'bids': [], 'asks': []})
+
+        feed.http_conn.read = read
+        await feed.message_handler(update('BTCUSDT', 1, 2), None, 0)
+        await feed.message_handler(update('ETHUSDT', 3, 3), None, 0)
+        await asyncio.wait([feed._resync_tasks['ETH-USDT']])
+        for i in range(4, 7):
+            await feed.message_handler(update('ETHUSDT', i, i), None, 0)
+        await feed.message_handler(update('BTCUSDT', 3, 4), None, 0)
+        await feed.message_handler(update('BTCUSDT', 5, 6), None, 0)
+
+        # ETH is live while the BTC snapshot is still outstanding
+        assert books == [('ETH-USDT', 3), ('ETH-USDT', 4), ('ETH-USDT', 5), ('ETH-USDT', 6)]
+        release.set()
+        await asyncio.wait(list(feed._resync_tasks.values()))
+        await feed.message_handler(update('BTCUSDT', 7, 7), None, 0)
+
+        # 8 is missed, only the BTC book is rebuilt and the gap update is replayed on the new snapshot
+        snapshot_id = 8
+        await feed.message_handler(update('BTCUSDT', 9, 9), None, 0)
+        assert feed.resync_pending('BTC-USDT')
+        await feed.message_handler(update('ETHUSDT', 7, 7), None, 0)
+        await asyncio.wait(list(feed._resync_tasks.values()))
+        await feed.shutdown()
+        return feed
+
+    feed = asyncio.run(run())
+    assert [seq for pair, seq in books if pair == 'BTC-USDT'] == [3, 4, 6, 7, 8, 9]
+    assert books[-3] == ('ETH-USDT', 7)
+    assert feed.book_recovery['BTC-USDT']['gaps'] == 1
+    assert feed.book_recovery['BTC-USDT']['recoveries'] == 1
+    assert 'ETH-USDT' not in feed.book_recovery
+    Symbols.clear()
@@ -0,0 +1,106 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+
+from yapic import json
+
+from cryptofeed.defines import DERIBIT, GATEIO, L2_BOOK
+from cryptofeed.exchanges import Deribit, Gateio
+from cryptofeed.symbols import Symbols
+
+
+def test_gateio_gap_resyncs_only_affected_book():
+    Symbols.set(GATEIO, {'BTC-USDT': 'BTC_USDT', 'ETH-USDT': 'ETH_USDT'}, {'instrument_type': {}})
+    books = []
+    snapshots = []
+
+    async def book(b, receipt_timestamp):
+        books.append((b.symbol, len(b.book.bids)))
+
+    def update(pair, first, last, price):
+        return json.dumps({'time': 0, 'channel': 'spot.order_book_update', 'event': 'update', 'result': {'t': 0, 's': pair, 'U': first, 'u': last, 'b': [[price, '1']], 'a': []}})
+
+    async def run():
+        feed = Gateio(symbols=['BTC-USDT', 'ETH-USDT'], channels=[L2_BOOK], callbacks={L2_BOOK: book})
+        feed._reset()
+        release = asyncio.Event()
+
+        async def read(url, **kwargs):
+            snapshots.append(url)
+            if len(snapshots) == 3:
+                await release.wait()
+                return json.dumps({'id': 10, 'bids': [], 'asks': []})
+            return json.dumps({'id': 1, 'bids': [], 'asks': []})
+
+        feed.http_conn.read = read
+        for pair in ('BTC_USDT', 'ETH_USDT'):
+            await feed.message_handler(update(pair, 2, 2, '1'), None, 0)
+            await asyncio.wait([feed._resync_tasks[pair.replace('_', '-')]])
+
+        # BTC misses 3-9, ETH keeps updating while the BTC snapshot is in flight
+        await feed.message_handler(update('BTC_USDT', 10, 11, '2'), None, 0)
+        assert feed.resync_pending('BTC-USDT')
+        await feed.message_handler(update('BTC_USDT', 12, 12, '3'), None, 0)
+        await feed.message_handler(update('ETH_USDT', 3, 3, '2'), None, 0)
+        assert books[-1] == ('ETH-USDT', 2)
+
+        release.set()
+        await asyncio.wait([feed._resync_tasks['BTC-USDT']])
+        assert not feed.resync_pending('BTC-USDT')
+        await feed.shutdown()
+        return feed
+
+    feed = asyncio.run(run())
+    assert len(snapshots) == 3
+    assert [b for b in books if b[0] == 'BTC-USDT'] == [('BTC-USDT', 0), ('BTC-USDT', 1), ('BTC-USDT', 0), ('BTC-USDT', 1), ('BTC-USDT', 2)]
+    assert feed.book_recovery['BTC-USDT']['gaps'] == 1
+    assert feed.book_recovery['BTC-USDT']['recoveries'] == 1
+    assert feed.book_recovery['BTC-USDT']['last_recovery_time'] >= 0
+    assert 'ETH-USDT' not in feed.book_recovery
+    Symbols.clear()
+
+
+def test_deribit_gap_resubscribes_single_book():
+    Symbols.set(DERIBIT, {'BTC-USD-PERP': 'BTC-PERPETUAL', 'ETH-USD-PERP': 'ETH-PERPETUAL'}, {'instrument_type': {}})
+    books = []
+    written = []
+
+    class Conn:
+        uuid = 'deribit'
+
+        async def write(self, msg):
+            written.append(json.loads(msg))
+
+    async def book(b, receipt_timestamp):
+        books.append((b.symbol, b.sequence_number))
+
+    def message(instrument, change_id, prev_change_id=None):
+        data = {'timestamp': 0, 'instrument_name': instrument, 'change_id': change_id, 'bids': [['new', 1.0, 1.0]], 'asks': []}
+        if prev_change_id is not None:
+            data['prev_change_id'] = prev_change_id
+        return json.dumps({'jsonrpc': '2.0', 'method': 'subscription', 'params': {'channel': f'book.{instrument}.raw', 'data': data}})
+
+    async def run():
+        feed = Deribit(symbols=['BTC-USD-PERP', 'ETH-USD-PERP'], channels=[L2_BOOK], callbacks={L2_BOOK: book}, config={'deribit': {'key_id': 'key', 'key_secret': 'secret'}})
+        conn = Conn()
+        feed._Deribit__reset()
+        for instrument in ('BTC-PERPETUAL', 'ETH-PERPETUAL'):
+            await feed.message_handler(message(instrument, 1), conn, 0)
+        await feed.message_handler(message('BTC-PERPETUAL', 3, prev_change_id=2), conn, 0)
+        # updates for the resyncing book are dropped until the new snapshot, other books are unaffected
+        await feed.message_handler(message('BTC-PERPETUAL', 4, prev_change_id=3), conn, 0)
+        await feed.message_handler(message('ETH-PERPETUAL', 2, prev_change_id=1), conn, 0)
+        await feed.message_handler(message('BTC-PERPETUAL', 5), conn, 0)
+        await feed.message_handler(message('BTC-PERPETUAL', 6, prev_change_id=5), conn, 0)
+        return feed
+
+    feed = asyncio.run(run())
+    assert [(m['method'], m['params']['channels']) for m in written] == [('private/unsubscribe', ['book.BTC-PERPETUAL.raw']), ('private/subscribe', ['book.BTC-PERPETUAL.raw'])]
+    assert books == [('BTC-USD-PERP', 1), ('ETH-USD-PERP', 1), ('ETH-USD-PERP', 2), ('BTC-USD-PERP', 5), ('BTC-USD-PERP', 6)]
+    assert feed.book_recovery['BTC-USD-PERP']['gaps'] == 1
+    assert feed.book_recovery['BTC-USD-PERP']['recoveries'] == 1
+    Symbols.clear()
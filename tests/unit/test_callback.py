@@ -0,0 +1,292 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from decimal import Decimal
+import threading
+
+import pytest
+
+from cryptofeed.callback import ConflatedCallback, QueuedCallback, TradeCallback
+from cryptofeed.defines import ASK, BID, BLOCK, BUY, COALESCE, DROP_OLDEST
+from cryptofeed.nbbo import NBBO
+from cryptofeed.types import OrderBook, Trade
+
+
+def trade(symbol, price):
+    return Trade('COINBASE', symbol, BUY, Decimal(1), Decimal(price), 0.0)
+
+
+@pytest.mark.parametrize("overflow,expected", [
+    (BLOCK, [('BTC-USD', 0), ('BTC-USD', 1), ('ETH-USD', 2), ('BTC-USD', 3), ('ETH-USD', 4), ('BTC-USD', 5)]),
+    (DROP_OLDEST, [('BTC-USD', 3), ('ETH-USD', 4), ('BTC-USD', 5)]),
+    (COALESCE, [('BTC-USD', 5), ('ETH-USD', 4)]),
+])
+def test_queued_callback_overflow(overflow, expected):
+    received = []
+    release = asyncio.Event()
+
+    async def slow(t, receipt_timestamp):
+        await release.wait()
+        received.append((t.symbol, int(t.price)))
+
+    async def run():
+        cb = QueuedCallback(slow, max_size=3, overflow=overflow)
+        producer = asyncio.create_task(send(cb))
+        await asyncio.sleep(0.01)
+        # the feed is only held up when the queue is full and the policy is BLOCK
+        assert producer.done() == (overflow != BLOCK)
+        release.set()
+        await producer
+        await cb.stop()
+        return cb
+
+    async def send(cb):
+        for i, symbol in enumerate(('BTC-USD', 'BTC-USD', 'ETH-USD', 'BTC-USD', 'ETH-USD', 'BTC-USD')):
+            await cb(trade(symbol, i), 0.0)
+
+    cb = asyncio.run(run())
+    assert received == expected
+    assert cb.qsize == 0
+    assert cb.dropped == (3 if overflow == DROP_OLDEST else 0)
+    assert cb.coalesced == (4 if overflow == COALESCE else 0)
+
+
+def test_queued_callback_isolates_errors():
+    received = []
+
+    async def flaky(t, receipt_timestamp):
+        if t.price == 1:
+            raise ValueError("bad update")
+        received.append(int(t.price))
+
+    async def run():
+        cb = QueuedCallback(flaky)
+        for i in range(3):
+            await cb(trade('BTC-USD', i), 0.0)
+        await cb.stop()
+
+    asyncio.run(run())
+    assert received == [0, 2]
+
+
+@pytest.mark.parametrize("overflow", [BLOCK, DROP_OLDEST, COALESCE])
+def test_queued_callback_book_deltas(overflow):
+    received = []
+    release = asyncio.Event()
+
+    async def slow(book, receipt_timestamp):
+        await release.wait()
+        received.append((book.delta, book.sequence_number, receipt_timestamp))
+
+    book = OrderBook('COINBASE', 'BTC-USD')
+    deltas = [
+        {BID: [(Decimal(10), Decimal(1))], ASK: []},
+        {BID: [(Decimal(9), Decimal(1))], ASK: [(Decimal(11), Decimal(2))]},
+        {BID: [(Decimal(10), Decimal(0))], ASK: [(Decimal(11), Decimal(1))]},
+    ]
+
+    async def run():
+        cb = QueuedCallback(slow, overflow=overflow)
+        # the feed reuses its book, every update is queued before the callback runs
+        for seq, delta in enumerate(deltas, start=1):
+            book.delta = delta
+            book.sequence_number = seq
+            await cb(book, float(seq))
+        release.set()
+        await cb.stop()
+
+    asyncio.run(run())
+    if overflow == COALESCE:
+        assert received == [({BID: [(Decimal(10), Decimal(0)), (Decimal(9), Decimal(1))], ASK: [(Decimal(11), Decimal(1))]}, 3, 3.0)]
+    else:
+        assert received == [(delta, seq, float(seq)) for seq, delta in enumerate(deltas, start=1)]
+    assert book.delta == deltas[-1]
+
+
+def test_queued_callback_coalesces_l3_deltas():
+    received = []
+    release = asyncio.Event()
+
+    async def slow(book, receipt_timestamp):
+        await release.wait()
+        received.append(book.delta)
+
+    book = OrderBook('COINBASE', 'BTC-USD', l3=True)
+
+    async def run():
+        cb = QueuedCallback(slow, overflow=COALESCE)
+        for delta in (
+            {BID: [('a', Decimal(10), Decimal(1))], ASK: [('b', Decimal(11), Decimal(1))]},
+            {BID: [('c', Decimal(10), Decimal(2)), ('a', Decimal(10), Decimal(3))], ASK: []},
+            {BID: [('d', Decimal(9), Decimal(1))], ASK: [('b', Decimal(11), Decimal(0))]},
+        ):
+            book.delta = delta
+            await cb(book, 0.0)
+        release.set()
+        await cb.stop()
+        return cb
+
+    cb = asyncio.run(run())
+    # orders are merged by order id, in the order they were first updated
+    assert received == [{BID: [('a', Decimal(10), Decimal(3)), ('c', Decimal(10), Decimal(2)), ('d', Decimal(9), Decimal(1))], ASK: [('b', Decimal(11), Decimal(0))]}]
+    assert cb.coalesced == 2
+
+
+def test_batched_sync_callback_order():
+    received = []
+    threads = set()
+
+    def handler(data):
+        t, receipt_timestamp = data
+        threads.add(threading.current_thread().name)
+        received.append((t.symbol, int(t.price)))
+
+    async def run():
+        cb = TradeCallback(handler, batch_size=10, batch_window=0.01, batch_workers=2)
+        for i in range(100):
+            await cb(trade(('BTC-USD', 'ETH-USD', 'SOL-USD')[i % 3], i), 0.0)
+        await cb.stop()
+        return cb
+
+    cb = asyncio.run(run())
+    assert cb.batcher.depth == 0
+    assert cb.batcher.max_lag >= cb.batcher.lag > 0
+    assert len(received) == 100
+    for symbol in ('BTC-USD', 'ETH-USD', 'SOL-USD'):
+        prices = [price for s, price in received if s == symbol]
+        assert prices == sorted(prices)
+    assert all(name.startswith('cryptofeed-callback') for name in threads)
+
+
+def test_conflated_callback_merges_book_deltas():
+    received = []
+    release = asyncio.Event()
+
+    async def slow(book, receipt_timestamp):
+        await release.wait()
+        received.append((book.symbol, book.delta, book.sequence_number, receipt_timestamp))
+
+    btc = OrderBook('COINBASE', 'BTC-USD')
+    eth = OrderBook('COINBASE', 'ETH-USD')
+
+    async def update(cb, book, seq, delta):
+        for price, size in delta[BID]:
+            book.book.bids[price] = size
+        book.delta = delta
+        book.sequence_number = seq
+        await cb(book, float(seq))
+
+    async def run():
+        cb = ConflatedCallback(slow)
+        await update(cb, btc, 1, {BID: [(Decimal(10), Decimal(1))], ASK: []})
+        await asyncio.sleep(0)
+        # the callback is busy with seq 1, these are merged per symbol
+        await update(cb, btc, 2, {BID: [(Decimal(9), Decimal(1))], ASK: [(Decimal(11), Decimal(2))]})
+        await update(cb, eth, 3, {BID: [(Decimal(5), Decimal(1))], ASK: []})
+        await update(cb, btc, 4, {BID: [(Decimal(10), Decimal(0)), (Decimal(8), Decimal(3))], ASK: [(Decimal(11), Decimal(1))]})
+        assert cb.qsize == 2
+        release.set()
+        await cb.stop()
+        return cb
+
+    cb = asyncio.run(run())
+    assert received == [
+        ('BTC-USD', {BID: [(Decimal(10), Decimal(1))], ASK: []}, 1, 1.0),
+        ('BTC-USD', {BID: [(Decimal(10), Decimal(0)), (Decimal(9), Decimal(1)), (Decimal(8), Decimal(3))], ASK: [(Decimal(11), Decimal(1))]}, 4, 4.0),
+        ('ETH-USD', {BID: [(Decimal(5), Decimal(1))], ASK: []}, 3, 3.0),
+    ]
+    assert cb.conflated == 1
+    assert cb.delivered == 3
+    # the feed's book keeps its own delta
+    assert btc.delta == {BID: [(Decimal(10), Decimal(0)), (Decimal(8), Decimal(3))], ASK: [(Decimal(11), Decimal(1))]}
+
+
+def test_conflated_callback_pending_snapshot():
+    received = []
+    release = asyncio.Event()
+
+    async def slow(book, receipt_timestamp):
+        await release.wait()
+        received.append(book.delta)
+
+    book = OrderBook('COINBASE', 'BTC-USD', bids={Decimal(10): Decimal(1)})
+
+    async def run():
+        cb = ConflatedCallback(slow)
+        book.delta = {BID: [], ASK: []}
+        await cb(book, 0.0)
+        await asyncio.sleep(0)
+        book.delta = None
+        await cb(book, 1.0)
+        book.delta = {BID: [(Decimal(10), Decimal(2))], ASK: []}
+        await cb(book, 2.0)
+        release.set()
+        await cb.stop()
+
+    asyncio.run(run())
+    # a snapshot followed by deltas is still delivered as a snapshot
+    assert received == [{BID: [], ASK: []}, None]
+
+
+def test_conflated_callback_l3_book():
+    received = []
+    release = asyncio.Event()
+
+    async def slow(book, receipt_timestamp):
+        await release.wait()
+        received.append((book.delta, receipt_timestamp))
+
+    book = OrderBook('BITFINEX', 'BTC-USD', l3=True)
+
+    async def run():
+        cb = ConflatedCallback(slow)
+        book.delta = {BID: [('1', Decimal(10), Decimal(1))], ASK: []}
+        await cb(book, 1.0)
+        await asyncio.sleep(0)
+        # the callback is busy with the first update, these are merged by order id
+        book.delta = {BID: [('2', Decimal(9), Decimal(1))], ASK: [('3', Decimal(11), Decimal(2))]}
+        await cb(book, 2.0)
+        book.delta = {BID: [('2', Decimal(9), Decimal(0))], ASK: []}
+        await cb(book, 3.0)
+        release.set()
+        await cb.stop()
+
+    asyncio.run(run())
+    assert received == [
+        ({BID: [('1', Decimal(10), Decimal(1))], ASK: []}, 1.0),
+        ({BID: [('2', Decimal(9), Decimal(0))], ASK: [('3', Decimal(11), Decimal(2))]}, 3.0),
+    ]
+
+
+def test_nbbo():
+    updates = []
+
+    async def nbbo(*args):
+        updates.append(args)
+
+    def book(exchange, bids, asks):
+        return OrderBook(exchange, 'BTC-USD', bids={Decimal(p): Decimal(s) for p, s in bids.items()}, asks={Decimal(p): Decimal(s) for p, s in asks.items()})
+
+    async def run():
+        cb = NBBO(nbbo, ['BTC-USD'], depth=2)
+        await cb(book('A', {100: 1, 99: 1}, {102: 1, 103: 1}), 1.0)
+        await cb(book('B', {101: 2}, {103: 2}), 2.0)
+        # top of book unchanged on B, deeper levels are not part of the NBBO
+        await cb(book('B', {101: 2, 98: 1}, {103: 2}), 3.0)
+        # A's ask moves, but A is still the best ask
+        await cb(book('A', {100: 1, 99: 1}, {102: 1, 104: 1}), 4.0)
+        await cb(book('A', {100: 1}, {104: 1}), 5.0)
+        return cb
+
+    cb = asyncio.run(run())
+    d = Decimal
+    assert updates == [
+        ('BTC-USD', d(100), d(1), d(102), d(1), 'A', 'A', {BID: [(d(100), d(1)), (d(99), d(1))], ASK: [(d(102), d(1)), (d(103), d(1))]}),
+        ('BTC-USD', d(101), d(2), d(102), d(1), 'B', 'A', {BID: [(d(101), d(2)), (d(100), d(1))], ASK: [(d(102), d(1)), (d(103), d(3))]}),
+        ('BTC-USD', d(101), d(2), d(103), d(2), 'B', 'B', {BID: [(d(101), d(2)), (d(100), d(1))], ASK: [(d(103), d(2)), (d(104), d(1))]}),
+    ]
+    assert cb.staleness('BTC-USD', now=6.0) == {'A': 1.0, 'B': 3.0}
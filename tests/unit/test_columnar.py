@@ -0,0 +1,153 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from decimal import Decimal
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from cryptofeed.backends.arctic import TradeArctic
+from cryptofeed.backends.backend import SHUTDOWN_SENTINEL
+from cryptofeed.backends.columnar import ColumnarBackendQueue, ColumnBuffer
+from cryptofeed.backends.parquet import TradeParquet
+from cryptofeed.defines import BUY
+from cryptofeed.types import Trade
+
+
+def trade(i):
+    return Trade('COINBASE', 'BTC-USD', BUY, Decimal(1), Decimal(100 + i), float(i), id=str(i))
+
+
+def test_column_buffer_types():
+    buffer = ColumnBuffer()
+    buffer.append({'symbol': 'BTC-USD', 'price': Decimal('100.5'), 'timestamp': 1.0, 'id': None, 'book': {'bid': {'100': 1}}, 'sequence_number': 5})
+    buffer.append({'symbol': 'ETH-USD', 'price': '10', 'timestamp': 2.0, 'id': 7, 'liquidity': True})
+    assert len(buffer) == 2
+
+    batch = buffer.flush()
+    assert len(buffer) == 0
+    assert batch.schema == pa.schema([
+        ('symbol', pa.string()), ('price', pa.float64()), ('timestamp', pa.float64()), ('id', pa.string()),
+        ('book', pa.string()), ('sequence_number', pa.int64()), ('liquidity', pa.bool_()),
+    ])
+    assert batch.to_pydict() == {
+        'symbol': ['BTC-USD', 'ETH-USD'],
+        'price': [100.5, 10.0],
+        'timestamp': [1.0, 2.0],
+        'id': [None, '7'],
+        'book': ['{"bid":{"100":1}}', None],
+        'sequence_number': [5, None],
+        'liquidity': [None, True],
+    }
+
+    # the schema of earlier batches is kept, new fields are added at the end
+    buffer.append({'side': 'buy', 'price': Decimal(1), 'symbol': 'BTC-USD'})
+    batch = buffer.flush()
+    assert batch.schema.names == ['symbol', 'price', 'timestamp', 'id', 'book', 'sequence_number', 'liquidity', 'side']
+    assert batch.column('timestamp').to_pylist() == [None]
+
+
+def test_column_buffer_numeric_type():
+    buffer = ColumnBuffer(numeric_type=str)
+    buffer.append({'price': Decimal('100.5'), 'timestamp': Decimal('1.5')})
+    batch = buffer.flush()
+    assert batch.schema.field('price').type == pa.string()
+    assert batch.to_pydict() == {'price': ['100.5'], 'timestamp': [1.5]}
+
+
+class RecordingQueue(ColumnarBackendQueue):
+    numeric_type = float
+
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.running = True
+        self.batches = []
+        self.closed = False
+
+    async def write_batch(self, batch):
+        self.batches.append(batch.column('id').to_pylist())
+
+    async def close(self):
+        self.closed = True
+
+
+def test_columnar_flush():
+    async def run():
+        backend = RecordingQueue(batch_size=3, flush_interval=0.1)
+        backend.start(asyncio.get_running_loop())
+        for i in range(3):
+            await backend.write({'id': str(i)})
+        await asyncio.sleep(0.01)
+        # batch_size reached
+        assert backend.batches == [['0', '1', '2']]
+
+        await backend.write({'id': '3'})
+        await asyncio.sleep(0.05)
+        assert len(backend.batches) == 1
+        # written by the flush timer
+        await asyncio.sleep(0.1)
+        assert backend.batches[1:] == [['3']]
+
+        # buffered rows are written on stop
+        await backend.write({'id': '4'})
+        await backend.stop()
+        return backend
+
+    backend = asyncio.run(run())
+    assert backend.batches == [['0', '1', '2'], ['3'], ['4']]
+    assert backend.closed
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_parquet_rotation(tmp_path, file_format):
+    async def run():
+        backend = TradeParquet(str(tmp_path), file_format=file_format, max_file_rows=3)
+        backend.start(asyncio.get_running_loop())
+        for i in range(5):
+            await backend(trade(i), float(i) + 0.5)
+        await backend.stop()
+
+    asyncio.run(run())
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2
+    assert all(f.startswith('trades-') and f.endswith(f'.{file_format}') for f in files)
+
+    tables = []
+    for f in files:
+        if file_format == 'parquet':
+            tables.append(pq.read_table(tmp_path / f))
+        else:
+            with pa.ipc.open_file(tmp_path / f) as reader:
+                tables.append(reader.read_all())
+    assert [t.num_rows for t in tables] == [3, 2]
+    assert tables[0].schema == tables[1].schema
+    table = pa.concat_tables(tables)
+    assert table.column('id').to_pylist() == ['0', '1', '2', '3', '4']
+    assert table.column('price').to_pylist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert table.column('receipt_timestamp').to_pylist() == [0.5, 1.5, 2.5, 3.5, 4.5]
+
+
+def test_arctic_read_queue_sentinel():
+    appended = []
+
+    async def run():
+        # bypass __init__, which connects to the arctic server
+        backend = TradeArctic.__new__(TradeArctic)
+        backend.running = True
+        backend._append = appended.append
+        backend.start(asyncio.get_running_loop())
+        await backend.write({'id': '0'})
+        await asyncio.sleep(0.01)
+        # a sentinel on its own yields an empty batch and ends the writer
+        await backend.queue.put(SHUTDOWN_SENTINEL)
+        await asyncio.wait_for(backend.worker, 1)
+
+    asyncio.run(run())
+    assert appended == [[{'id': '0'}]]
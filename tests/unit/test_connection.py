@@ -0,0 +1,33 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+
+import websockets
+
+from cryptofeed.connection import BytesClientProtocol, WSAsyncConn
+
+
+def test_ws_decode_option():
+    conn = WSAsyncConn('wss://localhost', 'test', decode=False)
+    assert conn.ws_kwargs['create_protocol'] is BytesClientProtocol
+    conn = WSAsyncConn('wss://localhost', 'test')
+    assert 'create_protocol' not in conn.ws_kwargs
+
+
+def test_bytes_client_protocol():
+    async def handler(ws, path):
+        await ws.send('{"a": 1}')
+        await ws.send(iter(['{"b": ', '2}']))
+        await ws.send(b'\x00\x01')
+
+    async def run():
+        async with websockets.serve(handler, 'localhost', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with websockets.connect(f'ws://localhost:{port}', create_protocol=BytesClientProtocol) as ws:
+                return [await ws.recv() for _ in range(3)]
+
+    assert asyncio.run(run()) == [b'{"a": 1}', b'{"b": 2}', b'\x00\x01']
@@ -6,12 +6,14 @@ associated with this software.
 '''
 import os
 import glob
+import subprocess
+import sys
 
 import pytest
 
-from cryptofeed.defines import ASCENDEX, ASCENDEX_FUTURES, BEQUANT, BITDOTCOM, BITGET, BITHUMB, CANDLES, BINANCE, BINANCE_DELIVERY, CRYPTODOTCOM, DELTA, FMFW, BITFINEX, DYDX, EXX, BINANCE_FUTURES, BINANCE_US, BITFLYER, BITMEX, BITSTAMP, BITTREX, BLOCKCHAIN, COINBASE, DERIBIT, FTX_TR, FTX_US, FTX, GATEIO, GEMINI, HITBTC, HUOBI, HUOBI_DM, HUOBI_SWAP, INDEPENDENT_RESERVE, KRAKEN, KRAKEN_FUTURES, KUCOIN, L3_BOOK, OKCOIN, OKX, PHEMEX, POLONIEX, PROBIT, TICKER, TRADES, L2_BOOK, BYBIT, UPBIT
+from cryptofeed.defines import FLOAT, SCALED_INT, ASCENDEX, ASCENDEX_FUTURES, BEQUANT, BITDOTCOM, BITGET, BITHUMB, CANDLES, BINANCE, BINANCE_DELIVERY, CRYPTODOTCOM, DELTA, FMFW, BITFINEX, DYDX, EXX, BINANCE_FUTURES, BINANCE_US, BITFLYER, BITMEX, BITSTAMP, BITTREX, BLOCKCHAIN, COINBASE, DERIBIT, FTX_TR, FTX_US, FTX, GATEIO, GEMINI, HITBTC, HUOBI, HUOBI_DM, HUOBI_SWAP, INDEPENDENT_RESERVE, KRAKEN, KRAKEN_FUTURES, KUCOIN, L3_BOOK, OKCOIN, OKX, PHEMEX, POLONIEX, PROBIT, TICKER, TRADES, L2_BOOK, BYBIT, UPBIT
 from cryptofeed.exchanges import EXCHANGE_MAP
-from cryptofeed.raw_data_collection import playback
+from cryptofeed.raw_data_collection import BinaryCaptureReader, convert_capture, playback
 from cryptofeed.symbols import Symbols
 
 
@@ -100,3 +102,118 @@ def test_exchange_playback(exchange):
     else:
         assert lookup_table[exchange] == results['callbacks']
     Symbols.clear()
+
+
+@pytest.mark.parametrize("exchange", [BITGET, KRAKEN, OKCOIN, OKX])
+@pytest.mark.parametrize("checksum_interval", [1, 10])
+def test_exchange_playback_checksum(exchange, checksum_interval):
+    Symbols.clear()
+    dir = os.path.dirname(os.path.realpath(__file__))
+    pcap = glob.glob(f"{dir}/../../sample_data/{exchange}.*")
+
+    results = playback(exchange, pcap, config="tests/config_test.yaml", checksum_validation=True, checksum_interval=checksum_interval)
+    assert lookup_table[exchange] == results['callbacks']
+    Symbols.clear()
+
+
+@pytest.mark.parametrize("exchange", [BINANCE, COINBASE, HUOBI, OKX, UPBIT])
+def test_exchange_playback_binary(exchange, tmp_path):
+    Symbols.clear()
+    dir = os.path.dirname(os.path.realpath(__file__))
+    pcap = glob.glob(f"{dir}/../../sample_data/{exchange}.*")
+
+    converted = []
+    for f in pcap:
+        dest = f"{tmp_path}/{os.path.basename(f)}.bin"
+        convert_capture(f, dest)
+        converted.append(dest)
+
+    results = playback(exchange, converted, config="tests/config_test.yaml")
+    assert results['messages_processed'] == get_message_count(pcap)
+    assert lookup_table[exchange] == results['callbacks']
+    Symbols.clear()
+
+
+def test_binary_capture_time_range(tmp_path):
+    dir = os.path.dirname(os.path.realpath(__file__))
+    source = glob.glob(f"{dir}/../../sample_data/{COINBASE}.ws.*")[0]
+    dest = f"{tmp_path}/{COINBASE}.ws.bin"
+    convert_capture(source, dest, index_interval=10)
+
+    with BinaryCaptureReader(dest) as reader:
+        timestamps = [r.timestamp for r in reader.records()]
+        start, end = timestamps[len(timestamps) // 3], timestamps[2 * len(timestamps) // 3]
+        ranged = [r.timestamp for r in reader.records(start=start, end=end)]
+
+    assert ranged == [ts for ts in timestamps if start <= ts <= end]
+
+
+@pytest.mark.parametrize("exchange", [BINANCE, BINANCE_FUTURES, KRAKEN])
+@pytest.mark.parametrize("numeric_mode", [FLOAT, SCALED_INT])
+def test_exchange_playback_numeric_mode(exchange, numeric_mode):
+    Symbols.clear()
+    dir = os.path.dirname(os.path.realpath(__file__))
+    pcap = glob.glob(f"{dir}/../../sample_data/{exchange}.*")
+    price_type = float if numeric_mode == FLOAT else int
+    seen = set()
+
+    async def trade(t, receipt_timestamp):
+        assert isinstance(t.price, price_type) and isinstance(t.amount, float)
+        seen.add(TRADES)
+
+    async def ticker(t, receipt_timestamp):
+        assert isinstance(t.bid, price_type) and isinstance(t.ask, price_type)
+        seen.add(TICKER)
+
+    async def book(b, receipt_timestamp):
+        for side in (b.book.bids, b.book.asks):
+            for price, size in side.to_dict().items():
+                assert isinstance(price, price_type) and isinstance(size, float)
+        seen.add(L2_BOOK)
+
+    async def candle(c, receipt_timestamp):
+        assert isinstance(c.close, price_type) and isinstance(c.volume, float)
+        seen.add(CANDLES)
+
+    callbacks = {TRADES: trade, TICKER: ticker, L2_BOOK: book, CANDLES: candle}
+    results = playback(exchange, pcap, callbacks=callbacks, config="tests/config_test.yaml", numeric_mode=numeric_mode)
+    assert lookup_table[exchange] == results['callbacks']
+    assert seen == set(lookup_table[exchange])
+    Symbols.clear()
+
+
+@pytest.mark.parametrize("exchange", [BINANCE, BYBIT, COINBASE])
+def test_exchange_playback_native_book(exchange):
+    dir = os.path.dirname(os.path.realpath(__file__))
+    pcap = glob.glob(f"{dir}/../../sample_data/{exchange}.*")
+
+    books = []
+    for native in (False, True):
+        Symbols.clear()
+        final = {}
+
+        async def book(b, receipt_timestamp):
+            final[b.symbol] = b.book.to_dict()
+
+        results = playback(exchange, pcap, callbacks={L2_BOOK: book, L3_BOOK: book}, config="tests/config_test.yaml", native_book=native)
+        assert results['callbacks'] == {chan: count for chan, count in lookup_table[exchange].items() if chan in (L2_BOOK, L3_BOOK)}
+        books.append(final)
+    assert books[0] and books[0] == books[1]
+    Symbols.clear()
+
+
+def test_exchange_map_lazy_import():
+    code = '''
+import sys
+from cryptofeed import FeedHandler
+from cryptofeed.exchanges import EXCHANGE_MAP
+assert 'COINBASE' in EXCHANGE_MAP and len(EXCHANGE_MAP) > 40
+assert not [m for m in sys.modules if m.startswith('cryptofeed.exchanges.')]
+from cryptofeed.exchanges import OKX
+assert EXCHANGE_MAP['OKX'] is OKX
+assert 'cryptofeed.exchanges.coinbase' not in sys.modules
+'''
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+    for exchange in EXCHANGE_MAP:
+        assert EXCHANGE_MAP[exchange].id == exchange
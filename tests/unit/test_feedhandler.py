@@ -0,0 +1,95 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+from collections import Counter
+import os
+
+import pytest
+
+from cryptofeed import FeedHandler
+from cryptofeed.defines import BINANCE, COINBASE, L2_BOOK, TRADES
+from cryptofeed.raw_data_collection import BinaryFileCallback
+
+
+def test_shard_assignment():
+    fh = FeedHandler(processes=3)
+    book_symbols = [f'SYM{i}-USD' for i in range(9)]
+    fh.add_feed(COINBASE, symbols=book_symbols, channels=[L2_BOOK, TRADES])
+    fh.add_feed(BINANCE, subscription={TRADES: ['BTC-USDT', 'ETH-USDT']})
+
+    shards = fh._build_shards()
+    assert len(shards) == 3
+
+    seen = Counter()
+    for feeds in shards:
+        # symbol groups from the same feed are merged back into a single feed per process
+        assert len(feeds) == len(set(cls for cls, _ in feeds))
+        for _, kwargs in feeds:
+            for chan, symbols in kwargs['subscription'].items():
+                seen.update((chan, s) for s in symbols)
+
+    expected = Counter([(L2_BOOK, s) for s in book_symbols] + [(TRADES, s) for s in book_symbols] + [(TRADES, 'BTC-USDT'), (TRADES, 'ETH-USDT')])
+    assert seen == expected
+
+    # each book symbol weighs 11 (book + trades), so every shard gets 3 of them
+    for feeds in shards:
+        books = sum(len(kwargs['subscription'].get(L2_BOOK, [])) for _, kwargs in feeds)
+        assert books == 3
+
+
+def shard_process(started, exitcode):
+    class Process:
+        def __init__(self, target=None, args=None, name=None):
+            self.exitcode = exitcode
+            started.append(args)
+
+        def start(self):
+            pass
+
+        def is_alive(self):
+            return False
+
+        def join(self):
+            pass
+    return Process
+
+
+def test_sharded_run_arguments(monkeypatch):
+    started = []
+    fh = FeedHandler(processes=2)
+    fh.add_feed(COINBASE, symbols=['BTC-USD', 'ETH-USD'], channels=[TRADES])
+    with pytest.raises(ValueError):
+        fh.run(start_loop=False)
+
+    monkeypatch.setattr('cryptofeed.feedhandler.Process', shard_process(started, 0))
+    # shards that exit cleanly are not restarted, the supervisor returns once they all have
+    fh.add_feed(BINANCE, symbols=['BTC-USDT'], channels=[TRADES])
+    fh.run(install_signal_handlers=False, exception_handler=print)
+    assert len(started) == 2
+    assert all(args[4] is print for args in started)
+    # Coinbase symbols are split over both shards, which share its REST request limit
+    assert all(args[5] == {COINBASE: 2, BINANCE: 1} for args in started)
+
+
+def test_sharded_restarts_failed_shards(monkeypatch):
+    started = []
+    monkeypatch.setattr('cryptofeed.feedhandler.Process', shard_process(started, 1))
+    fh = FeedHandler(processes=2, process_retries=1, restart_delay=0)
+    fh.add_feed(COINBASE, symbols=['BTC-USD', 'ETH-USD'], channels=[TRADES])
+    fh.run(install_signal_handlers=False)
+    # each shard is started, then restarted once
+    assert len(started) == 4
+
+
+def test_sharded_raw_data_collection(tmp_path):
+    with pytest.raises(ValueError):
+        FeedHandler(processes=2, raw_data_collection=print)
+
+    # the shard worker sets a per-shard prefix, connection ids are only unique within a process
+    callback = BinaryFileCallback(str(tmp_path), prefix='shard1-')
+    callback.write_header('BINANCE.ws.1', '{}')
+    callback.stop()
+    assert os.listdir(tmp_path) == ['shard1-BINANCE.ws.1.0.bin']
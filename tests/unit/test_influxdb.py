@@ -0,0 +1,58 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from decimal import Decimal
+
+from aiohttp import web
+
+from cryptofeed.backends.influxdb import TradeInflux
+from cryptofeed.defines import BUY
+from cryptofeed.types import Trade
+
+
+def test_influx_batched_writes():
+    requests = []
+
+    async def handler(request):
+        # aiohttp decompresses the gzip body
+        requests.append((request.headers['Content-Encoding'], await request.text()))
+        if len(requests) == 1:
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        return web.Response(status=204)
+
+    async def run():
+        app = web.Application()
+        app.router.add_post('/api/v2/write', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, 'localhost', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        influx = TradeInflux(f'http://localhost:{port}', 'org', 'bucket', 'token', batch_size=3, flush_interval=0.1)
+        influx.start(asyncio.get_running_loop())
+        for i in range(5):
+            await influx(Trade('COINBASE', 'BTC-USD', BUY, Decimal(1), Decimal(100 + i), 1.0 + i, id=str(i)), 2.0 + i)
+        await asyncio.sleep(0.05)
+        # below batch_size, written by the flush timer
+        await influx(Trade('COINBASE', 'BTC-USD', BUY, Decimal(1), Decimal(105), 6.0, id='5'), 7.0)
+        await asyncio.sleep(0.05)
+        assert len(requests) == 2
+        await asyncio.sleep(0.1)
+        await influx.stop()
+        await runner.cleanup()
+
+    asyncio.run(run())
+    # the first batch is retried after the 429
+    assert len(requests) == 3
+    assert requests[0] == requests[1]
+    encoding, body = requests[1]
+    assert encoding == 'gzip'
+    lines = body.split('\n')
+    assert len(lines) == 5
+    assert lines[0] == 'trades-COINBASE,symbol=BTC-USD side="buy",price=100.0,amount=1.0,id="0",type="None",timestamp=1.0,receipt_timestamp=2.0 2000000'
+    assert requests[2][1].startswith('trades-COINBASE,symbol=BTC-USD side="buy",price=105.0')
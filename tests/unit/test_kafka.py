@@ -0,0 +1,129 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from decimal import Decimal
+import logging
+import sys
+import types
+
+from yapic import json
+
+from cryptofeed.backends.kafka import TradeKafka
+from cryptofeed.defines import BUY
+from cryptofeed.types import Trade
+
+
+class Producer:
+    """
+    in memory stand in for aiokafka's AIOKafkaProducer, delivery futures are resolved by the test (or flush)
+    """
+    instances = []
+    # number of start() calls that fail
+    failures = 1
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.calls = []
+        self.futures = []
+        Producer.instances.append(self)
+
+    async def start(self):
+        self.calls.append('start')
+        if len(Producer.instances) <= Producer.failures:
+            raise ConnectionError("no brokers")
+
+    async def send(self, topic, value, key=None, partition=None):
+        if json.loads(value)['id'] == 'bad':
+            raise ValueError("message too large")
+        future = asyncio.get_running_loop().create_future()
+        self.futures.append(future)
+        self.calls.append((topic, json.loads(value)['id']))
+        return future
+
+    async def flush(self):
+        self.calls.append('flush')
+        for future in self.futures:
+            if not future.done():
+                future.set_result(None)
+
+    async def stop(self):
+        self.calls.append('stop')
+
+
+def trade(id):
+    return Trade('COINBASE', 'BTC-USD', BUY, Decimal(1), Decimal(100), 1.0, id=id)
+
+
+def test_kafka_writer(monkeypatch, caplog):
+    aiokafka = types.ModuleType('aiokafka')
+    aiokafka.AIOKafkaProducer = Producer
+    monkeypatch.setitem(sys.modules, 'aiokafka', aiokafka)
+    monkeypatch.setattr(Producer, 'instances', [])
+
+    async def run():
+        backend = TradeKafka(max_in_flight=1)
+        backend.reconnect_delay = 0.01
+        backend.start(asyncio.get_running_loop())
+
+        await backend(trade('0'), 2.0)
+        await asyncio.sleep(0.05)
+        # the first connection attempt failed and was retried
+        assert len(Producer.instances) == 2
+        producer = Producer.instances[1]
+        await backend(trade('1'), 2.0)
+        await asyncio.sleep(0.01)
+        # two batches in flight, the writer waits for the oldest before sending more
+        await backend(trade('2'), 2.0)
+        await asyncio.sleep(0.01)
+        assert producer.calls == ['start', ('trades-COINBASE-BTC-USD', '0'), ('trades-COINBASE-BTC-USD', '1')]
+
+        producer.futures[0].set_exception(ConnectionError("broker went away"))
+        await asyncio.sleep(0.01)
+        assert producer.calls[-1] == ('trades-COINBASE-BTC-USD', '2')
+
+        # a batch that fails to send is dropped, the writer carries on
+        producer.futures[1].set_result(None)
+        producer.futures[2].set_result(None)
+        await backend(trade('bad'), 2.0)
+        await asyncio.sleep(0.01)
+        await backend(trade('3'), 2.0)
+        await backend.stop()
+        return producer
+
+    with caplog.at_level(logging.ERROR, logger='feedhandler'):
+        producer = asyncio.run(run())
+
+    assert Producer.instances[0].calls == ['start', 'stop']
+    # pending messages are flushed and awaited before the producer is stopped
+    assert producer.calls[-3:] == [('trades-COINBASE-BTC-USD', '3'), 'flush', 'stop']
+    assert all(f.done() for f in producer.futures)
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[0].startswith('TradeKafka: unable to connect')
+    assert 'TradeKafka: delivery of 1 messages failed: broker went away' in messages
+    assert 'TradeKafka: failed to send a batch of 1 updates' in messages
+    assert producer.kwargs['max_batch_size'] == 65536
+
+
+def test_kafka_writer_process_gives_up(monkeypatch):
+    aiokafka = types.ModuleType('aiokafka')
+    aiokafka.AIOKafkaProducer = Producer
+    monkeypatch.setitem(sys.modules, 'aiokafka', aiokafka)
+    monkeypatch.setattr(Producer, 'instances', [])
+    monkeypatch.setattr(Producer, 'failures', 100)
+
+    async def run():
+        backend = TradeKafka()
+        backend.reconnect_delay = 0.01
+        backend.reconnect_retries = 2
+        # the writer process cannot see stop(), it gives up after reconnect_retries
+        backend.start(asyncio.get_running_loop(), multiprocess=True)
+        await backend(trade('0'), 2.0)
+        backend.worker.join(10)
+        assert not backend.worker.is_alive()
+        await backend.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,233 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from decimal import Decimal
+import random
+
+from order_book import OrderBook as _OrderBook
+import pytest
+from yapic import json
+
+from cryptofeed.defines import ASK, BID, BLOCKCHAIN, L1_BOOK, L2_BOOK, L3_BOOK
+from cryptofeed.exceptions import BadChecksum
+from cryptofeed.exchanges import OKX, Blockchain
+from cryptofeed.symbols import Symbols
+from cryptofeed.types import ArrayBook, BookChecksum, L3Book, OrderBook
+
+
+@pytest.mark.parametrize("max_depth", [0, 5, 25, 120])
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("checksum_format", ['KRAKEN', 'OKX', 'FTX'])
+def test_array_book_matches_order_book(max_depth, strict, checksum_format):
+    random.seed(max_depth)
+    expected = _OrderBook(max_depth=max_depth, checksum_format=checksum_format, max_depth_strict=strict)
+    book = ArrayBook(max_depth=max_depth, checksum_format=checksum_format, max_depth_strict=strict)
+
+    snapshot = {BID: {Decimal(p) / 100: Decimal(1) for p in range(1, 300)}, ASK: {Decimal(p) / 100: Decimal(1) for p in range(301, 600)}}
+    expected.bids, expected.asks = snapshot[BID], snapshot[ASK]
+    book.bids, book.asks = snapshot[BID], snapshot[ASK]
+
+    for _ in range(2000):
+        side = random.choice((BID, ASK))
+        price = Decimal(random.randint(1, 299) if side == BID else random.randint(301, 600)) / 100
+        if random.random() < 0.3:
+            assert (price in expected[side]) == (price in book[side])
+            if price in book[side]:
+                del expected[side][price]
+                del book[side][price]
+        else:
+            size = Decimal(random.randint(1, 1000)) / 1000
+            expected[side][price] = size
+            book[side][price] = size
+
+    for side in (BID, ASK):
+        assert len(expected[side]) == len(book[side])
+        assert list(expected[side].to_dict().items()) == list(book[side].to_dict().items())
+        assert list(expected[side]) == list(book[side])
+        assert expected[side].index(0) == book[side].index(0)
+    assert expected.to_dict(to_type=float) == book.to_dict(to_type=float)
+
+    if max_depth and max_depth < (10 if checksum_format == 'KRAKEN' else 100 if checksum_format == 'FTX' else 25):
+        with pytest.raises(ValueError):
+            book.checksum()
+    else:
+        assert expected.checksum() == book.checksum()
+
+
+def test_array_book_depth():
+    ob = OrderBook('COINBASE', 'BTC-USD', bids={100: 1, 200: 2, 300: 3}, asks={400: 4, 500: 5}, max_depth=2, native=True)
+    assert isinstance(ob.book, ArrayBook)
+    assert ob.book.bids.index(0) == (300, 3)
+    assert ob.book.asks.index(0) == (400, 4)
+    assert ob.book.bids.depth() == ([300, 200], [3, 2])
+    assert ob.book.asks.depth(1) == ([400], [4])
+    assert ob.to_dict(numeric_type=str)['book'] == {BID: {'300': '3', '200': '2'}, ASK: {'400': '4', '500': '5'}}
+
+
+@pytest.mark.parametrize("checksum_format", ['KRAKEN', 'OKX', 'FTX'])
+def test_book_checksum_matches_order_book(checksum_format):
+    random.seed(1)
+    book = _OrderBook(checksum_format=checksum_format)
+    book.bids = {Decimal(p) / 100: Decimal(1) for p in range(1, 300)}
+    book.asks = {Decimal(p) / 100: Decimal(1) for p in range(301, 600)}
+    engine = BookChecksum(checksum_format)
+    engine.load(book)
+    assert engine.checksum() == book.checksum()
+
+    for _ in range(500):
+        delta = {BID: [], ASK: []}
+        for _ in range(random.randint(1, 5)):
+            side = random.choice((BID, ASK))
+            price = Decimal(random.randint(200, 299) if side == BID else random.randint(301, 400)) / 100
+            if random.random() < 0.3:
+                if price in book[side]:
+                    del book[side][price]
+                    delta[side].append((price, 0))
+            else:
+                size = Decimal(random.randint(1, 1000)) / 1000
+                book[side][price] = size
+                delta[side].append((price, size))
+        engine.update(delta)
+        assert engine.checksum() == book.checksum()
+
+
+def test_validate_checksum():
+    Symbols.set(OKX.id, {'BTC-USDT': 'BTC-USDT'}, {'instrument_type': {}})
+    feed = OKX(symbols=['BTC-USDT'], channels=[], checksum_validation=True, checksum_interval=3)
+    book = _OrderBook(checksum_format='OKX')
+    book.bids = {Decimal(100): Decimal(1)}
+    book.asks = {Decimal(101): Decimal(1)}
+    feed.validate_checksum('BTC-USDT', book, 'OKX', book.checksum())
+    engine = feed.book_checksums['BTC-USDT']
+
+    book.bids[Decimal(99)] = Decimal(2)
+    feed.validate_checksum('BTC-USDT', book, 'OKX', 0, delta={BID: [(Decimal(99), Decimal(2))], ASK: []})
+    book.bids[Decimal(98)] = Decimal(2)
+    feed.validate_checksum('BTC-USDT', book, 'OKX', 0, delta={BID: [(Decimal(98), Decimal(2))], ASK: []})
+    # only every third update is validated
+    assert engine.checks == 1
+    book.bids[Decimal(97)] = Decimal(2)
+    with pytest.raises(BadChecksum):
+        feed.validate_checksum('BTC-USDT', book, 'OKX', 0, delta={BID: [(Decimal(97), Decimal(2))], ASK: []})
+
+    # a delta that does not match the book is caught by the full revalidation
+    book.bids[Decimal(96)] = Decimal(2)
+    feed.validate_checksum('BTC-USDT', book, 'OKX', book.checksum(), delta={BID: [], ASK: []})
+    assert engine.rebuilds == 0
+    for _ in range(2):
+        feed.validate_checksum('BTC-USDT', book, 'OKX', book.checksum(), delta={BID: [], ASK: []})
+    assert engine.rebuilds == 1
+    assert engine.checksum() == book.checksum()
+    Symbols.clear()
+
+
+@pytest.mark.parametrize("native", [False, True])
+def test_order_book_from_snapshot(native):
+    random.seed(3)
+    bids = [[f'{p / 100:.2f}', f'{random.random():.8f}'] for p in range(500, 1, -1)]
+    asks = [[f'{p / 100:.2f}', f'{random.random():.8f}', 'ignored'] for p in range(501, 1000)]
+    expected = OrderBook('E', 'A-B', bids={Decimal(p): Decimal(s) for p, s in bids}, asks={Decimal(p): Decimal(s) for p, s, _ in asks}, max_depth=100, native=native)
+    book = OrderBook.from_snapshot('E', 'A-B', bids, asks, max_depth=100, native=native)
+    assert book.to_dict() == expected.to_dict()
+    assert book.book.bids.index(0) == (Decimal('5.00'), Decimal(bids[0][1]))
+    assert book.book.asks.index(0) == (Decimal('5.01'), Decimal(asks[0][1]))
+
+    book.load([['1', '2']], [], price=float, size=float)
+    assert book.book.to_dict() == {BID: {1.0: 2.0}, ASK: {}}
+
+
+def test_price_converter():
+    Symbols.set(OKX.id, {'BTC-USDT': 'BTC-USDT'}, {'instrument_type': {}})
+    feed = OKX(symbols=['BTC-USDT'], channels=[])
+    price = feed.price_converter('BTC-USDT')
+    assert price('100.10') is price('100.10')
+    assert feed.price('BTC-USDT', '100.10') is price('100.10')
+    # exchange formatting is kept, checksums depend on it
+    assert str(price('100.0')) == '100.0' and str(price('100')) == '100'
+    Symbols.clear()
+
+
+def test_l3_book():
+    random.seed(11)
+    book = L3Book()
+    expected = {BID: {}, ASK: {}}
+    orders = {}
+    for i in range(3000):
+        if orders and random.random() < 0.4:
+            order_id = random.choice(list(orders))
+            side, price = orders[order_id]
+            if random.random() < 0.5:
+                del orders[order_id]
+                del expected[side][price][order_id]
+                if not expected[side][price]:
+                    del expected[side][price]
+                assert book.remove(order_id).price == price
+            else:
+                expected[side][price][order_id] = Decimal(random.randint(1, 100))
+                assert book.change(order_id, expected[side][price][order_id]).side == side
+        else:
+            side = random.choice((BID, ASK))
+            price = Decimal(random.randint(1, 50)) if side == BID else Decimal(random.randint(51, 100))
+            orders[i] = (side, price)
+            expected[side].setdefault(price, {})[i] = Decimal(random.randint(1, 100))
+            book.add(i, side, price, expected[side][price][i])
+
+    assert book.order_count == len(orders)
+    assert book.remove('missing') is None and book.change('missing', 1) is None
+    for side, descending in ((BID, True), (ASK, False)):
+        assert list(book[side].keys()) == sorted(expected[side], reverse=descending)
+        for price, level in expected[side].items():
+            # FIFO order within a level, sizes aggregated
+            assert list(book[side][price].items()) == list(level.items())
+            assert book[side][price].size == sum(level.values())
+    assert book.to_dict() == expected
+    assert book.to_l2() == {side: {price: sum(level.values()) for price, level in expected[side].items()} for side in (BID, ASK)}
+
+    # an order added again moves to the back of the queue, at its new price
+    order_id, (side, price) = next(iter(orders.items()))
+    book.add(order_id, side, price + 100, Decimal(1))
+    assert book.order(order_id) == (side, price + 100, Decimal(1))
+    assert price not in book[side] or order_id not in book[side][price]
+
+    ob = OrderBook('E', 'A-B', bids=expected[BID], asks=expected[ASK], l3=True)
+    assert ob.to_dict(numeric_type=float)['book'][BID] == {float(p): {o: float(s) for o, s in level.items()} for p, level in expected[BID].items()}
+
+
+def test_derived_books():
+    Symbols.set(BLOCKCHAIN, {'BTC-USD': 'BTC-USD'}, {'instrument_type': {}})
+    l2 = []
+    l1 = []
+
+    async def l2_book(book, receipt_timestamp):
+        l2.append((book.delta, book.book.to_dict()))
+
+    async def l1_book(book, receipt_timestamp):
+        l1.append((book.bid_price, book.bid_size, book.ask_price, book.ask_size))
+
+    def message(seqnum, event, bids, asks):
+        return json.dumps({'seqnum': seqnum, 'event': event, 'channel': 'l3', 'symbol': 'BTC-USD', 'bids': [{'id': i, 'px': p, 'qty': q} for i, p, q in bids], 'asks': [{'id': i, 'px': p, 'qty': q} for i, p, q in asks]})
+
+    async def run():
+        feed = Blockchain(symbols=['BTC-USD'], channels=[L3_BOOK], callbacks={L2_BOOK: l2_book, L1_BOOK: l1_book})
+        assert feed.derived_books == {L2_BOOK, L1_BOOK}
+        feed._Blockchain__reset()
+        await feed.message_handler(message(1, 'snapshot', [('a', 10.0, 1.0), ('b', 10.0, 2.0), ('c', 9.0, 1.0)], [('d', 11.0, 1.0)]), None, 0)
+        await feed.message_handler(message(2, 'updated', [('a', 10.0, 0)], []), None, 0)
+        await feed.message_handler(message(3, 'updated', [('e', 8.0, 1.0)], []), None, 0)
+        await feed.message_handler(message(4, 'updated', [('b', 10.0, 0)], [('f', 11.0, 0.5)]), None, 0)
+
+    asyncio.run(run())
+    d = Decimal
+    assert l2 == [
+        (None, {BID: {d(10): d(3), d(9): d(1)}, ASK: {d(11): d(1)}}),
+        ({BID: [(d(10), d(2))], ASK: []}, {BID: {d(10): d(2), d(9): d(1)}, ASK: {d(11): d(1)}}),
+        ({BID: [(d(8), d(1))], ASK: []}, {BID: {d(10): d(2), d(9): d(1), d(8): d(1)}, ASK: {d(11): d(1)}}),
+        ({BID: [(d(10), 0)], ASK: [(d(11), d('1.5'))]}, {BID: {d(9): d(1), d(8): d(1)}, ASK: {d(11): d('1.5')}}),
+    ]
+    # no L1 update when the top of book does not change
+    assert l1 == [(d(10), d(3), d(11), d(1)), (d(10), d(2), d(11), d(1)), (d(9), d(1), d(11), d('1.5'))]
+    Symbols.clear()
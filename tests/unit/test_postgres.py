@@ -0,0 +1,85 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from datetime import datetime as dt
+from decimal import Decimal
+
+import pytest
+from yapic import json
+
+from cryptofeed.backends.postgres import BookPostgres, CandlesPostgres, FundingPostgres, IndexPostgres, LiquidationsPostgres, OpenInterestPostgres, TickerPostgres, TradePostgres
+from cryptofeed.defines import ASK, BID, BUY, FILLED, SELL
+from cryptofeed.types import Candle, Funding, Index, Liquidation, OpenInterest, OrderBook, Ticker, Trade
+
+
+def batch(backend, *updates):
+    """
+    the (exchange, symbol, timestamp, receipt_timestamp, data) tuples the writer passes to write_batch
+    """
+    batches = []
+
+    async def write_batch(updates):
+        batches.extend(updates)
+
+    async def run():
+        backend.write_batch = write_batch
+        backend.start(asyncio.get_running_loop())
+        for update in updates:
+            await backend(update, 2.0)
+        await asyncio.sleep(0.01)
+        await backend.stop()
+        await backend.worker
+
+    asyncio.run(run())
+    return batches
+
+
+def book():
+    ob = OrderBook('BINANCE', 'BTC-USDT', bids={Decimal(10): Decimal(1)}, asks={Decimal(11): Decimal(2)})
+    ob.timestamp = 1.0
+    ob.delta = {BID: [(Decimal(10), Decimal(1))], ASK: []}
+    return ob
+
+
+TS = dt.utcfromtimestamp(1.0)
+RTS = dt.utcfromtimestamp(2.0)
+
+
+@pytest.mark.parametrize("backend,update,expected", [
+    (TradePostgres, Trade('BINANCE', 'BTC-USDT', BUY, Decimal(1), Decimal(100), 1.0, id='5'), {'side': BUY, 'amount': 1.0, 'price': 100.0, 'trade_id': '5', 'order_type': None}),
+    (FundingPostgres, Funding('BINANCE', 'BTC-USDT-PERP', Decimal(100), Decimal('0.01'), 3.0, 1.0, predicted_rate=Decimal('0.02')), {'mark_price': 100.0, 'rate': 0.01, 'next_funding_time': dt.utcfromtimestamp(3.0), 'predicted_rate': 0.02}),
+    (TickerPostgres, Ticker('BINANCE', 'BTC-USDT', Decimal(10), Decimal(11), 1.0), {'bid': 10.0, 'ask': 11.0}),
+    (OpenInterestPostgres, OpenInterest('BINANCE', 'BTC-USDT-PERP', Decimal(5), 1.0), {'open_interest': 5.0}),
+    (IndexPostgres, Index('BINANCE', 'BTC-USDT', Decimal(100), 1.0), {'price': 100.0}),
+    (LiquidationsPostgres, Liquidation('BINANCE', 'BTC-USDT-PERP', SELL, Decimal(1), Decimal(100), '7', FILLED, 1.0), {'side': SELL, 'quantity': 1.0, 'price': 100.0, 'trade_id': '7', 'status': FILLED}),
+    (BookPostgres, book(), {'data': json.dumps({'delta': {BID: [[10.0, 1.0]], ASK: []}})}),
+    (CandlesPostgres, Candle('BINANCE', 'BTC-USDT', 3.0, 63.0, '1m', 10, Decimal(1), Decimal(2), Decimal(3), Decimal('0.5'), Decimal(100), True, 1.0),
+     {'candle_start': dt.utcfromtimestamp(3.0), 'candle_stop': dt.utcfromtimestamp(63.0), 'interval': '1m', 'trades': 10, 'open': 1.0, 'close': 2.0, 'high': 3.0, 'low': 0.5, 'volume': 100.0, 'closed': True}),
+])
+def test_postgres_record_columns(backend, update, expected):
+    backend = backend()
+    rows = [backend.record(u) for u in batch(backend, update)]
+    assert len(rows) == 1
+    assert len(rows[0]) == len(backend.columns)
+    assert dict(zip(backend.columns, rows[0])) == {'timestamp': TS, 'receipt_timestamp': RTS, 'exchange': 'BINANCE', 'symbol': update.symbol, **expected}
+
+
+def test_postgres_record_custom_columns():
+    custom_columns = {'symbol': 'pair', 'open': 'o', 'close': 'c', 'timestamp': 'ts', 'receipt': 'received', 'start': 'start', 'closed': 'closed'}
+    backend = CandlesPostgres(custom_columns=custom_columns, table='custom_candles')
+    update = Candle('BINANCE', 'BTC-USDT', 3.0, 63.0, '1m', 10, Decimal(1), Decimal(2), Decimal(3), Decimal('0.5'), Decimal(100), True, 1.0)
+    row = backend.record(batch(backend, update)[0])
+    assert backend.columns == ['pair', 'o', 'c', 'ts', 'received', 'start', 'closed']
+    assert dict(zip(backend.columns, row)) == {'pair': 'BTC-USDT', 'o': 1.0, 'c': 2.0, 'ts': TS, 'received': RTS, 'start': dt.utcfromtimestamp(3.0), 'closed': True}
+
+    backend = BookPostgres(custom_columns={'exchange': 'exch', 'data': 'json_book'}, table='custom_book')
+    row = backend.record(batch(backend, book())[0])
+    assert dict(zip(backend.columns, row)) == {'exch': 'BINANCE', 'json_book': json.dumps({'delta': {BID: [[10.0, 1.0]], ASK: []}})}
+
+    backend = FundingPostgres(custom_columns={'symbol': 'symbol', 'next_funding_time': 'next'})
+    row = backend.record(batch(backend, Funding('BINANCE', 'BTC-USDT-PERP', Decimal(100), Decimal('0.01'), 3.0, 1.0))[0])
+    assert dict(zip(backend.columns, row)) == {'symbol': 'BTC-USDT-PERP', 'next': dt.utcfromtimestamp(3.0)}
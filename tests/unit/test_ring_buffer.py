@@ -0,0 +1,71 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import asyncio
+from decimal import Decimal
+import pickle
+
+import pytest
+
+from cryptofeed.backends.ring_buffer import RingBuffer
+
+
+@pytest.fixture
+def ring():
+    ring = RingBuffer(size=256)
+    yield ring
+    ring.close()
+
+
+def test_ring_buffer_drains_all_messages(ring):
+    updates = [{'exchange': 'X', 'symbol': 'BTC-USD', 'price': float(i), 'id': None} for i in range(3)]
+    for update in updates:
+        assert ring.put_nowait(update)
+    assert ring.fill_level > 0
+    assert ring.get_nowait() == updates
+    assert ring.fill_level == 0
+    assert ring.get_nowait() == []
+
+
+def test_ring_buffer_wraps_and_reports_full(ring):
+    update = {'book': {'bid': {1.0: 2.0}, 'ask': {3.0: 4.0}}, 'price': Decimal('1.1')}
+    for _ in range(20):
+        written = 0
+        while ring.put_nowait(update):
+            written += 1
+        assert written > 0
+        assert ring.get_nowait() == [update] * written
+    with pytest.raises(ValueError):
+        ring.put_nowait('x' * 512)
+
+
+def test_ring_buffer_put_waits_for_reader(ring):
+    async def run():
+        while ring.put_nowait('fill'):
+            pass
+        read = []
+
+        async def reader():
+            while len(read) < 10:
+                read.extend(await ring.get())
+
+        task = asyncio.create_task(reader())
+        await ring.put('last')
+        await task
+        read.extend(ring.get_nowait())
+        return read
+
+    read = asyncio.run(run())
+    assert read[-1] == 'last'
+    assert ring.full_waits == 1
+
+
+def test_ring_buffer_attach(ring):
+    ring.put_nowait({'a': 1})
+    other = pickle.loads(pickle.dumps(ring))
+    assert other.get_nowait() == [{'a': 1}]
+    assert ring.fill_level == 0
+    other.close()
@@ -134,3 +134,31 @@ def test_candle():
     d = json.loads(d)
     t2 = Candle.from_dict(d)
     assert t == t2
+
+
+def test_order_book_serialization_cache():
+    ob = OrderBook('COINBASE', 'BTC-USD', bids={Decimal(100): Decimal(1)}, asks={Decimal(200): Decimal(2)})
+    ob.timestamp = 1.0
+    d = ob.to_dict(numeric_type=float)
+    d['receipt_timestamp'] = 2.0
+    # callers get their own copy of the cached dict
+    assert ob.to_dict(numeric_type=float) == {'exchange': 'COINBASE', 'symbol': 'BTC-USD', 'book': {'bid': {100.0: 1.0}, 'ask': {200.0: 2.0}}, 'delta': None, 'timestamp': 1.0}
+    assert json.loads(ob.to_json(numeric_type=str)) == ob.to_dict(numeric_type=str)
+    assert ob.to_bytes(numeric_type=str) == ob.to_json(numeric_type=str).encode()
+
+    # setting the update fields starts a new update
+    ob.book.bids[Decimal(101)] = Decimal(3)
+    ob.delta = {'bid': [(Decimal(101), Decimal(3))], 'ask': []}
+    assert ob.to_dict(numeric_type=float)['book']['bid'] == {101.0: 3.0, 100.0: 1.0}
+    assert json.loads(ob.to_json(delta=True, numeric_type=float))['delta'] == {'bid': [[101.0, 3.0]], 'ask': []}
+
+    ob.book.bids[Decimal(102)] = Decimal(1)
+    assert 102.0 not in ob.to_dict(numeric_type=float)['book']['bid']
+    ob.clear_cache()
+    assert 102.0 in ob.to_dict(numeric_type=float)['book']['bid']
+
+
+def test_to_json():
+    t = Trade('COINBASE', 'BTC-USD', BUY, Decimal(10), Decimal(100), 1.0, id='1')
+    assert json.loads(t.to_json(numeric_type=str)) == t.to_dict(numeric_type=str)
+    assert t.to_bytes(numeric_type=float) == t.to_json(numeric_type=float).encode()
@@ -4,10 +4,14 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
+from decimal import Decimal
+import pickle
+
 import pytest
 
-from cryptofeed.defines import EXX
-from cryptofeed.exchanges import EXCHANGE_MAP
+from cryptofeed.defines import BINANCE, COINBASE, EXX, SPOT
+from cryptofeed.exchanges import EXCHANGE_MAP, Coinbase
+from cryptofeed.symbols import Symbols
 
 
 @pytest.mark.parametrize("exchange", [e for e in EXCHANGE_MAP.keys() if e not in [EXX]])
@@ -17,3 +21,27 @@ def test_symbol_conversion(exchange):
     for normalized, original in symbols.items():
         assert feed.std_symbol_to_exchange_symbol(normalized) == original
         assert feed.exchange_symbol_to_std_symbol(original) == normalized
+
+
+def test_symbol_cache(tmp_path):
+    Symbols.clear()
+    Symbols.enable_cache(path=str(tmp_path))
+    try:
+        Symbols.set(COINBASE, {'BTC-USD': 'BTC-USD'}, {'tick_size': {'BTC-USD': Decimal('0.01')}, 'instrument_type': {'BTC-USD': SPOT}})
+        assert (tmp_path / f'{COINBASE}.pickle').exists()
+        Symbols.clear()
+
+        assert Symbols.populated(COINBASE)
+        assert Symbols.get(COINBASE) == ({'BTC-USD': 'BTC-USD'}, {'tick_size': {'BTC-USD': Decimal('0.01')}, 'instrument_type': {'BTC-USD': SPOT}})
+        assert not Symbols.populated(BINANCE)
+        assert Coinbase.symbols() == ['BTC-USD']
+
+        # files from another cache format version are ignored
+        entry = pickle.loads((tmp_path / f'{COINBASE}.pickle').read_bytes())
+        entry['version'] = (0, None)
+        (tmp_path / f'{COINBASE}.pickle').write_bytes(pickle.dumps(entry))
+        Symbols.clear()
+        assert not Symbols.populated(COINBASE)
+    finally:
+        Symbols.disable_cache()
+        Symbols.clear()
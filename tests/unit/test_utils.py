@@ -4,8 +4,19 @@ Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
 Please see the LICENSE file for the terms and conditions
 associated with this software.
 '''
-from cryptofeed.defines import BID, ASK
-from cryptofeed.util.book import book_delta
+import asyncio
+from decimal import Decimal
+import random
+import time
+
+from order_book import OrderBook
+from yapic import json
+
+from cryptofeed.defines import BID, ASK, L2_BOOK, UPBIT
+from cryptofeed.exchanges import Upbit
+from cryptofeed.symbols import Symbols
+from cryptofeed.util.book import book_delta, sorted_side_delta
+from cryptofeed.util.rate_limit import BACKFILL_PRIORITY, SNAPSHOT_PRIORITY, RateLimiter
 
 
 def test_book_delta_simple():
@@ -55,3 +66,85 @@ def test_book_delta_empty():
 
     assert book_delta(a, b) == {'bid': [(0.9, 0), (1.0, 0), (0.8, 0)], 'ask': [(1.2, 0), (1.1, 0), (1.3, 0)]}
     assert book_delta(b, a) == {'ask': [(1.2, 0.6), (1.1, 1.1), (1.3, 2.1)], 'bid': [(0.9, 0.5), (1.0, 1), (0.8, 2)]}
+
+
+def test_sorted_side_delta():
+    random.seed(7)
+    for _ in range(200):
+        a = OrderBook()
+        b = OrderBook()
+        a.bids = {Decimal(random.randint(1, 30)): Decimal(random.randint(1, 3)) for _ in range(random.randint(0, 15))}
+        a.asks = {Decimal(random.randint(31, 60)): Decimal(random.randint(1, 3)) for _ in range(random.randint(0, 15))}
+        b.bids = {Decimal(random.randint(1, 30)): Decimal(random.randint(1, 3)) for _ in range(random.randint(0, 15))}
+        b.asks = {Decimal(random.randint(31, 60)): Decimal(random.randint(1, 3)) for _ in range(random.randint(0, 15))}
+
+        expected = book_delta({BID: a.bids.to_dict(), ASK: a.asks.to_dict()}, {BID: b.bids.to_dict(), ASK: b.asks.to_dict()})
+        bids = sorted_side_delta(a.bids.keys(), a.bids.to_dict(), b.bids.keys(), b.bids.to_dict(), True)
+        asks = sorted_side_delta(a.asks.keys(), a.asks.to_dict(), b.asks.keys(), b.asks.to_dict(), False)
+        assert sorted(bids) == sorted(expected[BID])
+        assert sorted(asks) == sorted(expected[ASK])
+        # deltas are in book order
+        assert [p for p, _ in bids] == sorted((p for p, _ in bids), reverse=True)
+        assert [p for p, _ in asks] == sorted(p for p, _ in asks)
+
+
+def test_snapshot_only_book_delta():
+    Symbols.set(UPBIT, {'BTC-KRW': 'KRW-BTC'}, {'instrument_type': {}})
+    books = []
+
+    async def book(b, receipt_timestamp):
+        books.append((b.delta, b.book.to_dict()))
+
+    def snapshot(levels):
+        return json.dumps({'ty': 'orderbook', 'cd': 'KRW-BTC', 'tms': 1584263923870, 'obu': [{'bp': bp, 'bs': bs, 'ap': ap, 'as': size} for bp, bs, ap, size in levels]})
+
+    async def run():
+        feed = Upbit(symbols=['BTC-KRW'], channels=[L2_BOOK], callbacks={L2_BOOK: book})
+        await feed.message_handler(snapshot([(100, 1, 101, 1), (99, 2, 102, 2)]), None, 0)
+        await feed.message_handler(snapshot([(100, 1, 101, 3), (98, 1, 102, 2)]), None, 0)
+        await feed.message_handler(snapshot([(100, 1, 101, 3), (98, 1, 102, 2)]), None, 0)
+
+    asyncio.run(run())
+    assert books[0][0] is None
+    assert books[1][0] == {BID: [(Decimal(99), 0), (Decimal(98), Decimal(1))], ASK: [(Decimal(101), Decimal(3))]}
+    assert books[2][0] == {BID: [], ASK: []}
+    Symbols.clear()
+
+
+def test_rate_limiter():
+    order = []
+
+    async def request(limiter, name, priority):
+        await limiter.acquire(priority=priority)
+        order.append((name, time.monotonic()))
+
+    async def run():
+        limiter = RateLimiter(50)
+        # the first request uses the bucket's token, the rest wait and are served by priority
+        tasks = [asyncio.create_task(request(limiter, name, priority)) for name, priority in [('first', BACKFILL_PRIORITY), ('backfill 1', BACKFILL_PRIORITY), ('backfill 2', BACKFILL_PRIORITY), ('snapshot', SNAPSHOT_PRIORITY)]]
+        await asyncio.gather(*tasks)
+
+        # a cancelled waiter does not hold up the queue
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        start = time.monotonic()
+        limiter.backoff(0.1)
+        await limiter.acquire()
+        assert time.monotonic() - start >= 0.1
+
+    asyncio.run(run())
+    assert [name for name, _ in order] == ['first', 'snapshot', 'backfill 1', 'backfill 2']
+    # 50 requests per second, one at a time
+    assert all(b - a >= 0.015 for (_, a), (_, b) in zip(order, order[1:]))
+
+
+def test_rate_limiter_processes(monkeypatch):
+    monkeypatch.setattr(RateLimiter, '_limiters', {})
+    monkeypatch.setattr(RateLimiter, 'processes', {})
+    # created before the split, eg. by a feed object built in the parent process
+    existing = RateLimiter.get('BINANCE', 20)
+    RateLimiter.set_processes({'BINANCE': 4, 'COINBASE': 2})
+    assert existing.rate == 5
+    assert RateLimiter.get(('COINBASE', 'key'), 10).rate == 5
+    assert RateLimiter.get('KRAKEN', 1).rate == 1
@@ -0,0 +1,48 @@
+'''
+Copyright (C) 2017-2022 Bryant Moscon - bmoscon@gmail.com
+
+Please see the LICENSE file for the terms and conditions
+associated with this software.
+'''
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+# each case runs in a fresh interpreter, and prints the number of exchange modules it imported
+CASES = {
+    'import cryptofeed': 'import cryptofeed',
+    'FeedHandler + Coinbase class': 'from cryptofeed import FeedHandler; from cryptofeed.exchanges import Coinbase',
+    'EXCHANGE_MAP lookup': 'from cryptofeed.exchanges import EXCHANGE_MAP; EXCHANGE_MAP["COINBASE"]',
+    'all exchange classes': 'from cryptofeed.exchanges import EXCHANGE_MAP; list(EXCHANGE_MAP.values())',
+}
+TEMPLATE = '''
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(elapsed, len([m for m in sys.modules if m.startswith('cryptofeed.exchanges.')]))
+'''
+
+
+def run(code: str, runs: int):
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', TEMPLATE.format(code=code)], check=True, capture_output=True, text=True).stdout.split()
+        times.append(float(out[0]))
+    return statistics.median(times), int(out[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the import time of cryptofeed entry points, each in a new process')
+    parser.add_argument('--runs', type=int, default=10, help='runs per case, the median is reported')
+    args = parser.parse_args()
+
+    for name, code in CASES.items():
+        elapsed, modules = run(code, args.runs)
+        print(f'{name:<32} {elapsed * 1000:8.1f} ms {modules:4d} exchange modules')
+
+
+if __name__ == '__main__':
+    main()